@@ -6,14 +6,16 @@
 # the 3-Clause BSD License.  See the LICENSE file in the package base
 # directory for details.
 
+from array import array
+from bisect import bisect_left, bisect_right
 from enum import IntEnum, Enum
-from typing import Dict, List, Tuple, Set, Optional
+from itertools import chain
+from math import inf
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple, Set, Optional
 
-import matplotlib.pyplot as plt
 import networkx as nx  # type:ignore
-from lxml.objectify import ObjectifiedElement  # type:ignore
-
-from .parser import readlineToCUIdMap, writelineToCUIdMap, DependenceItem
+import numpy as np
+from .parser import readlineToCUIdMap, writelineToCUIdMap, DependenceTable, CUNodeRecord
 from .variable import Variable
 
 node_props = [
@@ -48,12 +50,17 @@ class EdgeType(Enum):
     SUCCESSOR = 1
     DATA = 2
 
+    # members are singletons, hashing by identity is much cheaper than the default hash of the name
+    __hash__ = object.__hash__
+
 
 class DepType(Enum):
     RAW = 0
     WAR = 1
     WAW = 2
 
+    __hash__ = object.__hash__
+
 
 class NodeType(IntEnum):
     CU = 0
@@ -85,8 +92,330 @@ class Dependency:
         return self.var_name if self.var_name is not None else str(self.etype)
 
 
+class DataDependency(Dependency):
+    """Data dependency materialized from a row of a DependencyStore.
+    Dependencies of the same row are equal, independent of the query they were obtained from.
+    """
+
+    def __init__(self, store: 'DependencyStore', row: int, dtype: Optional[DepType], var_name: Optional[str],
+                 source: Optional[str], sink: Optional[str]):
+        self.etype = EdgeType.DATA
+        self.store = store
+        self.row = row
+        self.dtype = dtype
+        self.var_name = var_name
+        self.source = source
+        self.sink = sink
+
+    def __eq__(self, other):
+        return isinstance(other, DataDependency) and self.row == other.row and self.store is other.store
+
+    def __hash__(self):
+        return hash(self.row)
+
+
+class DependencyStore(object):
+    """Columnar storage of the data dependencies between CUs.
+
+    Every dependency is a row of six int32 columns: sink CU, source CU, dependency type, variable and
+    sink/source line. CUs, variable names and lines are interned, thus a dependency takes 24 bytes
+    plus 8 bytes of index. A dependency is an edge from the CU containing the sink line to the CU
+    containing the source line.
+    """
+    SINK_CU, SOURCE_CU, DEP_TYPE, VAR, SINK_LINE, SOURCE_LINE = range(6)
+    __NONE = -1
+    # dependency types by stored value, -1 is None
+    __DEP_TYPES: List[Optional[DepType]] = [*DepType, None]
+
+    def __init__(self):
+        self.cu_ids: List[str] = []
+        self.var_names: List[Optional[str]] = []
+        self.lines: List[Optional[str]] = []
+        self.__cu_index: Dict[str, int] = {}
+        self.__var_index: Dict[Optional[str], int] = {}
+        self.__line_index: Dict[Optional[str], int] = {}
+        # rows added since the table was built, flattened
+        self.__pending = array('i')
+        self.__table = np.empty((0, 6), dtype=np.int32)
+        # per direction: rows sorted by CU, offsets of the CUs in the sorted rows
+        self.__index: Optional[Dict[bool, Tuple[np.ndarray, np.ndarray]]] = None
+
+    def __getstate__(self):
+        self.__flush()
+        state = self.__dict__.copy()
+        state['_DependencyStore__index'] = None
+        return state
+
+    @staticmethod
+    def __intern(value, values: list, index: dict) -> int:
+        i = index.get(value)
+        if i is None:
+            i = index[value] = len(values)
+            values.append(value)
+        return i
+
+    def add(self, sink_cu_id: str, source_cu_id: str, dtype: Optional[DepType], var_name: Optional[str],
+            sink: Optional[str], source: Optional[str]):
+        """Adds a dependency
+
+        :param sink_cu_id: id of the CU containing the sink
+        :param source_cu_id: id of the CU containing the source
+        :param dtype: type of the dependency
+        :param var_name: variable name
+        :param sink: sink line
+        :param source: source line
+        """
+        self.__pending.extend((self.__intern(sink_cu_id, self.cu_ids, self.__cu_index),
+                               self.__intern(source_cu_id, self.cu_ids, self.__cu_index),
+                               self.__NONE if dtype is None else dtype.value,
+                               self.__intern(var_name, self.var_names, self.__var_index),
+                               self.__intern(sink, self.lines, self.__line_index),
+                               self.__intern(source, self.lines, self.__line_index)))
+
+    def __intern_codes(self, codes: np.ndarray, values: Sequence, own_values: list, own_index: dict) -> np.ndarray:
+        """Interns the values referenced by codes in order of their first occurrence, like add does row by row
+
+        :param codes: indices into values
+        :param values: values
+        :param own_values: interned values of the store
+        :param own_index: index of own_values
+        :return: interned id by code
+        """
+        ids = np.full(len(values), self.__NONE, dtype=np.int32)
+        for code in dict.fromkeys(codes.tolist()):
+            ids[code] = self.__intern(values[code], own_values, own_index)
+        return ids
+
+    def add_encoded(self, cu_ids: Sequence[str], var_names: Sequence[Optional[str]], lines: Sequence[Optional[str]],
+                    columns: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]):
+        """Adds many dependencies at once, the result is the same as calling add for every row
+
+        :param cu_ids: CU ids referenced by the CU columns
+        :param var_names: variable names referenced by the variable column
+        :param lines: lines referenced by the line columns
+        :param columns: sink CU, source CU, dependency type (DepType value), variable, sink and source line,
+            the CUs, variables and lines are given as indices into cu_ids, var_names and lines
+        """
+        sink_cu, source_cu, dtype, var, sink, source = columns
+        if not len(dtype):
+            return
+        cus = self.__intern_codes(np.column_stack((sink_cu, source_cu)).ravel(), cu_ids, self.cu_ids, self.__cu_index)
+        variables = self.__intern_codes(var, var_names, self.var_names, self.__var_index)
+        line_ids = self.__intern_codes(np.column_stack((sink, source)).ravel(), lines, self.lines, self.__line_index)
+        rows = np.column_stack((cus[sink_cu], cus[source_cu], dtype, variables[var], line_ids[sink],
+                                line_ids[source])).astype(np.int32)
+        self.__flush()
+        self.__table = np.concatenate((self.__table, rows))
+        self.__index = None
+
+    def add_line_dependencies(self, dependencies: DependenceTable, read_cu_ids: List[List[str]],
+                              written_cu_ids: List[List[str]]):
+        """Adds the dependencies between lines of the dependency file as dependencies between the CUs reading the
+        sink and writing the source line. INIT dependencies and WAR and WAW dependencies within a single CU are
+        skipped. The dependencies of every line are added for all pairs of CUs, in the order of read_cu_ids and
+        written_cu_ids, without a python loop over the dependencies.
+
+        :param dependencies: dependencies between lines
+        :param read_cu_ids: ids of the CUs reading the line, by line of the dependencies
+        :param written_cu_ids: ids of the CUs writing the line, by line of the dependencies
+        """
+        table = dependencies.table
+        sink_lines = table[:, DependenceTable.SINK]
+        source_lines = table[:, DependenceTable.SOURCE]
+        type_codes = table[:, DependenceTable.TYPE]
+
+        # CUs per line as offsets into a flat array of indices into cu_ids
+        cu_index: Dict[str, int] = {}
+        cu_ids: List[str] = []
+        per_line = []
+        for line_cus in (read_cu_ids, written_cu_ids):
+            flat = np.array([self.__intern(c, cu_ids, cu_index) for cus in line_cus for c in cus], dtype=np.int64)
+            offsets = np.zeros(len(line_cus) + 1, dtype=np.int64)
+            np.cumsum([len(cus) for cus in line_cus], out=offsets[1:])
+            per_line.append((flat, offsets))
+        (read_flat, read_offsets), (written_flat, written_offsets) = per_line
+
+        # every dependency becomes one row per pair of reading and writing CU
+        is_init = np.array([t == 'INIT' for t in dependencies.types], dtype=bool)
+        read_counts = np.diff(read_offsets)[sink_lines]
+        written_counts = np.diff(written_offsets)[source_lines]
+        pairs = np.where(is_init[type_codes], 0, read_counts * written_counts)
+        dependency = np.repeat(np.arange(len(table), dtype=np.int64), pairs)
+        pair = np.arange(len(dependency), dtype=np.int64) - np.repeat(np.cumsum(pairs) - pairs, pairs)
+        written_count = written_counts[dependency]
+        sink_cu = read_flat[read_offsets[sink_lines[dependency]] + pair // written_count]
+        source_cu = written_flat[written_offsets[source_lines[dependency]] + pair % written_count]
+        dtype_codes = type_codes[dependency]
+
+        # unknown types only fail if they occur in a dependency between CUs
+        used_types = np.unique(dtype_codes).tolist()
+        dtype_values = np.full(len(dependencies.types), self.__NONE, dtype=np.int32)
+        for code in used_types:
+            dtype_values[code] = DepType[dependencies.types[code]].value
+        within_cu = np.isin(dtype_values, [DepType.WAR.value, DepType.WAW.value])
+        keep = ~((sink_cu == source_cu) & within_cu[dtype_codes])
+        dependency = dependency[keep]
+
+        self.add_encoded(cu_ids, dependencies.var_names, dependencies.lines,
+                         (sink_cu[keep], source_cu[keep], dtype_values[dtype_codes[keep]],
+                          table[dependency, DependenceTable.VAR], sink_lines[dependency], source_lines[dependency]))
+
+    def __flush(self):
+        """Appends the pending rows to the table"""
+        if not self.__pending:
+            return
+        pending = np.frombuffer(self.__pending, dtype=np.int32).reshape(-1, 6)
+        self.__table = np.concatenate((self.__table, pending))
+        self.__pending = array('i')
+        self.__index = None
+
+    @property
+    def table(self) -> np.ndarray:
+        """All dependencies, one row per dependency"""
+        self.__flush()
+        return self.__table
+
+    def column(self, column: int) -> np.ndarray:
+        """Column of the table, e.g. DependencyStore.SINK_CU"""
+        return self.table[:, column]
+
+    def __len__(self):
+        return len(self.table)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory consumed by the dependency table and indices"""
+        return self.table.nbytes + sum(rows.nbytes + offsets.nbytes for rows, offsets in self.__get_index().values())
+
+    def __get_index(self) -> Dict[bool, Tuple[np.ndarray, np.ndarray]]:
+        table = self.table
+        if self.__index is None:
+            self.__index = {True: self.__build_index(table[:, self.SINK_CU], table[:, self.SOURCE_CU]),
+                            False: self.__build_index(table[:, self.SOURCE_CU], table[:, self.SINK_CU])}
+        return self.__index
+
+    def __build_index(self, cus: np.ndarray, neighbours: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorts the rows by CU. The rows of a CU are grouped by neighbour CU in order of their first
+        occurrence, like the multi-edges in a networkx graph.
+        """
+        n = len(self.cu_ids)
+        rows = np.arange(len(cus), dtype=np.int64)
+        _, first, inverse = np.unique(cus.astype(np.int64) * n + neighbours, return_index=True, return_inverse=True)
+        order = np.lexsort((rows, first[inverse], cus)).astype(np.int32)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cus, minlength=n), out=offsets[1:])
+        return order, offsets
+
+    def __rows_of(self, cu_id: str, outgoing: bool) -> np.ndarray:
+        i = self.__cu_index.get(cu_id)
+        if i is None:
+            return np.empty(0, dtype=np.int32)
+        rows, offsets = self.__get_index()[outgoing]
+        return rows[offsets[i]:offsets[i + 1]]
+
+    def out_rows(self, cu_id: str) -> np.ndarray:
+        """Rows of the dependencies whose sink is in the CU"""
+        return self.__rows_of(cu_id, True)
+
+    def in_rows(self, cu_id: str) -> np.ndarray:
+        """Rows of the dependencies whose source is in the CU"""
+        return self.__rows_of(cu_id, False)
+
+    def rows_of_cus(self, cu_ids: Iterable[str], outgoing: bool) -> np.ndarray:
+        """Rows of the dependencies whose sink (outgoing) or source (incoming) is in one of the CUs
+
+        :param cu_ids: ids of the CUs
+        :param outgoing: sink in the CUs if true, source else
+        :return: rows grouped by CU in the given order
+        """
+        rows, offsets = self.__get_index()[outgoing]
+        indices = np.array([i for i in map(self.__cu_index.get, cu_ids) if i is not None], dtype=np.int64)
+        starts = offsets[indices]
+        counts = offsets[indices + 1] - starts
+        # positions of the selected ranges in rows, concatenated without a python loop over the CUs
+        shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return rows[np.arange(len(shifts), dtype=np.int64) + shifts]
+
+    def line_ids(self, lines: Iterable[Optional[str]]) -> np.ndarray:
+        """Interned ids of the lines, as stored in the line columns. Unknown lines are skipped.
+
+        :param lines: lines
+        :return: ids of the lines
+        """
+        return np.array([self.__line_index[line] for line in lines if line in self.__line_index], dtype=np.int32)
+
+    def __select(self, mask: np.ndarray, dtype: Optional[DepType]) -> np.ndarray:
+        if dtype is not None:
+            mask &= self.table[:, self.DEP_TYPE] == dtype.value
+        return np.flatnonzero(mask)
+
+    def __cu_mask(self, column: int, cu_ids: Iterable[str]) -> np.ndarray:
+        indices = [self.__cu_index[c] for c in cu_ids if c in self.__cu_index]
+        return np.isin(self.table[:, column], np.array(indices, dtype=np.int32))
+
+    def rows_leaving(self, cu_ids: Iterable[str], dtype: Optional[DepType] = None) -> np.ndarray:
+        """Rows of all dependencies (of the given type) leaving the set of CUs, i.e. with the sink in one of them
+
+        :param cu_ids: ids of the CUs
+        :param dtype: type of the dependencies, None is equal to a wildcard
+        :return: rows in insertion order
+        """
+        return self.__select(self.__cu_mask(self.SINK_CU, cu_ids), dtype)
+
+    def rows_entering(self, cu_ids: Iterable[str], dtype: Optional[DepType] = None) -> np.ndarray:
+        """Rows of all dependencies (of the given type) entering the set of CUs, i.e. with the source in one of them
+
+        :param cu_ids: ids of the CUs
+        :param dtype: type of the dependencies, None is equal to a wildcard
+        :return: rows in insertion order
+        """
+        return self.__select(self.__cu_mask(self.SOURCE_CU, cu_ids), dtype)
+
+    def rows_on_variable(self, var_name: Optional[str], dtype: Optional[DepType] = None) -> np.ndarray:
+        """Rows of all dependencies (of the given type) on the variable
+
+        :param var_name: variable name
+        :param dtype: type of the dependencies, None is equal to a wildcard
+        :return: rows in insertion order
+        """
+        if var_name not in self.__var_index:
+            return np.empty(0, dtype=np.int64)
+        return self.__select(self.table[:, self.VAR] == self.__var_index[var_name], dtype)
+
+    def all_rows(self) -> np.ndarray:
+        """Rows of all dependencies in insertion order"""
+        return np.arange(len(self), dtype=np.int64)
+
+    def edges(self, rows: np.ndarray) -> List[Tuple[str, str, Dependency]]:
+        """Materializes the dependencies of the rows as graph edges
+
+        :param rows: rows of the table
+        :return: list of edges (sink CU id, source CU id, dependency)
+        """
+        cu_ids, var_names, lines, dep_types = self.cu_ids, self.var_names, self.lines, self.__DEP_TYPES
+        return [(cu_ids[sink_cu], cu_ids[source_cu],
+                 DataDependency(self, row, dep_types[dtype], var_names[var], lines[source], lines[sink]))
+                for row, (sink_cu, source_cu, dtype, var, sink, source)
+                in zip(rows.tolist(), self.table[rows].tolist())]
+
+    def remove_cu(self, cu_id: str):
+        """Removes all dependencies from or to the CU. The remaining rows are renumbered.
+
+        :param cu_id: id of the CU
+        """
+        i = self.__cu_index.get(cu_id)
+        if i is None:
+            return
+        table = self.table
+        self.__table = table[(table[:, self.SINK_CU] != i) & (table[:, self.SOURCE_CU] != i)]
+        self.__index = None
+
+
 class CUNode:
     id: str
+    # dense position of the node in the PET graph built last with it, a lookup aid only,
+    # equality and hash depend on the id alone
+    index: int = -1
     file_id: int
     node_id: int
     source_file: int
@@ -143,40 +472,42 @@ class CUNode:
         return self.id
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, CUNode):
             return other.id == self.id
         else:
             return False
 
     def __hash__(self):
-        return hash(id)
+        return hash(self.id)
 
 
-def parse_cu(node: ObjectifiedElement) -> CUNode:
-    n = CUNode(node.get("id"))
-    n.type = NodeType(int(node.get("type")))
-    n.source_file, n.start_line = parse_id(node.get("startsAtLine"))
-    _, n.end_line = parse_id(node.get("endsAtLine"))
-    n.name = node.get("name")
-    n.instructions_count = node.get("instructionsCount", 0)
+def parse_cu(node: CUNodeRecord) -> CUNode:
+    n = CUNode(node.id)
+    n.type = NodeType(int(node.type))
+    n.source_file, n.start_line = parse_id(node.start_line)
+    _, n.end_line = parse_id(node.end_line)
+    n.name = node.name
+    n.instructions_count = node.instructions_count
 
-    if hasattr(node, 'funcArguments') and hasattr(node.funcArguments, 'arg'):
-        n.args = [Variable(v.get('type'), v.text) for v in node.funcArguments.arg]
+    if node.args is not None:
+        n.args = [Variable(v_type, v_name) for v_type, v_name in node.args]
 
-    if hasattr(node, 'callsNode') and hasattr(node.callsNode, 'recursiveFunctionCall'):
-        n.recursive_function_calls = [n.text for n in node.callsNode.recursiveFunctionCall]
+    if node.recursive_function_calls is not None:
+        n.recursive_function_calls = node.recursive_function_calls
 
     if n.type == NodeType.CU:
-        if hasattr(node.localVariables, 'local'):
-            n.local_vars = [Variable(v.get('type'), v.text) for v in node.localVariables.local]
-        if hasattr(node.globalVariables, 'global'):
-            n.global_vars = [Variable(v.get('type'), v.text) for v in getattr(node.globalVariables, 'global')]
-        if hasattr(node, 'BasicBlockID'):
-            n.basic_block_id = getattr(node, 'BasicBlockID')
-        if hasattr(node, 'returnInstructions'):
-            n.return_instructions_count = int(getattr(node, 'returnInstructions').get('count'))
-        if hasattr(node.callsNode, 'nodeCalled'):
-            n.node_calls = [{"cuid": v.text,  "atLine": v.get('atLine')} for v in getattr(node.callsNode, 'nodeCalled') if v.get('atLine') is not None]
+        if node.local_vars:
+            n.local_vars = [Variable(v_type, v_name) for v_type, v_name in node.local_vars]
+        if node.global_vars:
+            n.global_vars = [Variable(v_type, v_name) for v_type, v_name in node.global_vars]
+        if node.basic_block_id is not None:
+            n.basic_block_id = node.basic_block_id
+        if node.return_instructions_count is not None:
+            n.return_instructions_count = node.return_instructions_count
+        if node.node_calls:
+            n.node_calls = [{"cuid": cuid, "atLine": at_line} for cuid, at_line in node.node_calls]
     return n
 
 
@@ -189,22 +520,470 @@ def parse_dependency(dep) -> Dependency:
     return d
 
 
+class AdjacencyArrays(object):
+    """Compressed sparse row representation of the child or successor edges of a graph.
+
+    Nodes are numbered densely in graph order. The edges of node i are edges[offsets[i]:offsets[i + 1]],
+    targets holds the dense index of their other end. Edges of a node keep the networkx order.
+    """
+    node_ids: List[str]
+    node_index: Dict[str, int]
+    offsets: np.ndarray
+    targets: np.ndarray
+    edges: List[Tuple[str, str, Dependency]]
+
+    def __init__(self, g: nx.MultiDiGraph, etype: EdgeType, outgoing: bool):
+        """
+        :param g: graph
+        :param etype: type of edges
+        :param outgoing: outgoing edges if true, incoming else
+        """
+        self.node_ids = list(g.nodes)
+        self.node_index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.edges = []
+        offsets = [0]
+        graph_edges = g.out_edges if outgoing else g.in_edges
+        for node_id in self.node_ids:
+            self.edges.extend(e for e in graph_edges(node_id, data='data') if e[2].etype == etype)
+            offsets.append(len(self.edges))
+        self.__offsets = offsets
+        self.offsets = np.array(offsets, dtype=np.int64)
+        other_ends = [t if outgoing else s for s, t, _ in self.edges]
+        self.targets = np.fromiter((self.node_index[n] for n in other_ends), dtype=np.int32, count=len(other_ends))
+        # nodes without data only exist for dangling child or successor ids
+        self.__neighbours: List[CUNode] = [g.nodes[n].get('data') for n in other_ends]
+
+    def edges_of(self, node_id: str) -> List[Tuple[str, str, Dependency]]:
+        """Edges of the node
+
+        :param node_id: id of the node
+        :return: new list of edges
+        """
+        i = self.node_index.get(node_id)
+        if i is None:
+            return []
+        return self.edges[self.__offsets[i]:self.__offsets[i + 1]]
+
+    def neighbours_of(self, node_id: str) -> List[CUNode]:
+        """Nodes at the other end of the edges of the node
+
+        :param node_id: id of the node
+        :return: new list of nodes
+        """
+        i = self.node_index.get(node_id)
+        if i is None:
+            return []
+        return self.__neighbours[self.__offsets[i]:self.__offsets[i + 1]]
+
+
+class SubtreeIndex(object):
+    """Pre-order numbering of the nodes along the child edges.
+
+    A single depth-first search over the child edges, starting at all nodes without parent, numbers the nodes
+    in pre-order. The nodes found below the node at position p form the interval [p, end[p]) of the numbering.
+    Function nodes can be children of several nodes and recursion introduces cycles, thus the interval of a node
+    does not always contain its whole subtree. A node is closed, if no child edge leaves its interval. The subtree
+    of a closed node is exactly its interval, in the order of a depth-first search from the node.
+    Queries on closed nodes are answered by slicing, all others by a depth-first search that skips over
+    closed intervals.
+    """
+    position: Dict[str, int]
+    nodes: List[CUNode]
+    end: List[int]
+    closed: List[bool]
+
+    def __init__(self, adjacency: AdjacencyArrays, nodes: List[CUNode]):
+        """
+        :param adjacency: outgoing child edges
+        :param nodes: nodes by dense index of the adjacency
+        """
+        n = len(nodes)
+        offsets = adjacency.offsets.tolist()
+        targets = adjacency.targets.tolist()
+
+        # iterative depth-first search, visits the children in edge order like a recursive one
+        pre = [-1] * n
+        order: List[int] = []
+        end_of = [0] * n
+        has_parent = [False] * n
+        for t in targets:
+            has_parent[t] = True
+        for root in chain((i for i in range(n) if not has_parent[i]), range(n)):
+            if pre[root] >= 0:
+                continue
+            pre[root] = len(order)
+            order.append(root)
+            stack = [(root, offsets[root])]
+            while stack:
+                v, e = stack[-1]
+                if e == offsets[v + 1]:
+                    stack.pop()
+                    end_of[v] = len(order)
+                    continue
+                stack[-1] = (v, e + 1)
+                w = targets[e]
+                if pre[w] < 0:
+                    pre[w] = len(order)
+                    order.append(w)
+                    stack.append((w, offsets[w]))
+
+        self.position = {adjacency.node_ids[i]: pre[i] for i in range(n)}
+        self.nodes = [nodes[i] for i in order]
+        self.end = [end_of[i] for i in order]
+        # children by position
+        self.__child_offsets = [0]
+        self.__children: List[int] = []
+        for i in order:
+            self.__children.extend(pre[t] for t in targets[offsets[i]:offsets[i + 1]])
+            self.__child_offsets.append(len(self.__children))
+
+        # lowest and highest position reached by child edges from within the interval, nested intervals
+        # are aggregated from the back, the children in the search tree of p are p + 1, end[p + 1], ...
+        reach_lo = list(range(n))
+        reach_hi = list(range(n))
+        for p in range(n):
+            children = self.__children[self.__child_offsets[p]:self.__child_offsets[p + 1]]
+            if children:
+                reach_lo[p] = min(p, min(children))
+                reach_hi[p] = max(p, max(children))
+        self.closed = [False] * n
+        for p in range(n - 1, -1, -1):
+            lo, hi = reach_lo[p], reach_hi[p]
+            c = p + 1
+            while c < self.end[p]:
+                lo = min(lo, reach_lo[c])
+                hi = max(hi, reach_hi[c])
+                c = self.end[c]
+            reach_lo[p], reach_hi[p] = lo, hi
+            self.closed[p] = lo >= p and hi < self.end[p]
+
+        self.__positions_of_type: Dict[NodeType, List[int]] = {}
+        self.__nodes_of_type: Dict[NodeType, List[CUNode]] = {}
+        for p, node in enumerate(self.nodes):
+            if node is not None:
+                self.__positions_of_type.setdefault(node.type, []).append(p)
+                self.__nodes_of_type.setdefault(node.type, []).append(node)
+        # visited intervals of the searches from nodes which are not closed
+        self.__searched: Dict[int, Tuple[List[int], List[int]]] = {}
+
+    @staticmethod
+    def __overlaps(starts: List[int], ends: List[int], begin: int, end: int) -> bool:
+        i = bisect_right(ends, begin)
+        return i < len(starts) and starts[i] < end
+
+    @staticmethod
+    def __mark(starts: List[int], ends: List[int], begin: int, end: int):
+        """Adds [begin, end) to the sorted, disjoint intervals, merging touching ones"""
+        i = bisect_right(starts, begin)
+        if i > 0 and ends[i - 1] == begin:
+            ends[i - 1] = end
+            if i < len(starts) and starts[i] == end:
+                ends[i - 1] = ends.pop(i)
+                starts.pop(i)
+        elif i < len(starts) and starts[i] == end:
+            starts[i] = begin
+        else:
+            starts.insert(i, begin)
+            ends.insert(i, end)
+
+    def __search(self, root: int) -> List[int]:
+        """Depth-first search from the position, closed intervals without visited nodes are taken as a whole
+
+        :param root: position of the root
+        :return: positions in visiting order
+        """
+        starts: List[int] = []
+        ends: List[int] = []
+        res: List[int] = []
+
+        def enter(p: int) -> bool:
+            if self.closed[p] and not self.__overlaps(starts, ends, p, self.end[p]):
+                self.__mark(starts, ends, p, self.end[p])
+                res.extend(range(p, self.end[p]))
+                return False
+            self.__mark(starts, ends, p, p + 1)
+            res.append(p)
+            return True
+
+        if enter(root):
+            stack = [(root, self.__child_offsets[root])]
+            while stack:
+                p, e = stack[-1]
+                if e == self.__child_offsets[p + 1]:
+                    stack.pop()
+                    continue
+                stack[-1] = (p, e + 1)
+                c = self.__children[e]
+                if not self.__overlaps(starts, ends, c, c + 1) and enter(c):
+                    stack.append((c, self.__child_offsets[c]))
+        self.__searched[root] = (starts, ends)
+        return res
+
+    def subtree(self, root: CUNode, type: Optional[NodeType] = None) -> List[CUNode]:
+        """Nodes of the subtree of the root in depth-first order, including the root
+
+        :param root: root node
+        :param type: type of the nodes, None is equal to a wildcard
+        :return: new list of nodes
+        """
+        p = self.position.get(root.id)
+        if p is None:
+            return [root] if type is None or root.type == type else []
+        if not self.closed[p]:
+            return [n for n in (self.nodes[q] for q in self.__search(p)) if type is None or n.type == type]
+        if type is None:
+            return self.nodes[p:self.end[p]]
+        positions = self.__positions_of_type.get(type, [])
+        return self.__nodes_of_type.get(type, [])[bisect_left(positions, p):bisect_left(positions, self.end[p])]
+
+    def contains(self, root: CUNode, node: CUNode) -> bool:
+        """Checks whether the node is in the subtree of the root
+
+        :param root: root node
+        :param node: node
+        :return: true, if node is in the subtree of root
+        """
+        p = self.position.get(root.id)
+        q = self.position.get(node.id)
+        if p is None or q is None:
+            return root.id == node.id
+        if self.closed[p]:
+            return p <= q < self.end[p]
+        if p not in self.__searched:
+            self.__search(p)
+        starts, ends = self.__searched[p]
+        return self.__overlaps(starts, ends, q, q + 1)
+
+
+class LoopSummary(object):
+    """CU subtree and data dependencies of a loop, shared by the pattern detectors.
+    Computed once per loop by PETGraphX.loop_summary, the collections must not be modified.
+    """
+    loop: CUNode
+    cu_nodes: List[CUNode]
+    loops: List[CUNode]
+    loops_start_lines: List[str]
+    loop_indices: Set[Optional[str]]
+    written_vars: Set[Optional[str]]
+
+    def __init__(self, pet: 'PETGraphX', loop: CUNode):
+        """
+        :param pet: PET graph
+        :param loop: loop node
+        """
+        self.loop = loop
+        self.__pet = pet
+        self.cu_nodes = pet.subtree_of_type(loop, NodeType.CU)
+        self.loops = pet.subtree_of_type(loop, NodeType.LOOP)
+        self.loops_start_lines = [v.start_position() for v in self.loops]
+        self.loop_indices = pet.loop_index_variables(loop)
+        self.written_vars = self.__written_variables()
+        self.__out_deps: Optional[Dict[DepType, Set[Tuple[str, str, Dependency]]]] = None
+        self.__in_deps: Optional[Dict[DepType, Set[Tuple[str, str, Dependency]]]] = None
+
+    def __written_variables(self) -> Set[Optional[str]]:
+        """Variables written inside the loop body, i.e. outside of the loop headers.
+        War and waw sinks and reverse raw sources are always inside the loop. Computed on the dependency
+        table without materializing the dependencies.
+
+        :return: names of the written variables
+        """
+        store = self.__pet.dependencies
+        table = store.table
+        cu_ids = [v.id for v in self.cu_nodes]
+        headers = store.line_ids(self.loops_start_lines)
+
+        out_rows = store.rows_of_cus(cu_ids, True)
+        out_types = table[out_rows, DependencyStore.DEP_TYPE]
+        out_rows = out_rows[((out_types == DepType.WAR.value) | (out_types == DepType.WAW.value))
+                            & ~np.isin(table[out_rows, DependencyStore.SINK_LINE], headers)]
+        in_rows = store.rows_of_cus(cu_ids, False)
+        in_rows = in_rows[(table[in_rows, DependencyStore.DEP_TYPE] == DepType.RAW.value)
+                          & ~np.isin(table[in_rows, DependencyStore.SOURCE_LINE], headers)]
+        variables = np.unique(np.concatenate((table[out_rows, DependencyStore.VAR],
+                                              table[in_rows, DependencyStore.VAR])))
+        return {store.var_names[v] for v in variables.tolist()}
+
+    def __collect_deps(self, outgoing: bool) -> Dict[DepType, Set[Tuple[str, str, Dependency]]]:
+        edges = self.__pet.out_edges if outgoing else self.__pet.in_edges
+        deps: Dict[DepType, Set[Tuple[str, str, Dependency]]] = {dtype: set() for dtype in DepType}
+        for v in self.cu_nodes:
+            for dtype in DepType:
+                deps[dtype].update(edges(v.id, EdgeType.DATA, dtype))
+        return deps
+
+    @property
+    def out_deps(self) -> Dict[DepType, Set[Tuple[str, str, Dependency]]]:
+        """Data dependencies leaving the CUs of the loop by type, collected on first use"""
+        if self.__out_deps is None:
+            self.__out_deps = self.__collect_deps(True)
+        return self.__out_deps
+
+    @property
+    def in_deps(self) -> Dict[DepType, Set[Tuple[str, str, Dependency]]]:
+        """Data dependencies entering the CUs of the loop by type, collected on first use"""
+        if self.__in_deps is None:
+            self.__in_deps = self.__collect_deps(False)
+        return self.__in_deps
+
+
+class MainTraversal(object):
+    """Nodes in the order the depth-first search from main visits them, see PETGraphX.get_left_right_subtree.
+    The search does not depend on the node dividing the tree until it reaches that node, thus the left or
+    right subtree of every node is a prefix of the same visiting order.
+    """
+    nodes: List[CUNode]
+
+    def __init__(self, main: CUNode, children: Callable[[CUNode], List[CUNode]], right_subtree: bool):
+        """
+        :param main: start node of the search
+        :param children: direct children of a node
+        :param right_subtree: children are visited in reverse order if true
+        """
+        self.nodes = []
+        self.__first_visit: Dict[str, int] = {}
+        self.__cu_first_visit: Dict[str, int] = {}
+        # visited CU nodes and their number before each position
+        self.__cus: List[CUNode] = []
+        self.__cus_before: List[int] = [0]
+        stack = [main]
+        while stack:
+            current = stack.pop()
+            if current.id not in self.__first_visit:
+                self.__first_visit[current.id] = len(self.nodes)
+                if current.type == NodeType.CU:
+                    self.__cu_first_visit[current.id] = len(self.nodes)
+            self.nodes.append(current)
+            if current.type == NodeType.CU:
+                self.__cus.append(current)
+            self.__cus_before.append(len(self.__cus))
+
+            if self.__first_visit[current.id] < len(self.nodes) - 1:  # suppress looping
+                continue
+            stack.extend(children(current) if right_subtree else reversed(children(current)))
+
+    def __limit(self, target: CUNode) -> int:
+        return self.__first_visit.get(target.id, len(self.nodes))
+
+    def subtree(self, target: CUNode) -> List[CUNode]:
+        """CU nodes visited before the target, in visiting order. CU nodes visited repeatedly appear repeatedly.
+
+        :param target: node that divides the tree
+        :return: list of nodes in the subtree
+        """
+        return self.__cus[:self.__cus_before[self.__limit(target)]]
+
+    def subtree_ids(self, target: CUNode) -> 'TraversalPrefix':
+        """Ids of the CU nodes visited before the target, answered in constant time per node
+
+        :param target: node that divides the tree
+        :return: ids of the nodes in the subtree
+        """
+        return TraversalPrefix(self.__cu_first_visit, self.__limit(target))
+
+
+class TraversalPrefix(object):
+    """Ids of the CU nodes visited before a given position of a MainTraversal"""
+
+    def __init__(self, first_visit: Dict[str, int], limit: int):
+        """
+        :param first_visit: first visiting position by CU node id
+        :param limit: position of the first node not in the prefix
+        """
+        self.__first_visit = first_visit
+        self.__limit = limit
+
+    def __contains__(self, node_id: object) -> bool:
+        position = self.__first_visit.get(node_id) if isinstance(node_id, str) else None
+        return position is not None and position < self.__limit
+
+
+LAYOUT_PLANAR = 'planar'
+LAYOUT_HIERARCHICAL = 'hierarchical'
+# larger graphs are laid out hierarchically by default, planarity testing does not scale to them
+PLANAR_LAYOUT_MAX_NODES = 1000
+
+
 class PETGraphX(object):
     g: nx.MultiDiGraph
+    dependencies: DependencyStore
     reduction_vars: List[Dict[str, str]]
     main: CUNode
-    pos: Dict
 
-    def __init__(self, g: nx.MultiDiGraph, reduction_vars: List[Dict[str, str]], pos):
+    def __init__(self, g: nx.MultiDiGraph, reduction_vars: List[Dict[str, str]], pos: Optional[Dict] = None,
+                 dependencies: Optional[DependencyStore] = None):
+        """Data edges contained in g are moved into the dependency store
+
+        :param g: graph of CU nodes with child and successor edges
+        :param reduction_vars: reduction variables
+        :param pos: node positions for plotting, computed on first use if empty or None
+        :param dependencies: data dependencies between the nodes
+        """
+        if dependencies is None:
+            dependencies = DependencyStore()
+            data_edges = [(s, t, k, d) for s, t, k, d in g.edges(keys=True, data='data') if d.etype == EdgeType.DATA]
+            if data_edges:
+                g = g.copy()
+                for s, t, k, d in data_edges:
+                    dependencies.add(s, t, d.dtype, d.var_name, d.sink, d.source)
+                    g.remove_edge(s, t, k)
+        # one canonical node per id, numbered densely in graph order
+        for index, (node_id, node) in enumerate(g.nodes(data='data')):
+            if node is not None:
+                if node.id != node_id:
+                    raise ValueError(f"node {node_id} holds data of node {node.id}")
+                node.index = index
         self.g = g
+        self.dependencies = dependencies
         self.reduction_vars = reduction_vars
         for _, node in g.nodes(data='data'):
             if node.name == "main":
                 self.main = node
-        self.pos = pos
+        self._pos = pos if pos else None
+        # child and successor adjacency by (edge type, direction), built on first use
+        self._adjacency: Dict[Tuple[EdgeType, bool], AdjacencyArrays] = {}
+        # edges by (node id, direction, edge type, dependency type), built on first use per node and direction
+        self._edge_index: Dict[Tuple[str, bool, EdgeType, Optional[DepType]],
+                               Tuple[Tuple[str, str, Dependency], ...]] = {}
+        self._subtree_index: Optional[SubtreeIndex] = None
+        # summaries by loop id, computed on first use
+        self._loop_summaries: Dict[str, LoopSummary] = {}
+        # loop index variables by loop id, computed on first use
+        self._loop_index_table: Optional[Dict[str, Set[Optional[str]]]] = None
+        # total instructions and workload by node id, computed on first use
+        self._workloads: Optional[Dict[str, Tuple[int, int]]] = None
+        # depth-first search from main by direction, computed on first use
+        self._main_traversals: Dict[bool, MainTraversal] = {}
+        # variable classifications by region, computed on first use
+        self._classifications: Dict[Tuple, Tuple[List[Any], ...]] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_adjacency'] = {}
+        state['_edge_index'] = {}
+        state['_subtree_index'] = None
+        state['_loop_summaries'] = {}
+        state['_loop_index_table'] = None
+        state['_workloads'] = None
+        state['_main_traversals'] = {}
+        state['_classifications'] = {}
+        return state
+
+    def adjacency(self, etype: EdgeType, outgoing: bool = True) -> AdjacencyArrays:
+        """Array representation of the child or successor edges.
+        Built from the graph on first use, the graph must only be changed through PETGraphX afterwards.
+
+        :param etype: EdgeType.CHILD or EdgeType.SUCCESSOR
+        :param outgoing: outgoing edges if true, incoming else
+        :return: adjacency arrays
+        """
+        adjacency = self._adjacency.get((etype, outgoing))
+        if adjacency is None:
+            adjacency = self._adjacency[(etype, outgoing)] = AdjacencyArrays(self.g, etype, outgoing)
+        return adjacency
 
     @classmethod
-    def from_parsed_input(cls, cu_dict: Dict[str, ObjectifiedElement], dependencies_list: List[DependenceItem],
+    def from_parsed_input(cls, cu_dict: Dict[str, CUNodeRecord], dependencies_table: DependenceTable,
                           loop_data: Dict[str, int], reduction_vars: List[Dict[str, str]]):
         """Constructor for making a PETGraphX from the output of parser.parse_inputs()"""
         g = nx.MultiDiGraph()
@@ -215,55 +994,125 @@ class PETGraphX(object):
 
         for node_id, node in cu_dict.items():
             source = node_id
-            if 'childrenNodes' in dir(node):
-                for child in [n.text for n in node.childrenNodes]:
-                    if child not in g:
-                        print(f"WARNING: no child node {child} found")
-                    g.add_edge(source, child, data=Dependency(EdgeType.CHILD))
-            if 'successors' in dir(node) and 'CU' in dir(node.successors):
-                for successor in [n.text for n in node.successors.CU]:
-                    if successor not in g:
-                        print(f"WARNING: no successor node {successor} found")
-                    g.add_edge(source, successor, data=Dependency(EdgeType.SUCCESSOR))
+            for child in node.children:
+                if child not in g:
+                    print(f"WARNING: no child node {child} found")
+                g.add_edge(source, child, data=Dependency(EdgeType.CHILD))
+            for successor in node.successors:
+                if successor not in g:
+                    print(f"WARNING: no successor node {successor} found")
+                g.add_edge(source, successor, data=Dependency(EdgeType.SUCCESSOR))
 
         for _, node in g.nodes(data='data'):
             if node.type == NodeType.LOOP:
                 node.loop_iterations = loop_data.get(node.start_position(), 0)
 
-        # calculate position before dependencies affect them
+        # a dependency between lines is a dependency between the CUs reading the sink and writing the source
+        dependencies = DependencyStore()
+        no_cus: Set[str] = set()
+        dependencies.add_line_dependencies(
+            dependencies_table,
+            [[c for c in readlineToCUIdMap.get(line, no_cus) if c] for line in dependencies_table.lines],
+            [[c for c in writelineToCUIdMap.get(line, no_cus) if c] for line in dependencies_table.lines])
+
+        return cls(g, reduction_vars, None, dependencies)
+
+    @property
+    def pos(self) -> Dict:
+        """Node positions for plotting, computed on first use"""
+        if self._pos is None:
+            self._pos = self.layout()
+        return self._pos
+
+    def layout(self, method: Optional[str] = None) -> Dict:
+        """Computes node positions for plotting
+
+        :param method: LAYOUT_PLANAR or LAYOUT_HIERARCHICAL, None selects by the size of the graph
+        :return: positions by node id
+        """
+        if method is None:
+            method = LAYOUT_PLANAR if len(self.g) <= PLANAR_LAYOUT_MAX_NODES else LAYOUT_HIERARCHICAL
+        if method == LAYOUT_HIERARCHICAL:
+            return self.__hierarchical_layout()
+        if method != LAYOUT_PLANAR:
+            raise ValueError(f"unknown layout {method}")
         try:
-            pos = nx.planar_layout(g)  # good
+            return nx.planar_layout(self.g)  # good
         except nx.exception.NetworkXException:
             try:
                 # fallback layouts
-                pos = nx.shell_layout(g)  # maybe
+                return nx.shell_layout(self.g)  # maybe
                 # self.pos = nx.kamada_kawai_layout(self.graph) # maybe
             except nx.exception.NetworkXException:
-                pos = nx.random_layout(g)
-
-        for dep in dependencies_list:
-            if dep.type == 'INIT':
-                continue
+                return nx.random_layout(self.g)
 
-            sink_cu_ids = readlineToCUIdMap[dep.sink]
-            source_cu_ids = writelineToCUIdMap[dep.source]
-            for sink_cu_id in sink_cu_ids:
-                for source_cu_id in source_cu_ids:
-                    if sink_cu_id == source_cu_id and (dep.type == 'WAR' or dep.type == 'WAW'):
-                        continue
-                    elif sink_cu_id and source_cu_id:
-                        g.add_edge(sink_cu_id, source_cu_id, data=parse_dependency(dep))
-
-        return cls(g, reduction_vars, pos)
+    def __hierarchical_layout(self) -> Dict:
+        """Tree layout of the child hierarchy of every function, the functions are placed side by side.
+        Child edges to functions (calls) are not followed, thus every node is placed once in linear time.
 
-    def show(self):
+        :return: positions by node id
+        """
+        adjacency = self.adjacency(EdgeType.CHILD)
+        offsets = adjacency.offsets.tolist()
+        targets = adjacency.targets.tolist()
+        n = len(adjacency.node_ids)
+        is_function = [False] * n
+        has_parent = [False] * n
+        for i, node_id in enumerate(adjacency.node_ids):
+            node = self.g.nodes[node_id].get('data')
+            is_function[i] = node is not None and node.type == NodeType.FUNC
+        for t in targets:
+            has_parent[t] = True
+
+        x = [0.0] * n
+        y = [0.0] * n
+        # range of x of the children placed so far
+        lo = [inf] * n
+        hi = [-inf] * n
+        placed = [False] * n
+        next_x = 0.0
+        for root in chain((i for i in range(n) if is_function[i] or not has_parent[i]), range(n)):
+            if placed[root]:
+                continue
+            placed[root] = True
+            # post-order, leaves are placed next to each other and parents centered above their children
+            stack = [(root, offsets[root])]
+            while stack:
+                v, e = stack[-1]
+                if e < offsets[v + 1]:
+                    stack[-1] = (v, e + 1)
+                    w = targets[e]
+                    if not placed[w] and not is_function[w]:
+                        placed[w] = True
+                        y[w] = -len(stack)
+                        stack.append((w, offsets[w]))
+                    continue
+                stack.pop()
+                if lo[v] == inf:
+                    x[v] = next_x
+                    next_x += 1
+                else:
+                    x[v] = (lo[v] + hi[v]) / 2
+                if stack:
+                    parent = stack[-1][0]
+                    lo[parent] = min(lo[parent], x[v])
+                    hi[parent] = max(hi[parent], x[v])
+            # gap between functions
+            next_x += 1
+        return {node_id: np.array((x[i], y[i])) for i, node_id in enumerate(adjacency.node_ids)}
+
+    def show(self, layout: Optional[str] = None):
         """Plots the graph
 
+        :param layout: LAYOUT_PLANAR or LAYOUT_HIERARCHICAL, None uses the positions given on construction or
+            selects the layout by the size of the graph
         :return:
         """
+        import matplotlib.pyplot as plt  # imported on use, loading it dominates the startup time
+
         print("showing")
         plt.plot()
-        pos = self.pos
+        pos = self.pos if layout is None else self.layout(layout)
 
         # draw nodes
         nx.draw_networkx_nodes(self.g, pos=pos, node_color='#2B85FD', node_shape='o',
@@ -287,7 +1136,7 @@ class PETGraphX(object):
         nx.draw_networkx_edges(self.g, pos, edge_color='green',
                                edgelist=[e for e in self.g.edges(data='data') if e[2].etype == EdgeType.SUCCESSOR])
         nx.draw_networkx_edges(self.g, pos, edge_color='red',
-                               edgelist=[e for e in self.g.edges(data='data') if e[2].etype == EdgeType.DATA])
+                               edgelist=self.dependencies.edges(self.dependencies.all_rows()))
         plt.show()
         # plt.savefig('graphX.svg')
 
@@ -307,60 +1156,122 @@ class PETGraphX(object):
         """
         return [n[1] for n in self.g.nodes(data='data') if type is None or n[1].type == type]
 
-    def out_edges(self, node_id: str, etype: EdgeType = None) -> List[Tuple[str, str, Dependency]]:
+    def out_edges(self, node_id: str, etype: EdgeType = None,
+                  dtype: Optional[DepType] = None) -> Sequence[Tuple[str, str, Dependency]]:
         """Get outgoing edges of node of specified type
+        Typed edges are returned from the edge index, the returned sequence must not be modified.
+        Without type, child and successor edges are followed by the data edges.
 
         :param node_id: id of the source node
         :param etype: type of edges
+        :param dtype: type of dependency, None is equal to a wildcard
         :return: list of outgoing edges
         """
-        return [t for t in self.g.out_edges(node_id, data='data') if etype is None or t[2].etype == etype]
-
-    def in_edges(self, node_id: str, etype: EdgeType = None) -> List[Tuple[str, str, Dependency]]:
+        if etype is None:
+            return self.__untyped_edges(node_id, True, dtype)
+        edges = self._edge_index.get((node_id, True, etype, dtype))
+        if edges is None:
+            edges = self.__index_edges(node_id, True, etype, dtype)
+        return edges
+
+    def in_edges(self, node_id: str, etype: EdgeType = None,
+                 dtype: Optional[DepType] = None) -> Sequence[Tuple[str, str, Dependency]]:
         """Get incoming edges of node of specified type
+        Typed edges are returned from the edge index, the returned sequence must not be modified.
+        Without type, child and successor edges are followed by the data edges.
 
         :param node_id: id of the target node
         :param etype: type of edges
+        :param dtype: type of dependency, None is equal to a wildcard
         :return: list of incoming edges
         """
-        return [t for t in self.g.in_edges(node_id, data='data') if etype is None or t[2].etype == etype]
+        if etype is None:
+            return self.__untyped_edges(node_id, False, dtype)
+        edges = self._edge_index.get((node_id, False, etype, dtype))
+        if edges is None:
+            edges = self.__index_edges(node_id, False, etype, dtype)
+        return edges
+
+    def __untyped_edges(self, node_id: str, outgoing: bool,
+                        dtype: Optional[DepType]) -> List[Tuple[str, str, Dependency]]:
+        edges = list(self.g.out_edges(node_id, data='data') if outgoing else self.g.in_edges(node_id, data='data'))
+        edges.extend(self.dependencies.edges(self.dependencies.out_rows(node_id) if outgoing
+                                             else self.dependencies.in_rows(node_id)))
+        return edges if dtype is None else [e for e in edges if e[2].dtype == dtype]
+
+    def __index_edges(self, node_id: str, outgoing: bool, etype: EdgeType,
+                      dtype: Optional[DepType]) -> Tuple[Tuple[str, str, Dependency], ...]:
+        """Adds the edges of the node of the given type to the edge index, bucketed by dependency type
 
-    def subtree_of_type(self, root: CUNode, type: Optional[NodeType]) -> List[CUNode]:
-        """Gets all nodes in subtree of specified type including root
+        :param node_id: id of the node
+        :param outgoing: outgoing edges if true, incoming else
+        :param etype: type of edges
+        :param dtype: type of dependency of the requested bucket
+        :return: requested bucket
+        """
+        if etype is EdgeType.DATA:
+            rows = self.dependencies.out_rows(node_id) if outgoing else self.dependencies.in_rows(node_id)
+            edges = tuple(self.dependencies.edges(rows))
+        else:
+            edges = tuple(self.adjacency(etype, outgoing).edges_of(node_id))
+        self._edge_index[(node_id, outgoing, etype, None)] = edges
+        for dep_type in DepType:
+            self._edge_index[(node_id, outgoing, etype, dep_type)] = tuple(e for e in edges if e[2].dtype == dep_type)
+        return self._edge_index[(node_id, outgoing, etype, dtype)]
 
-        :param root: root node
-        :param type: type of children, None is equal to a wildcard
-        :return: list of nodes in subtree
+    def remove_node(self, node_id: str):
+        """Removes the node together with all its edges
+
+        :param node_id: id of the node
+        """
+        self.g.remove_node(node_id)
+        self.dependencies.remove_cu(node_id)
+        self._adjacency.clear()
+        self._edge_index.clear()
+        self._subtree_index = None
+        self._loop_summaries.clear()
+        self._loop_index_table = None
+        self._workloads = None
+        self._main_traversals.clear()
+        self._classifications.clear()
+
+    def loop_summary(self, loop: CUNode) -> LoopSummary:
+        """Summary of the subtree and the data dependencies of the loop, computed on first use
+
+        :param loop: loop node
+        :return: summary of the loop
         """
-        return self.__subtree_of_type_rec(root, type, set())
+        summary = self._loop_summaries.get(loop.id)
+        if summary is None:
+            summary = LoopSummary(self, loop)
+            self._loop_summaries[loop.id] = summary
+        return summary
+
+    @property
+    def subtree_index(self) -> SubtreeIndex:
+        """Pre-order index of the child hierarchy, built on first use"""
+        if self._subtree_index is None:
+            adjacency = self.adjacency(EdgeType.CHILD)
+            self._subtree_index = SubtreeIndex(adjacency, [self.g.nodes[n].get('data') for n in adjacency.node_ids])
+        return self._subtree_index
 
-    def __subtree_of_type_rec(self, root: CUNode, type: Optional[NodeType], visited: Set[CUNode]) -> List[CUNode]:
+    def subtree_of_type(self, root: CUNode, type: Optional[NodeType]) -> List[CUNode]:
         """Gets all nodes in subtree of specified type including root
 
         :param root: root node
         :param type: type of children, None is equal to a wildcard
-        :param visited: set of visited nodes
         :return: list of nodes in subtree
         """
-        res: List[CUNode] = []
-        for visited_cu in visited:
-            if self.__cu_equal__(root, visited_cu):
-                return res
-        visited.add(root)
-        if root.type == type or type is None:
-            res.append(root)
-        for s, t, e in self.out_edges(root.id, EdgeType.CHILD):
-            res.extend(self.__subtree_of_type_rec(self.node_at(t), type, visited))
-        return res
+        return self.subtree_index.subtree(root, type)
 
-    def __cu_equal__(self, cu_1: CUNode, cu_2: CUNode):
-        """Alternative to CUNode.__eq__, bypasses the isinstance-check and relies on MyPy for type safety.
-        :param cu_1: CUNode 1
-        :param cu_2: CUNode 2
-        :return: True, if cu_1 == cu_2. False, else"""
-        if cu_1.id == cu_2.id:
-            return True
-        return False
+    def is_in_subtree(self, node: CUNode, root: CUNode) -> bool:
+        """Checks whether the node is contained in the subtree of root
+
+        :param node: node
+        :param root: root of the subtree
+        :return: true, if node is in the subtree
+        """
+        return self.subtree_index.contains(root, node)
 
     def direct_successors(self, root: CUNode) -> List[CUNode]:
         """Gets only direct successors of any type
@@ -368,7 +1279,7 @@ class PETGraphX(object):
         :param root: root node
         :return: list of direct successors
         """
-        return [self.node_at(t) for s, t, d in self.out_edges(root.id, EdgeType.SUCCESSOR)]
+        return self.adjacency(EdgeType.SUCCESSOR).neighbours_of(root.id)
 
     def direct_children(self, root: CUNode) -> List[CUNode]:
         """Gets only direct children of any type
@@ -376,7 +1287,7 @@ class PETGraphX(object):
         :param root: root node
         :return: list of direct children
         """
-        return [self.node_at(t) for s, t, d in self.out_edges(root.id, EdgeType.CHILD)]
+        return self.adjacency(EdgeType.CHILD).neighbours_of(root.id)
 
     def direct_children_of_type(self, root: CUNode, type: NodeType) -> List[CUNode]:
         """Gets only direct children of specified type
@@ -385,8 +1296,7 @@ class PETGraphX(object):
         :param type: type of children
         :return: list of direct children
         """
-        return [self.node_at(t) for s, t, d in self.out_edges(root.id, EdgeType.CHILD)
-                if self.node_at(t).type == type]
+        return [n for n in self.adjacency(EdgeType.CHILD).neighbours_of(root.id) if n.type == type]
 
     def is_reduction_var(self, line: str, name: str) -> bool:
         """Determines, whether or not the given variable is reduction variable
@@ -434,6 +1344,50 @@ class PETGraphX(object):
                 return True
         return False
 
+    def sibling_dependencies(self, nodes: List[CUNode], root_loop: Optional[CUNode] = None) -> List[int]:
+        """Matrix of the RAW dependencies between the subtrees of the nodes, computed in one pass over the
+        dependencies of each subtree instead of one pass per pair of nodes. Every subtree is assigned a bit,
+        row i is the bitset of all j such that a CU in the subtree of nodes[i] has a RAW dependency into the
+        subtree of nodes[j]. With root_loop, bit j of row i equals depends_ignore_readonly(nodes[i], nodes[j],
+        root_loop), otherwise it equals utils.depends(pet, nodes[i], nodes[j]).
+
+        :param nodes: nodes, usually the children of a node
+        :param root_loop: loop whose loop index and read-only variables are ignored
+        :return: bitset per node
+        """
+        target_type = None if root_loop is None else NodeType.CU
+        # bits of the subtrees containing a node
+        member: Dict[str, int] = {}
+        for j, node in enumerate(nodes):
+            bit = 1 << j
+            for v in self.subtree_of_type(node, target_type):
+                member[v.id] = member.get(v.id, 0) | bit
+        written_vars: Set[Optional[str]] = set()
+        ignored_vars: Set[Optional[str]] = set()
+        if root_loop is not None:
+            summary = self.loop_summary(root_loop)
+            written_vars = summary.written_vars
+            ignored_vars = summary.loop_indices
+
+        res = []
+        for node in nodes:
+            reached = 0
+            for v in self.subtree_of_type(node, NodeType.CU):
+                for s, t, d in self.out_edges(v.id, EdgeType.DATA, DepType.RAW):
+                    if root_loop is not None and (d.var_name in ignored_vars or d.var_name not in written_vars):
+                        continue
+                    reached |= member.get(t, 0)
+            res.append(reached)
+
+        if root_loop is None:
+            # a node never depends on itself
+            positions: Dict[str, int] = {}
+            for j, node in enumerate(nodes):
+                positions[node.id] = positions.get(node.id, 0) | 1 << j
+            for i, node in enumerate(nodes):
+                res[i] &= ~positions[node.id]
+        return res
+
     def get_all_dependencies(self, node: CUNode, root_loop: CUNode) -> Set[CUNode]:
         """Returns all data dependencies of the node and it's children
         This method ignores loop index and read only variables
@@ -442,20 +1396,183 @@ class PETGraphX(object):
         :param root_loop: root loop
         :return: list of all RAW dependencies of the node
         """
+        summary = self.loop_summary(root_loop)
         dep_set = set()
-        children = self.subtree_of_type(node, NodeType.CU)
-
-        loops_start_lines = [v.start_position() for v in self.subtree_of_type(root_loop, NodeType.LOOP)]
-
-        for v in children:
-            for t, d in [(t, d) for s, t, d in self.out_edges(v.id, EdgeType.DATA) if d.dtype == DepType.RAW]:
-                if (self.is_loop_index(d.var_name, loops_start_lines, self.subtree_of_type(root_loop, NodeType.CU))
-                        or self.is_readonly_inside_loop_body(d, root_loop)):
+        for v in self.subtree_of_type(node, NodeType.CU):
+            for s, t, d in self.out_edges(v.id, EdgeType.DATA, DepType.RAW):
+                if d.var_name in summary.loop_indices or d.var_name not in summary.written_vars:
                     continue
                 dep_set.add(self.node_at(t))
 
         return dep_set
 
+    def loop_index_variables(self, loop: CUNode) -> Set[Optional[str]]:
+        """Loop index variables of the loop and its nested loops.
+        The table for all loops is built on first use, the returned set must not be modified.
+
+        :param loop: loop node
+        :return: names of the loop index variables
+        """
+        if self._loop_index_table is None:
+            self._loop_index_table = self.__build_loop_index_table()
+        return self._loop_index_table.get(loop.id, set())
+
+    def is_loop_index_of(self, loop: CUNode, var_name: Optional[str]) -> bool:
+        """Checks, whether the variable is a loop index of the loop or one of its nested loops
+
+        :param loop: loop node
+        :param var_name: name of the variable
+        :return: true if variable is a loop index
+        """
+        return var_name in self.loop_index_variables(loop)
+
+    def total_instructions_count(self, node: CUNode) -> int:
+        """Number of instructions in the child hierarchy of the node.
+        The instructions of a CU are added to those of its children, i.e. of the functions it calls. A function
+        called several times is counted once per call. Dummy nodes count nothing.
+        A call closing a recursion, i.e. to a node whose value is being computed, counts nothing. The values of
+        all nodes are computed in one post-order traversal starting at the nodes in graph order, thus the node
+        through which the traversal enters a recursion cycle includes the other nodes of the cycle, but they do
+        not include it.
+
+        :param node: root node
+        :return: number of instructions
+        """
+        if self._workloads is None:
+            self._workloads = self.__compute_workloads()
+        return self._workloads.get(node.id, (0, 0))[0]
+
+    def workload(self, node: CUNode) -> int:
+        """Workload of the node, i.e. the number of instructions in its child hierarchy weighted by the
+        iterations of the enclosing loops. Within a loop, the workload of a child is multiplied by the iterations
+        of the loop, except for the CUs of the loop condition (iterations + 1) and increment (once).
+        Called functions and recursion are handled like in total_instructions_count.
+
+        :param node: root node
+        :return: workload
+        """
+        if self._workloads is None:
+            self._workloads = self.__compute_workloads()
+        return self._workloads.get(node.id, (0, 0))[1]
+
+    def __compute_workloads(self) -> Dict[str, Tuple[int, int]]:
+        """Post-order pass over the child hierarchy computing the instructions and the workload of every node
+        from those of its children. Loop bodies are weighted by the iterations of the loop, the loop
+        condition is executed once more and the increment once in total. Calls closing a recursion
+        contribute nothing.
+
+        :return: instructions and workload by node id
+        """
+        result: Dict[str, Tuple[int, int]] = {}
+        on_stack: Set[str] = set()
+        for root in self.all_nodes():
+            if root.id in result:
+                continue
+            children = self.direct_children(root)
+            stack: List[Tuple[CUNode, List[CUNode], List[CUNode]]] = [(root, children, children[:])]
+            on_stack.add(root.id)
+            while stack:
+                node, children, pending = stack[-1]
+                # descend into the next child not computed yet
+                while pending and (pending[-1].id in result or pending[-1].id in on_stack):
+                    pending.pop()
+                if pending:
+                    child = pending.pop()
+                    grandchildren = self.direct_children(child)
+                    stack.append((child, grandchildren, grandchildren[:]))
+                    on_stack.add(child.id)
+                    continue
+
+                stack.pop()
+                on_stack.discard(node.id)
+                result[node.id] = self.__node_workload(node, children, result)
+        return result
+
+    @staticmethod
+    def __node_workload(node: CUNode, children: List[CUNode], result: Dict[str, Tuple[int, int]]) -> Tuple[int, int]:
+        """Instructions and workload of the node from those of its children
+
+        :param node: node
+        :param children: direct children of the node
+        :param result: instructions and workload of the computed nodes
+        :return: instructions and workload
+        """
+        if node.type == NodeType.DUMMY:
+            return 0, 0
+        instructions = max(node.instructions_count, 0) if node.type == NodeType.CU else 0
+        workload = instructions
+        iterations = max(node.loop_iterations, 0)
+        for child in children:
+            child_instructions, child_workload = result.get(child.id, (0, 0))
+            instructions += child_instructions
+            if node.type != NodeType.LOOP:
+                workload += child_workload
+            elif child.type != NodeType.CU:
+                workload += child_workload * iterations
+            elif 'for.inc' in child.basic_block_id:
+                workload += child_workload
+            elif 'for.cond' in child.basic_block_id:
+                workload += child_workload * (iterations + 1)
+            else:
+                workload += child_workload * iterations
+        return instructions, workload
+
+    def __build_loop_index_table(self) -> Dict[str, Set[Optional[str]]]:
+        """Single pass over the raw dependencies whose sink equals the source.
+        If such a dependency occurs in the header of a loop, its variable is a loop index of every loop
+        containing the header loop as well as both CUs of the dependency.
+
+        :return: loop index variables by loop id
+        """
+        loops = self.all_nodes(NodeType.LOOP)
+        table: Dict[str, Set[Optional[str]]] = {loop.id: set() for loop in loops}
+        loops_by_start_line: Dict[str, List[CUNode]] = {}
+        for loop in loops:
+            loops_by_start_line.setdefault(loop.start_position(), []).append(loop)
+
+        store = self.dependencies
+        rows = store.table
+        self_raw = np.flatnonzero((rows[:, DependencyStore.DEP_TYPE] == DepType.RAW.value)
+                                  & (rows[:, DependencyStore.SINK_LINE] == rows[:, DependencyStore.SOURCE_LINE]))
+        # loops containing the header loops of a line
+        enclosing_loops: Dict[str, List[CUNode]] = {}
+        for sink_cu, source_cu, var, line in rows[self_raw][:, [DependencyStore.SINK_CU, DependencyStore.SOURCE_CU,
+                                                               DependencyStore.VAR, DependencyStore.SINK_LINE]].tolist():
+            line_str = store.lines[line]
+            if line_str not in loops_by_start_line:
+                continue
+            if line_str not in enclosing_loops:
+                enclosing_loops[line_str] = self.__enclosing_loops(loops_by_start_line[line_str])
+            sink_id, source_id = store.cu_ids[sink_cu], store.cu_ids[source_cu]
+            if sink_id not in self.g or source_id not in self.g:
+                continue
+            sink, source = self.node_at(sink_id), self.node_at(source_id)
+            if sink.type != NodeType.CU or source.type != NodeType.CU:
+                continue
+            for loop in enclosing_loops[line_str]:
+                if self.is_in_subtree(sink, loop) and self.is_in_subtree(source, loop):
+                    table[loop.id].add(store.var_names[var])
+        return table
+
+    def __enclosing_loops(self, loops: List[CUNode]) -> List[CUNode]:
+        """Loops containing one of the given loops in their subtree, including the given loops
+
+        :param loops: loop nodes
+        :return: list of loop nodes
+        """
+        visited = {loop.id for loop in loops}
+        stack = [loop.id for loop in loops]
+        res = list(loops)
+        while stack:
+            for parent_id, _, _ in self.in_edges(stack.pop(), EdgeType.CHILD):
+                if parent_id not in visited:
+                    visited.add(parent_id)
+                    stack.append(parent_id)
+                    parent = self.g.nodes[parent_id].get('data')
+                    if parent is not None and parent.type == NodeType.LOOP:
+                        res.append(parent)
+        return res
+
     def is_loop_index(self, var_name: Optional[str], loops_start_lines: List[str], children: List[CUNode]) -> bool:
         """Checks, whether the variable is a loop index.
 
@@ -469,8 +1586,8 @@ class PETGraphX(object):
         # and the dependency occurs in loop header, then var is loop index+
 
         for c in children:
-            for t, d in [(t, d) for s, t, d in self.out_edges(c.id, EdgeType.DATA)
-                         if d.dtype == DepType.RAW and d.var_name == var_name]:
+            for t, d in [(t, d) for s, t, d in self.out_edges(c.id, EdgeType.DATA, DepType.RAW)
+                         if d.var_name == var_name]:
                 if (d.sink == d.source
                         and d.source in loops_start_lines
                         and self.node_at(t) in children):
@@ -485,26 +1602,7 @@ class PETGraphX(object):
         :param root_loop: root loop
         :return: true if variable is read-only in loop body
         """
-        # TODO pass as param?
-        loops_start_lines = [v.start_position() for v in self.subtree_of_type(root_loop, NodeType.LOOP)]
-        children = self.subtree_of_type(root_loop, NodeType.CU)
-
-        for v in children:
-            for t, d in [(t, d) for s, t, d in self.out_edges(v.id, EdgeType.DATA)
-                         if d.dtype == DepType.WAR or d.dtype == DepType.WAW]:
-                # If there is a waw dependency for var, then var is written in loop
-                # (sink is always inside loop for waw/war)
-                if (dep.var_name == d.var_name
-                        and not (d.sink in loops_start_lines)):
-                    return False
-            for t, d in [(t, d) for s, t, d in self.in_edges(v.id, EdgeType.DATA)
-                         if d.dtype == DepType.RAW]:
-                # If there is a reverse raw dependency for var, then var is written in loop
-                # (source is always inside loop for reverse raw)
-                if (dep.var_name == d.var_name
-                        and not (d.source in loops_start_lines)):
-                    return False
-        return True
+        return dep.var_name not in self.loop_summary(root_loop).written_vars
 
     def get_left_right_subtree(self, target: CUNode, right_subtree: bool) -> List[CUNode]:
         """Searches for all subnodes of main which are to the left or to the right of the specified node
@@ -513,27 +1611,42 @@ class PETGraphX(object):
         :param right_subtree: true - right subtree, false - left subtree
         :return: list of nodes in the subtree
         """
-        stack: List[CUNode] = [self.main]
-        res: List[CUNode] = []
-        visited = []
+        return self.main_traversal(right_subtree).subtree(target)
 
-        while stack:
-            current = stack.pop()
+    def left_right_subtree_ids(self, target: CUNode, right_subtree: bool) -> TraversalPrefix:
+        """Ids of the nodes returned by get_left_right_subtree, without building the list
 
-            if current == target:
-                return res
-            if current.type == NodeType.CU:
-                res.append(current)
-
-            if current in visited:  # suppress looping
-                continue
-            else:
-                visited.append(current)
+        :param target: node that divides the tree
+        :param right_subtree: true - right subtree, false - left subtree
+        :return: ids of the nodes in the subtree
+        """
+        return self.main_traversal(right_subtree).subtree_ids(target)
 
-            stack.extend(self.direct_children(current) if right_subtree
-                         else reversed(self.direct_children(current)))
+    def main_traversal(self, right_subtree: bool) -> MainTraversal:
+        """Depth-first search from main underlying get_left_right_subtree, computed on first use
 
-        return res
+        :param right_subtree: true - right subtree, false - left subtree
+        :return: visiting order of the search
+        """
+        traversal = self._main_traversals.get(right_subtree)
+        if traversal is None:
+            traversal = MainTraversal(self.main, self.direct_children, right_subtree)
+            self._main_traversals[right_subtree] = traversal
+        return traversal
+
+    def classification(self, key: Tuple, classify: Callable[[], Tuple[List[Any], ...]]) -> Tuple[List[Any], ...]:
+        """Variable classification of a region, computed on first use.
+        The key has to identify the region and everything else the classification depends on.
+
+        :param key: key of the classification
+        :param classify: computes the classification, a tuple of lists of variables
+        :return: copies of the lists, thus callers may modify them
+        """
+        result = self._classifications.get(key)
+        if result is None:
+            result = classify()
+            self._classifications[key] = result
+        return tuple(list(variables) for variables in result)
 
     def path(self, source: CUNode, target: CUNode) -> List[CUNode]:
         """DFS from source to target over edges of child type
@@ -6,30 +6,68 @@
 # the 3-Clause BSD License.  See the LICENSE file in the package base
 # directory for details.
 
+# The graph and the detectors are imported on first use, thus the command line interface starts
+# without loading networkx, numpy and lxml for --help or invalid arguments.
+import sys
+from importlib import import_module
 from pathlib import Path
-from typing import List, Optional
+from types import ModuleType
+from typing import TYPE_CHECKING, List, Optional
 
-from pluginbase import PluginBase  # type:ignore
-
-from .PETGraphX import PETGraphX
 from ._version import __version__
-from .parser import parse_inputs
-from .pattern_detection import DetectionResult, PatternDetectorX
+
+if TYPE_CHECKING:
+    from .parser import parse_inputs
+    from .pattern_detection import DetectionResult, PatternDetectorX
+
+
+class _LazyExportsModule(ModuleType):
+    """Package module importing the re-exported names of the detectors on first access.
+    Same as a module level __getattr__, which is only supported since Python 3.7.
+    """
+    lazy_exports = {
+        'DetectionResult': '.pattern_detection',
+        'PatternDetectorX': '.pattern_detection',
+        'parse_inputs': '.parser',
+    }
+
+    def __getattr__(self, name: str):
+        if name not in self.lazy_exports:
+            raise AttributeError(f"module {self.__name__!r} has no attribute {name!r}")
+        value = getattr(import_module(self.lazy_exports[name], self.__name__), name)
+        setattr(self, name, value)
+        return value
+
+
+sys.modules[__name__].__class__ = _LazyExportsModule
 
 
 def run(cu_xml: str, dep_file: str, loop_counter_file: str, reduction_file: str, plugins: List[str],
         file_mapping: Optional[str] = None, cu_inst_result_file: Optional[str] = None,
         llvm_cxxfilt_path: Optional[str] = None, discopop_build_path: Optional[str] = None,
-        enable_task_pattern: bool = False) -> DetectionResult:
-    pet = PETGraphX.from_parsed_input(*parse_inputs(cu_xml, dep_file,
-                                                    loop_counter_file, reduction_file))
+        enable_task_pattern: bool = False, cache_dir: Optional[str] = None,
+        jobs: int = 1, min_workload: Optional[int] = None, top_k: Optional[int] = None,
+        preprocessed_cu_xml: Optional[str] = None) -> 'DetectionResult':
+    from .pattern_detection import DetectionResult, PatternDetectorX
+    from .snapshot_cache import load_pet
+
+    cu_model = None
+    if enable_task_pattern:
+        from .pattern_detectors.task_parallelism.cu_model import CUModel
+
+        # parsed once, the PET graph is built from the nodes before the task parallelism detection preprocesses them
+        cu_model = CUModel(cu_xml)
+    pet = load_pet(cu_xml, dep_file, loop_counter_file, reduction_file, cache_dir, jobs, cu_model)
     # TODO add visualization
     # pet.show()
 
-    plugin_base = PluginBase(package='plugins')
+    if plugins:
+        from pluginbase import PluginBase  # type:ignore
+
+        plugin_base = PluginBase(package='plugins')
 
-    plugin_source = plugin_base.make_plugin_source(
-        searchpath=[Path(__file__).parent / 'plugins'])
+        plugin_source = plugin_base.make_plugin_source(
+            searchpath=[Path(__file__).parent / 'plugins'])
 
     for plugin_name in plugins:
         p = plugin_source.load_plugin(plugin_name)
@@ -40,7 +78,9 @@ def run(cu_xml: str, dep_file: str, loop_counter_file: str, reduction_file: str,
 
     res: DetectionResult = pattern_detector.detect_patterns(cu_xml, dep_file, loop_counter_file, reduction_file,
                                                             file_mapping, cu_inst_result_file, llvm_cxxfilt_path,
-                                                            discopop_build_path, enable_task_pattern)
+                                                            discopop_build_path, enable_task_pattern,
+                                                            min_workload, top_k, preprocessed_cu_xml, cache_dir,
+                                                            cu_model)
 
     for plugin_name in plugins:
         p = plugin_source.load_plugin(plugin_name)
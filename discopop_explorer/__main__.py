@@ -12,7 +12,8 @@ Usage:
     discopop_explorer [--path <path>] [--cu-xml <cuxml>] [--dep-file <depfile>] [--plugins <plugs>] \
 [--loop-counter <loopcount>] [--reduction <reduction>] [--json <json_out>] [--fmap <fmap>] \
 [--task-pattern] [--cu-inst-res <cuinstres>] [--llvm-cxxfilt-path <cxxfp>] \
-[--dp-build-path=<dpbuildpath>] [--generate-data-cu-inst <outputdir>]
+[--dp-build-path=<dpbuildpath>] [--generate-data-cu-inst <outputdir>] [--cache-dir <cachedir>] [--no-cache] [--jobs <jobs>] \
+[--min-workload <workload>] [--top-k <k>] [--preprocessed-cu-xml <preprocessed>]
 
 Options:
     --path=<path>               Directory with input data [default: ./]
@@ -32,6 +33,14 @@ Options:
     --generate-data-cu-inst=<outputdir>     Generates Data_CUInst.txt file and stores it in the given directory.
                                             Stops the regular execution of the discopop_explorer.
                                             Requires --cu-xml, --dep-file, --loop-counter, --reduction.
+    --cache-dir=<cachedir>      Directory for snapshots of the parsed input and demangled function names.
+                                Nothing is cached if not set.
+    --no-cache                  Neither read nor write snapshots, even if --cache-dir is set
+    --jobs=<jobs>               Number of processes parsing the dependencies file [default: 1]
+    --min-workload=<workload>   Only suggest patterns for loops and functions with at least this estimated workload
+    --top-k=<k>                 Only suggest patterns for the k loops and functions with the highest estimated workload
+    --preprocessed-cu-xml=<preprocessed>    Writes the CU xml file preprocessed by the task pattern detector
+                                            to the given file, for debugging.
     -h --help                   Show this screen
 """
 
@@ -41,11 +50,10 @@ import sys
 import time
 
 from docopt import docopt  # type:ignore
-from schema import Schema, Use, SchemaError  # type:ignore
+from schema import Schema, Use, Or, SchemaError  # type:ignore
 from pathlib import Path
 
-from . import run, __version__
-from .json_serializer import PatternInfoSerializer
+from ._version import __version__
 
 docopt_schema = Schema({
     '--path': Use(str),
@@ -61,6 +69,12 @@ docopt_schema = Schema({
     '--llvm-cxxfilt-path': Use(str),
     '--dp-build-path': Use(str),
     '--generate-data-cu-inst': Use(str),
+    '--cache-dir': Or(None, Use(str)),
+    '--no-cache': Use(bool),
+    '--jobs': Use(int),
+    '--min-workload': Or(None, Use(int)),
+    '--top-k': Or(None, Use(int)),
+    '--preprocessed-cu-xml': Or(None, Use(str)),
 })
 
 
@@ -90,6 +104,7 @@ def main():
     reduction_file = get_path(path, arguments['--reduction'])
     file_mapping = get_path(path, 'FileMapping.txt')
     cu_inst_result_file = get_path(path, arguments['--cu-inst-res'])
+    cache_dir = None if arguments['--no-cache'] else arguments['--cache-dir']
     if arguments['--dp-build-path'] != 'None':
         discopop_build_path=arguments['--dp-build-path']
     else:
@@ -111,17 +126,21 @@ def main():
                                      arguments['--generate-data-cu-inst'])
         sys.exit(0)
 
+    from . import run
     start = time.time()
 
     res = run(cu_xml, dep_file, loop_counter_file, reduction_file, plugins, file_mapping=file_mapping,
               cu_inst_result_file=cu_inst_result_file, llvm_cxxfilt_path=arguments['--llvm-cxxfilt-path'],
-              discopop_build_path=discopop_build_path, enable_task_pattern=arguments['--task-pattern'])
+              discopop_build_path=discopop_build_path, enable_task_pattern=arguments['--task-pattern'],
+              cache_dir=cache_dir, jobs=arguments['--jobs'], min_workload=arguments['--min-workload'],
+              top_k=arguments['--top-k'], preprocessed_cu_xml=arguments['--preprocessed-cu-xml'])
 
     end = time.time()
 
     if arguments['--json'] == 'None':
         print(str(res))
     else:
+        from .json_serializer import PatternInfoSerializer
         with open(arguments['--json'], 'w') as f:
             json.dump(res, f, indent=2, cls=PatternInfoSerializer)
 
@@ -91,9 +91,7 @@ def __output_dependencies_of_type(pet: PETGraphX, child_id: str, children_ids: L
     :param dep_type: type of dependency to be handled
     :param dep_identifier: identifier corresponding to the given dep_type (|RAW|, |WAR|, |WAW|)
     """
-    for dep in pet.in_edges(child_id, EdgeType.DATA):
-        if dep[2].dtype is not dep_type:
-            continue
+    for dep in pet.in_edges(child_id, EdgeType.DATA, dep_type):
         if dep[2].source is None or dep[2].var_name is None or dep[2].sink is None:
             continue
         # check if the CUid of the dep exists in children_ids
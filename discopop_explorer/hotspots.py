@@ -0,0 +1,48 @@
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+"""Selection of the loops and functions carrying the runtime weight of the program.
+
+The estimated workload of a node combines the instruction counts of its CUs with the iterations from the
+loop counter file, see PETGraphX.workload. The pattern detectors still analyze every node, but only build
+suggestions, i.e. classify the variables, for the selected hotspots.
+"""
+
+from typing import Optional, Set
+
+from .PETGraphX import PETGraphX, NodeType
+
+
+def select_hotspots(pet: PETGraphX, min_workload: Optional[int] = None,
+                    top_k: Optional[int] = None) -> Optional[Set[str]]:
+    """Selects the loops and functions with the highest estimated workload
+
+    :param pet: PET graph
+    :param min_workload: minimal workload of a hotspot, None for no threshold
+    :param top_k: maximal number of hotspots, None for no limit
+    :return: ids of the hotspots, None if every node is a hotspot
+    """
+    if min_workload is None and top_k is None:
+        return None
+    candidates = [node for node in pet.all_nodes() if node.type in (NodeType.LOOP, NodeType.FUNC)]
+    if min_workload is not None:
+        candidates = [node for node in candidates if pet.workload(node) >= min_workload]
+    if top_k is not None:
+        # stable, nodes of equal workload keep the graph order
+        candidates = sorted(candidates, key=pet.workload, reverse=True)[:max(top_k, 0)]
+    return {node.id for node in candidates}
+
+
+def is_hotspot(hotspots: Optional[Set[str]], node_id: str) -> bool:
+    """Checks whether suggestions should be built for the node
+
+    :param hotspots: result of select_hotspots
+    :param node_id: id of a loop or function
+    :return: true if the node is a hotspot or there is no selection
+    """
+    return hotspots is None or node_id in hotspots
@@ -7,60 +7,231 @@
 # directory for details.
 
 
+import gc
+import mmap
 import os
+import re
+from array import array
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
-from lxml import objectify  # type:ignore
+import numpy as np
+from lxml import etree  # type:ignore
 
 readlineToCUIdMap = defaultdict(set)  # Map to record which line belongs to read set of nodes. LID -> NodeIds
 writelineToCUIdMap = defaultdict(set)  # Map to record which line belongs to write set of nodes. LID -> NodeIds
 lineToCUIdMap = defaultdict(set)  # Map to record which line belongs to set of nodes. LID -> NodeIds
 
+# number of characters handed to the xml parser at once
+__FEED_CHUNK_SIZE = 1 << 20
+# lines containing the (possibly repeated) <Nodes> root tags, these are replaced by a single root element
+__ROOT_TAG_LINE = re.compile(r'^[^\n]*</?Nodes>\s*?(?:\n|\Z)', re.MULTILINE)
+# default size in bytes from which dependency files are parsed in parallel
+PARALLEL_DEP_FILE_MIN_SIZE = 1 << 24
+# number of chunks per worker process, smooths out differences in chunk parsing time
+__DEP_CHUNKS_PER_JOB = 4
 
-class DependenceItem(object):
-    def __init__(self, sink, source, type, var_name):
-        self.sink = sink
-        self.source = source
+
+class DependenceItem(NamedTuple):
+    sink: str
+    source: str
+    type: str
+    var_name: str
+
+
+# interned values of the lines, types and variable names and one row of codes per dependency, see DependenceTable
+EncodedDependencies = Tuple[List[str], List[str], List[str], array]
+
+
+class DependenceTable(object):
+    """Dependencies of the dependency file in file order, stored column-wise.
+    Lines, dependency types and variable names are interned, row i of table holds the sink line, source line,
+    type and variable name of the i-th dependency as indices into lines, types and var_names.
+    Iterating the table yields DependenceItems.
+    """
+    SINK, SOURCE, TYPE, VAR = range(4)
+
+    def __init__(self, chunks: Iterable[EncodedDependencies] = ()):
+        """Merges the separately encoded chunks of a dependency file
+
+        :param chunks: encoded dependencies of consecutive parts of the file
+        """
+        self.lines: List[str] = []
+        self.types: List[str] = []
+        self.var_names: List[str] = []
+        indices: Tuple[Dict[str, int], Dict[str, int], Dict[str, int]] = ({}, {}, {})
+        tables = [np.empty((0, 4), dtype=np.int32)]
+        for chunk in chunks:
+            # only the values of the chunk are interned in python, the codes are translated by numpy
+            lines, types, var_names = [np.array([index.setdefault(v, len(index)) for v in values], dtype=np.int32)
+                                       for values, index in zip(chunk[:3], indices)]
+            codes = np.frombuffer(chunk[3], dtype=np.int32).reshape(-1, 4)
+            tables.append(np.column_stack((lines[codes[:, self.SINK]], lines[codes[:, self.SOURCE]],
+                                           types[codes[:, self.TYPE]], var_names[codes[:, self.VAR]])))
+        for values, index in zip((self.lines, self.types, self.var_names), indices):
+            values.extend(index)
+        self.table: np.ndarray = np.concatenate(tables).astype(np.int32, copy=False)
+
+    def __len__(self):
+        return len(self.table)
+
+    def __iter__(self) -> Iterator[DependenceItem]:
+        lines, types, var_names = self.lines, self.types, self.var_names
+        for sink, source, dtype, var in self.table.tolist():
+            yield DependenceItem(lines[sink], lines[source], types[dtype], var_names[var])
+
+
+class CUNodeRecord(object):
+    """Compact representation of a single <Node> entry of the CU xml file.
+    Holds only the information required for the construction of the PET graph.
+    """
+    __slots__ = ('id', 'type', 'name', 'start_line', 'end_line', 'instructions_count', 'children', 'successors',
+                 'args', 'recursive_function_calls', 'local_vars', 'global_vars', 'basic_block_id',
+                 'return_instructions_count', 'node_calls')
+
+    def __init__(self, node_id: str, type: str, name: str, start_line: str, end_line: str):
+        self.id = node_id
         self.type = type
-        self.var_name = var_name
+        self.name = name
+        self.start_line = start_line
+        self.end_line = end_line
+        self.instructions_count = 0
+        self.children: List[str] = []
+        self.successors: List[str] = []
+        self.args: Optional[List[Tuple[str, str]]] = None
+        self.recursive_function_calls: Optional[List[str]] = None
+        self.local_vars: List[Tuple[str, str]] = []
+        self.global_vars: List[Tuple[str, str]] = []
+        self.basic_block_id: Optional[str] = None
+        self.return_instructions_count: Optional[int] = None
+        self.node_calls: List[Tuple[str, str]] = []
 
 
-def __parse_xml_input(xml_fd):
-    xml_content = ""
-    for line in xml_fd.readlines():
-        if not (line.rstrip().endswith('</Nodes>') or line.rstrip().endswith('<Nodes>')):
-            xml_content = xml_content + line
+def __text(element) -> str:
+    return element.text if element is not None and element.text is not None else ''
+
+
+def __variables(element, tag: str) -> List[Tuple[str, str]]:
+    return [(v.get('type'), v.text) for v in element.iterchildren(tag)]
+
+
+def __add_lines_to_map(line_map: Dict[str, Set[str]], node_id: str, lines) -> None:
+    for instruction_id in __text(lines).split(','):
+        line_map[instruction_id].add(node_id)
+
+
+def parse_cu_element(node) -> CUNodeRecord:
+    """Converts a <Node> element of the CU xml file into a compact record.
+    Updates the global line maps for CU nodes.
+
+    :param node: <Node> element
+    :return: record of the node
+    """
+    record = CUNodeRecord(node.get('id'), node.get('type'), node.get('name'),
+                          node.get('startsAtLine'), node.get('endsAtLine'))
+    is_cu = record.type == '0'
+
+    # single pass over the children of the element, every tag is only considered once
+    seen: Set[str] = set()
+    for child in node.iterchildren(tag=etree.Element):
+        tag = child.tag
+        if tag in seen:
+            continue
+        seen.add(tag)
+        if tag == 'childrenNodes':
+            children = __text(child)
+            record.children = children.split(',') if children else []
+        elif tag == 'successors':
+            record.successors = [__text(cu) for cu in child.iterchildren('CU')]
+        elif tag == 'funcArguments':
+            args = __variables(child, 'arg')
+            if args:
+                record.args = args
+        elif tag == 'callsNode':
+            recursive_calls = [v.text for v in child.iterchildren('recursiveFunctionCall')]
+            if recursive_calls:
+                record.recursive_function_calls = recursive_calls
+            if is_cu:
+                record.node_calls = [(v.text, v.get('atLine')) for v in child.iterchildren('nodeCalled')
+                                     if v.get('atLine') is not None]
+        elif not is_cu:
+            continue
+        elif tag == 'instructionLines':
+            __add_lines_to_map(lineToCUIdMap, record.id, child)
+        elif tag == 'writePhaseLines':
+            __add_lines_to_map(writelineToCUIdMap, record.id, child)
+        elif tag == 'readPhaseLines':
+            __add_lines_to_map(readlineToCUIdMap, record.id, child)
+        elif tag == 'localVariables':
+            record.local_vars = __variables(child, 'local')
+        elif tag == 'globalVariables':
+            record.global_vars = __variables(child, 'global')
+        elif tag == 'BasicBlockID':
+            record.basic_block_id = __text(child)
+        elif tag == 'instructionsCount':
+            record.instructions_count = int(__text(child))
+        elif tag == 'returnInstructions':
+            record.return_instructions_count = int(child.get('count'))
+    return record
+
 
-    xml_content = "<Nodes>{0}</Nodes>".format(xml_content)
+def read_cu_xml_chunks(xml_fd) -> Iterator[str]:
+    """Reads the CU xml file in chunks to be fed to an xml parser.
+    The file may contain several <Nodes> root elements, they are replaced by a single one.
 
-    parsed_cu = objectify.fromstring(xml_content)
+    :param xml_fd: CU xml file
+    :return: chunks of the document
+    """
+    yield '<Nodes>'
+    while True:
+        data = xml_fd.read(__FEED_CHUNK_SIZE)
+        if not data:
+            break
+        # complete the last line, so the root tags can be removed line-wise
+        data += xml_fd.readline()
+        yield __ROOT_TAG_LINE.sub('', data)
+    yield '</Nodes>'
+
+
+def __parse_xml_input(xml_fd) -> Dict[str, CUNodeRecord]:
+    """Streams the CU xml file node by node.
+    Every <Node> element is converted into a compact record and discarded afterwards,
+    thus the whole document is never held in memory.
+
+    :param xml_fd: CU xml file
+    :return: dictionary of CU records
+    """
+    parser = etree.XMLPullParser(events=('end',), tag='Node', huge_tree=True)
     cu_dict = dict()
-    for node in parsed_cu.Node:
-        node.childrenNodes = str(node.childrenNodes).split(',') if node.childrenNodes else []
-        if node.get('type') == '0':
-            for instruction_id in str(node.instructionLines).split(','):
-                lineToCUIdMap[instruction_id].add(node.get('id'))
-            for instruction_id in str(node.writePhaseLines).split(','):
-                writelineToCUIdMap[instruction_id].add(node.get('id'))
-            for instruction_id in str(node.readPhaseLines).split(','):
-                readlineToCUIdMap[instruction_id].add(node.get('id'))
-
-        cu_dict[node.get('id')] = node
+
+    for data in read_cu_xml_chunks(xml_fd):
+        parser.feed(data)
+        for _, node in parser.read_events():
+            record = parse_cu_element(node)
+            cu_dict[record.id] = record
+            # drop processed element from the document
+            node.clear()
+            parent = node.getparent()
+            if parent is not None:
+                parent.remove(node)
+    parser.close()
 
     return cu_dict
 
 
-def __map_dummy_nodes(cu_dict):
+def __map_dummy_nodes(cu_dict: Dict[str, CUNodeRecord]) -> Dict[str, CUNodeRecord]:
     dummy_node_args_to_id_map = defaultdict(list)
     func_node_args_to_id_map = dict()
     dummy_to_func_ids_map = dict()
     for node_id, node in cu_dict.items():
-        if node.get('type') == '3' or node.get('type') == '1':
-            key = node.get('name')
-            if 'arg' in dir(node.funcArguments):
-                for i in node.funcArguments.arg:
-                    key = key + i.get('type')
-                if node.get('type') == '3':
+        if node.type == '3' or node.type == '1':
+            key = node.name
+            if node.args is not None:
+                for arg_type, _ in node.args:
+                    key = key + arg_type
+                if node.type == '3':
                     dummy_node_args_to_id_map[key].append(node_id)
                 else:
                     func_node_args_to_id_map[key] = node_id
@@ -75,42 +246,144 @@ def __map_dummy_nodes(cu_dict):
     # now go through all the nodes and update the mapped dummies to real funcs
     for node_id, node in cu_dict.items():
         # check dummy in all the children nodes
-        if 'childrenNodes' in dir(node):
-            for child_idx, child in enumerate(node.childrenNodes):
+        if node.children:
+            for child_idx, child in enumerate(node.children):
                 if child in dummy_to_func_ids_map:
-                    cu_dict[node_id].childrenNodes[child_idx] = dummy_to_func_ids_map[child]
+                    node.children[child_idx] = dummy_to_func_ids_map[child]
 
             # Also do the same in callLineToFunctionMap
-            if 'callsNode' in dir(node):
-                for idx, i in enumerate(node.callsNode.nodeCalled):
-                    if i in dummy_to_func_ids_map:
-                        cu_dict[node_id].callsNode.nodeCalled[idx] = dummy_to_func_ids_map[i]
+            node.node_calls = [(dummy_to_func_ids_map.get(called, called), at_line)
+                               for called, at_line in node.node_calls]
     return cu_dict
 
 
-def __parse_dep_file(dep_fd):
-    dependencies_list = []
-    for line in dep_fd.readlines():
+@contextmanager
+def __gc_paused():
+    """Pauses the garbage collector, creating millions of dependencies otherwise triggers many useless collections"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def __encode_dep_lines(lines: Iterable[str]) -> EncodedDependencies:
+    """Parses lines of the dependency file, the values are interned per call
+
+    :param lines: lines of the dependency file
+    :return: lines, types and variable names and the codes of the dependencies, four per dependency
+    """
+    line_index: Dict[str, int] = {}
+    type_index: Dict[str, int] = {}
+    var_index: Dict[str, int] = {}
+    codes = array('i')
+    for line in lines:
         dep_fields = line.split()
         if len(dep_fields) < 4 or dep_fields[1] != "NOM":
             continue
-        sink = dep_fields[0]
-        for dep_pair in list(zip(dep_fields[2:], dep_fields[3:]))[::2]:  # pairwise iteration over dependencies source
-            type = dep_pair[0]
-            source_fields = dep_pair[1].split('|')
+        sink = line_index.setdefault(dep_fields[0], len(line_index))
+        # pairwise iteration over the types and sources of the dependencies
+        for i in range(2, len(dep_fields) - 1, 2):
+            source_fields = dep_fields[i + 1].split('|')
             var_str = "" if len(source_fields) == 1 else source_fields[1]
-            dependencies_list.append(DependenceItem(sink, source_fields[0], type, var_str))
+            codes.extend((sink, line_index.setdefault(source_fields[0], len(line_index)),
+                          type_index.setdefault(dep_fields[i], len(type_index)),
+                          var_index.setdefault(var_str, len(var_index))))
+    return list(line_index), list(type_index), list(var_index), codes
+
+
+def __parse_dep_chunk(chunk: Tuple[str, int, int]) -> EncodedDependencies:
+    """Parses the lines of the dependency file within [start, end), executed by the worker processes.
+    The values are interned by the worker, thus only the distinct lines, types and variable names of the chunk and
+    an array of codes are transferred.
+
+    :param chunk: path of the dependency file, start and end offset
+    :return: encoded dependencies of the chunk
+    """
+    path, start, end = chunk
+    with __gc_paused(), open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return __encode_dep_lines(mm[start:end].decode().splitlines())
+
 
-    return dependencies_list
+def __dep_file_chunks(path: str, chunk_count: int) -> List[Tuple[str, int, int]]:
+    """Splits the dependency file into chunks of roughly equal size, chunks always end after a newline
 
+    :param path: path of the dependency file
+    :param chunk_count: number of chunks
+    :return: list of chunks (path, start offset, end offset)
+    """
+    chunks = []
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        start = 0
+        for i in range(1, chunk_count + 1):
+            end = size if i == chunk_count else max(start, size * i // chunk_count)
+            if end < size:
+                newline = mm.find(b'\n', end)
+                end = size if newline == -1 else newline + 1
+            if end > start:
+                chunks.append((path, start, end))
+            start = end
+    return chunks
 
-def parse_inputs(cu_file, dependencies, loop_counter, reduction_file):
+
+def __parse_dep_file(dep_file: str, jobs: int = 1,
+                     min_parallel_size: int = PARALLEL_DEP_FILE_MIN_SIZE) -> DependenceTable:
+    """Parses the dependency file.
+    Large files are split into chunks at line boundaries, which are parsed by a pool of jobs processes.
+    The dependencies are returned in file order, independent of the number of jobs.
+
+    :param dep_file: path of the dependency file
+    :param jobs: number of processes
+    :param min_parallel_size: files smaller than this number of bytes are always parsed sequentially
+    :return: dependencies
+    """
+    if jobs <= 1 or os.path.getsize(dep_file) < min_parallel_size:
+        with __gc_paused(), open(dep_file) as f:
+            return DependenceTable([__encode_dep_lines(f)])
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return DependenceTable(executor.map(__parse_dep_chunk,
+                                            __dep_file_chunks(dep_file, jobs * __DEP_CHUNKS_PER_JOB)))
+
+
+def parse_cu_nodes(nodes: Iterable) -> Dict[str, CUNodeRecord]:
+    """Converts already parsed <Node> elements into the records required for the construction of the PET graph.
+    Updates the global line maps like parsing the CU xml file does.
+
+    :param nodes: <Node> elements in document order
+    :return: dictionary of CU records, dummy nodes are mapped to their functions
+    """
+    cu_dict = dict()
+    for node in nodes:
+        record = parse_cu_element(node)
+        cu_dict[record.id] = record
+    return __map_dummy_nodes(cu_dict)
+
+
+def parse_inputs(cu_file, dependencies, loop_counter, reduction_file, jobs: int = 1,
+                 min_parallel_size: int = PARALLEL_DEP_FILE_MIN_SIZE):
     with open(cu_file) as f:
         cu_dict = __parse_xml_input(f)
     cu_dict = __map_dummy_nodes(cu_dict)
+    return (cu_dict, *parse_profiling_inputs(dependencies, loop_counter, reduction_file, jobs, min_parallel_size))
+
+
+def parse_profiling_inputs(dependencies, loop_counter, reduction_file, jobs: int = 1,
+                           min_parallel_size: int = PARALLEL_DEP_FILE_MIN_SIZE):
+    """Parses the dependency, loop counter and reduction files, i.e. all inputs of parse_inputs except for the
+    CU xml file
 
-    with open(dependencies) as f:
-        dependencies = __parse_dep_file(f)
+    :param dependencies: path of the dependency file
+    :param loop_counter: path of the loop counter file
+    :param reduction_file: path of the reduction file
+    :param jobs: number of processes parsing the dependency file
+    :param min_parallel_size: dependency files smaller than this number of bytes are always parsed sequentially
+    :return: dependencies, loop data and reduction variables
+    """
+    dependencies = __parse_dep_file(dependencies, jobs, min_parallel_size)
 
     if os.path.exists(loop_counter):
         loop_data = {}
@@ -144,4 +417,4 @@ def parse_inputs(cu_file, dependencies, loop_counter, reduction_file):
     else:
         reduction_vars = None
 
-    return cu_dict, dependencies, loop_data, reduction_vars
+    return dependencies, loop_data, reduction_vars
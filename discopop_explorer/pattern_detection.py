@@ -5,17 +5,19 @@
 # This software may be modified and distributed under the terms of
 # the 3-Clause BSD License.  See the LICENSE file in the package base
 # directory for details.
-from typing import List
+from typing import List, Optional, TYPE_CHECKING
 
 from .PETGraphX import PETGraphX, NodeType, EdgeType
+from .hotspots import select_hotspots
 from .pattern_detectors.do_all_detector import run_detection as detect_do_all, DoAllInfo
 from .pattern_detectors.geometric_decomposition_detector import run_detection as detect_gd, GDInfo
 from .pattern_detectors.pipeline_detector import run_detection as detect_pipeline, PipelineInfo
 from .pattern_detectors.reduction_detector import run_detection as detect_reduction, ReductionInfo
-from discopop_explorer.pattern_detectors.task_parallelism.task_parallelism_detector import build_preprocessed_graph_and_run_detection \
-    as detect_tp
 from .pattern_detectors.PatternInfo import PatternInfo
 
+if TYPE_CHECKING:
+    from .pattern_detectors.task_parallelism.cu_model import CUModel
+
 
 class DetectionResult(object):
     reduction: List[ReductionInfo]
@@ -57,24 +59,34 @@ class PatternDetectorX(object):
                         dummies_to_remove.add(t)
 
         for n in dummies_to_remove:
-            self.pet.g.remove_node(n)
+            self.pet.remove_node(n)
 
     def detect_patterns(self, cu_dict, dependencies, loop_data, reduction_vars, file_mapping, cu_inst_result_file,
-                        llvm_cxxfilt_path, discopop_build_path, enable_task_pattern):
-        """Runs pattern discovery on the CU graph
+                        llvm_cxxfilt_path, discopop_build_path, enable_task_pattern,
+                        min_workload: Optional[int] = None, top_k: Optional[int] = None,
+                        preprocessed_cu_xml: Optional[str] = None, cache_dir: Optional[str] = None,
+                        cu_model: Optional['CUModel'] = None):
+        """Runs pattern discovery on the CU graph.
+        With min_workload or top_k, suggestions are only built for the loops and functions with the highest
+        estimated workload. If preprocessed_cu_xml is given, the CU xml file preprocessed by the task parallelism
+        detection is written to it. The task parallelism detection keeps the demangled function names in
+        cache_dir and preprocesses cu_model, the parsed CU xml file, if given instead of parsing it again.
         """
         self.__merge(False, True)
 
         res = DetectionResult()
+        hotspots = select_hotspots(self.pet, min_workload, top_k)
 
         # reduction before doall!
-        res.reduction = detect_reduction(self.pet)
-        res.do_all = detect_do_all(self.pet)
-        res.pipeline = detect_pipeline(self.pet)
-        res.geometric_decomposition = detect_gd(self.pet)
+        res.reduction = detect_reduction(self.pet, hotspots)
+        res.do_all = detect_do_all(self.pet, hotspots)
+        res.pipeline = detect_pipeline(self.pet, hotspots)
+        res.geometric_decomposition = detect_gd(self.pet, hotspots)
 
         # check if task pattern should be enabled
         if enable_task_pattern:
+            from .pattern_detectors.task_parallelism.task_parallelism_detector import \
+                build_preprocessed_graph_and_run_detection as detect_tp
             res.task = detect_tp(cu_dict, dependencies, loop_data, reduction_vars, file_mapping, cu_inst_result_file,
-                                 llvm_cxxfilt_path, discopop_build_path)
+                                 llvm_cxxfilt_path, discopop_build_path, preprocessed_cu_xml, cache_dir, cu_model)
         return res
@@ -6,8 +6,9 @@
 # the 3-Clause BSD License.  See the LICENSE file in the package base
 # directory for details.
 import json
+from typing import Optional
 
-from ..PETGraphX import CUNode
+from ..PETGraphX import CUNode, PETGraphX
 
 
 class PatternInfo(object):
@@ -21,19 +22,18 @@ class PatternInfo(object):
     instructions_count: int
     workload: int
 
-    def __init__(self, node: CUNode):
+    def __init__(self, node: CUNode, pet: Optional[PETGraphX] = None):
         """
         :param node: node, where pipeline was detected
+        :param pet: PET graph, the instructions and the workload are only counted if given
         """
         self._node = node
         self.node_id = node.id
         self.start_line = node.start_position()
         self.end_line = node.end_position()
         self.iterations_count = node.loop_iterations
-        # TODO self.instructions_count = total_instructions_count(pet, node)
-        self.instructions_count = 0
-        self.workload = 0
-        # TODO self.workload = calculate_workload(pet, node)
+        self.instructions_count = 0 if pet is None else pet.total_instructions_count(node)
+        self.workload = 0 if pet is None else pet.workload(node)
 
     def to_json(self):
         dic = self.__dict__
@@ -5,10 +5,11 @@
 # This software may be modified and distributed under the terms of
 # the 3-Clause BSD License.  See the LICENSE file in the package base
 # directory for details.
-from typing import List, Dict, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from .PatternInfo import PatternInfo
-from ..PETGraphX import PETGraphX, CUNode, NodeType, EdgeType
+from ..PETGraphX import PETGraphX, CUNode, NodeType, EdgeType, DepType
+from ..hotspots import is_hotspot
 from ..utils import classify_loop_variables
 
 
@@ -21,7 +22,7 @@ class DoAllInfo(PatternInfo):
         :param pet: PET graph
         :param node: node, where do-all was detected
         """
-        PatternInfo.__init__(self, node)
+        PatternInfo.__init__(self, node, pet)
         fp, p, lp, s, r = classify_loop_variables(pet, node)
         self.first_private = fp
         self.private = p
@@ -44,37 +45,106 @@ class DoAllInfo(PatternInfo):
                f'last private: {[v.name for v in self.last_private]}'
 
 
-def run_detection(pet: PETGraphX) -> List[DoAllInfo]:
-    """Search for do-all loop pattern
+# CUs of a subtree and the targets of their RAW dependencies by variable
+SubtreeDependencies = Tuple[Set[str], Dict[Optional[str], Set[str]]]
+
+
+def run_detection(pet: PETGraphX, hotspots: Optional[Set[str]] = None) -> List[DoAllInfo]:
+    """Search for do-all loop pattern.
+    The loops are checked innermost first, the dependencies of a loop are composed of the dependencies of
+    its children, thus the subtree of a nested loop is only traversed once.
 
     :param pet: PET graph
+    :param hotspots: ids of the loops to build suggestions for, None for all loops
     :return: List of detected pattern info
     """
-    result = []
-    for node in pet.all_nodes(NodeType.LOOP):
-        if __detect_do_all(pet, node):
+    loops = pet.all_nodes(NodeType.LOOP)
+    position = pet.subtree_index.position
+    summaries: Dict[str, SubtreeDependencies] = {}
+    for node in sorted(loops, key=lambda loop: position.get(loop.id, -1), reverse=True):
+        if __detect_do_all(pet, node, summaries):
             node.do_all = True
-            if not node.reduction and node.loop_iterations > 0:
-                result.append(DoAllInfo(pet, node))
+
+    result = []
+    for node in loops:
+        if node.do_all and not node.reduction and node.loop_iterations > 0 and is_hotspot(hotspots, node.id):
+            result.append(DoAllInfo(pet, node))
 
     return result
 
 
-def __detect_do_all(pet: PETGraphX, root: CUNode) -> bool:
-    """Calculate do-all value for node
+def __subtree_dependencies(pet: PETGraphX, root: CUNode,
+                           summaries: Dict[str, SubtreeDependencies]) -> SubtreeDependencies:
+    """Collects the CUs of the subtree and their RAW dependencies. The subtrees of loops checked before are
+    taken from their summaries instead of being traversed again.
+
+    :param pet: PET graph
+    :param root: root of the subtree
+    :param summaries: dependencies of the subtrees of the loops checked so far
+    :return: CU ids and dependency targets by variable
+    """
+    if root.id in summaries:
+        return summaries[root.id]
+    cus: Set[str] = set()
+    deps: Dict[Optional[str], Set[str]] = {}
+    visited = {root.id}
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.id in summaries:
+            loop_cus, loop_deps = summaries[node.id]
+            cus.update(loop_cus)
+            for var_name, targets in loop_deps.items():
+                deps.setdefault(var_name, set()).update(targets)
+            continue
+        if node.type == NodeType.CU:
+            cus.add(node.id)
+            for s, t, d in pet.out_edges(node.id, EdgeType.DATA, DepType.RAW):
+                deps.setdefault(d.var_name, set()).add(t)
+        for child in pet.direct_children(node):
+            if child.id not in visited:
+                visited.add(child.id)
+                stack.append(child)
+    return cus, deps
+
+
+def __detect_do_all(pet: PETGraphX, root: CUNode, summaries: Dict[str, SubtreeDependencies]) -> bool:
+    """Calculate do-all value for node and store the dependencies of its subtree in the summaries
 
     :param pet: PET graph
     :param root: root node
+    :param summaries: dependencies of the subtrees of the loops checked so far
     :return: true if do-all
     """
     subnodes = [pet.node_at(t) for s, t, d in pet.out_edges(root.id, EdgeType.CHILD)]
+    subtrees = [__subtree_dependencies(pet, node, summaries) for node in subnodes]
+
+    # every subtree is assigned a bit, member holds the bits of the subtrees containing a CU
+    member: Dict[str, int] = {}
+    for j, (subtree_cus, _) in enumerate(subtrees):
+        for cu in subtree_cus:
+            member[cu] = member.get(cu, 0) | 1 << j
 
-    for i in range(0, len(subnodes)):
-        children_cache: Dict[CUNode, List[CUNode]] = dict()
-        dependency_cache: Dict[Tuple[CUNode, CUNode], Set[CUNode]] = dict()
-        for j in range(i, len(subnodes)):
-            if pet.depends_ignore_readonly(subnodes[i], subnodes[j], root, children_cache=children_cache,
-                                           dep_cache=dependency_cache):
-                return False
+    # loop index and read-only variables of the loop are ignored
+    loop_summary = pet.loop_summary(root)
+    do_all = True
+    for i, (_, subtree_deps) in enumerate(subtrees):
+        reached = 0
+        for var_name, targets in subtree_deps.items():
+            if var_name in loop_summary.loop_indices or var_name not in loop_summary.written_vars:
+                continue
+            for t in targets:
+                reached |= member.get(t, 0)
+        # no subnode may depend on itself or a later subnode
+        if reached >> i:
+            do_all = False
+            break
 
-    return True
+    cus: Set[str] = set()
+    deps: Dict[Optional[str], Set[str]] = {}
+    for subtree_cus, subtree_deps in subtrees:
+        cus.update(subtree_cus)
+        for var_name, targets in subtree_deps.items():
+            deps.setdefault(var_name, set()).update(targets)
+    summaries[root.id] = (cus, deps)
+    return do_all
@@ -8,10 +8,11 @@
 
 
 import math
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 
 from .PatternInfo import PatternInfo
 from ..PETGraphX import PETGraphX, NodeType, CUNode, EdgeType
+from ..hotspots import is_hotspot
 from ..utils import classify_task_vars, get_child_loops
 from ..variable import Variable
 
@@ -27,7 +28,7 @@ class GDInfo(PatternInfo):
         :param pet: PET graph
         :param node: node, where geometric decomposition was detected
         """
-        PatternInfo.__init__(self, node)
+        PatternInfo.__init__(self, node, pet)
 
         self.do_all_children, self.reduction_children = get_child_loops(pet, node)
 
@@ -73,10 +74,11 @@ class GDInfo(PatternInfo):
                f'\tlast private: {[v.name for v in self.last_private]}'
 
 
-def run_detection(pet: PETGraphX) -> List[GDInfo]:
+def run_detection(pet: PETGraphX, hotspots: Optional[Set[str]] = None) -> List[GDInfo]:
     """Detects geometric decomposition
 
     :param pet: PET graph
+    :param hotspots: ids of the functions to build suggestions for, None for all functions
     :return: List of detected pattern info
     """
     result = []
@@ -86,7 +88,7 @@ def run_detection(pet: PETGraphX) -> List[GDInfo]:
         if __detect_geometric_decomposition(pet, node):
             node.geometric_decomposition = True
             test, min_iter = __test_chunk_limit(pet, node)
-            if test and min_iter is not None:
+            if test and min_iter is not None and is_hotspot(hotspots, node.id):
                 result.append(GDInfo(pet, node, min_iter))
                 # result.append(node.id)
 
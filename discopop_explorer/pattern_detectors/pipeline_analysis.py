@@ -0,0 +1,93 @@
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+"""Scoring of pipeline candidates on the dependency matrix of their stages.
+
+Entry [i, j] of a dependency matrix is true if stage i depends on stage j, as computed by
+PETGraphX.sibling_dependencies. All functions work on NumPy boolean arrays without python loops
+over the matrix entries, thus loops with hundreds of stages are cheap to score.
+"""
+
+from typing import List
+
+import numpy as np
+
+from ..utils import correlation_coefficient
+
+
+def dependency_matrix(dependencies: List[int]) -> np.ndarray:
+    """Converts the bitsets of PETGraphX.sibling_dependencies to a boolean matrix
+
+    :param dependencies: bitset per stage, bit j of entry i is set if stage i depends on stage j
+    :return: n x n boolean matrix
+    """
+    n = len(dependencies)
+    size = (n + 7) // 8
+    data = b''.join(row.to_bytes(size, 'little') for row in dependencies)
+    # unpackbits yields the most significant bit of every byte first, bit j of a row is bit j % 8 of byte j // 8
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8).reshape(n, size, 1), axis=2)[:, :, ::-1]
+    return bits.reshape(n, size * 8)[:, :n].astype(bool)
+
+
+def pipeline_coefficient(matrix: np.ndarray) -> float:
+    """Correlation of the dependency matrix with an ideal pipeline, in which every stage depends on its
+    predecessor only
+
+    :param matrix: dependency matrix
+    :return: correlation coefficient
+    """
+    n = len(matrix)
+    graph_vector = np.diagonal(matrix, -1).astype(float)
+    pipeline_vector = np.ones(max(n - 1, 0))
+
+    # dependencies on later stages are weighted by their distance, the first stage depending on the last
+    # one does not count
+    rows, columns = np.nonzero(np.triu(matrix, 1))
+    distances = columns - rows
+    distances = distances[distances < n - 1]
+    if distances.size:
+        graph_vector = np.append(graph_vector, 1.0)
+        pipeline_vector = np.append(pipeline_vector, 1 - int(distances.max()) / (n - 1))
+    else:
+        graph_vector = np.append(graph_vector, 0.0)
+        pipeline_vector = np.append(pipeline_vector, 0.0)
+
+    return correlation_coefficient(graph_vector, pipeline_vector)
+
+
+def independent_rows(matrix: np.ndarray) -> List[int]:
+    """Stages that neither depend on another stage nor another stage on them
+
+    :param matrix: dependency matrix
+    :return: indices of the independent stages in ascending order
+    """
+    related = matrix | matrix.T
+    np.fill_diagonal(related, False)
+    return np.flatnonzero(~related.any(axis=1)).tolist()
+
+
+def mergeable_rows(matrix: np.ndarray) -> List[int]:
+    """Stages with the same dependencies as their predecessor, those can be merged into one stage.
+    The dependencies of the first stage on them are not compared.
+
+    :param matrix: dependency matrix
+    :return: indices of the mergeable stages in descending order
+    """
+    same_rows = (matrix[1:] == matrix[:-1]).all(axis=1)
+    same_columns = (matrix[1:, 1:] == matrix[1:, :-1]).all(axis=0)
+    return (np.flatnonzero(same_rows & same_columns) + 1)[::-1].tolist()
+
+
+def delete_rows(matrix: np.ndarray, rows: List[int]) -> np.ndarray:
+    """Removes the stages from the dependency matrix
+
+    :param matrix: dependency matrix
+    :param rows: indices of the stages
+    :return: dependency matrix of the remaining stages
+    """
+    return np.delete(np.delete(matrix, rows, axis=0), rows, axis=1)
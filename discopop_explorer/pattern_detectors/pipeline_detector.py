@@ -7,11 +7,13 @@
 # directory for details.
 
 
-from typing import List, Tuple, Dict, Set
+from typing import List, Optional, Set, Tuple
 
 from .PatternInfo import PatternInfo
+from .pipeline_analysis import dependency_matrix, pipeline_coefficient
 from ..PETGraphX import PETGraphX, NodeType, CUNode, EdgeType, DepType, Dependency
-from ..utils import correlation_coefficient, classify_task_vars
+from ..hotspots import is_hotspot
+from ..utils import classify_task_vars
 
 __pipeline_threshold = 0.9
 
@@ -56,11 +58,11 @@ class PipelineInfo(PatternInfo):
         :param pet: PET graph
         :param node: node, where pipeline was detected
         """
-        PatternInfo.__init__(self, node)
+        PatternInfo.__init__(self, node, pet)
         self._pet = pet
         self.coefficient = round(node.pipeline, 3)
 
-        children_start_lines = [v.start_position() for v in pet.subtree_of_type(node, NodeType.LOOP)]
+        children_start_lines = pet.loop_summary(node).loops_start_lines
 
         self._stages = [pet.node_at(t) for s, t, d in pet.out_edges(node.id, EdgeType.CHILD)
                         if is_pipeline_subnode(node, pet.node_at(t), children_start_lines)]
@@ -70,7 +72,7 @@ class PipelineInfo(PatternInfo):
     def __in_dep(self, node: CUNode):
         raw: List[Tuple[str, str, Dependency]] = []
         for n in self._pet.subtree_of_type(node, NodeType.CU):
-            raw.extend((s, t, d) for s, t, d in self._pet.out_edges(n.id, EdgeType.DATA) if d.dtype == DepType.RAW)
+            raw.extend(self._pet.out_edges(n.id, EdgeType.DATA, DepType.RAW))
 
         nodes_before = [node]
         for i in range(self._stages.index(node)):
@@ -81,7 +83,7 @@ class PipelineInfo(PatternInfo):
     def __out_dep(self, node: CUNode):
         raw: List[Tuple[str, str, Dependency]] = []
         for n in self._pet.subtree_of_type(node, NodeType.CU):
-            raw.extend((s, t, d) for s, t, d in self._pet.in_edges(n.id, EdgeType.DATA) if d.dtype == DepType.RAW)
+            raw.extend(self._pet.in_edges(n.id, EdgeType.DATA, DepType.RAW))
 
         nodes_after = [node]
         for i in range(self._stages.index(node) + 1, len(self._stages)):
@@ -121,34 +123,31 @@ def is_pipeline_subnode(root: CUNode, current: CUNode, children_start_lines: Lis
                 or c_start == c_end and c_start in children_start_lines)
 
 
-def run_detection(pet: PETGraphX) -> List[PipelineInfo]:
+def run_detection(pet: PETGraphX, hotspots: Optional[Set[str]] = None) -> List[PipelineInfo]:
     """Search for pipeline pattern on all the loops in the graph
 
     :param pet: PET graph
+    :param hotspots: ids of the loops to build suggestions for, None for all loops
     :return: List of detected pattern info
     """
     result = []
-    children_cache: Dict[CUNode, List[CUNode]] = dict()
-    dependency_cache: Dict[Tuple[CUNode, CUNode], Set[CUNode]] = dict()
     for node in pet.all_nodes(NodeType.LOOP):
-        node.pipeline = __detect_pipeline(pet, node, children_cache=children_cache, dep_cache=dependency_cache)
-        if node.pipeline > __pipeline_threshold:
+        node.pipeline = __detect_pipeline(pet, node)
+        if node.pipeline > __pipeline_threshold and is_hotspot(hotspots, node.id):
             result.append(PipelineInfo(pet, node))
 
     return result
 
 
-def __detect_pipeline(pet: PETGraphX, root: CUNode, children_cache=None, dep_cache=None) -> float:
+def __detect_pipeline(pet: PETGraphX, root: CUNode) -> float:
     """Calculate pipeline value for node
 
     :param pet: PET graph
     :param root: current node
-    :param children_cache: used to cache intermediate children
-    :param dep_cache: used to cache intermediate dependencies
     :return: Pipeline scalar value
     """
 
-    children_start_lines = [v.start_position() for v in pet.subtree_of_type(root, NodeType.LOOP)]
+    children_start_lines = pet.loop_summary(root).loops_start_lines
 
     loop_subnodes = [pet.node_at(t) for s, t, d in pet.out_edges(root.id, EdgeType.CHILD)
                      if is_pipeline_subnode(root, pet.node_at(t), children_start_lines)]
@@ -157,31 +156,4 @@ def __detect_pipeline(pet: PETGraphX, root: CUNode, children_cache=None, dep_cac
     if len(loop_subnodes) < 2:
         return 0
 
-    graph_vector = []
-    for i in range(0, len(loop_subnodes) - 1):
-        graph_vector.append(1.0 if pet.depends_ignore_readonly(loop_subnodes[i + 1], loop_subnodes[i], root,
-                                                               children_cache=children_cache,
-                                                               dep_cache=dep_cache) else 0.0)
-
-    pipeline_vector = []
-    for i in range(0, len(loop_subnodes) - 1):
-        pipeline_vector.append(1.0)
-
-    min_weight = 1.0
-    for i in range(0, len(loop_subnodes) - 1):
-        for j in range(i + 1, len(loop_subnodes)):
-            if pet.depends_ignore_readonly(loop_subnodes[i], loop_subnodes[j], root, children_cache=children_cache,
-                                           dep_cache=dep_cache):
-                # TODO whose corresponding entry in the graph matrix is nonzero?
-                node_weight = 1 - (j - i) / (len(loop_subnodes) - 1)
-                if min_weight > node_weight > 0:
-                    min_weight = node_weight
-
-    if min_weight == 1.0:
-        graph_vector.append(0.0)
-        pipeline_vector.append(0)
-    else:
-        graph_vector.append(1.0)
-        pipeline_vector.append(min_weight)
-
-    return correlation_coefficient(graph_vector, pipeline_vector)
+    return pipeline_coefficient(dependency_matrix(pet.sibling_dependencies(loop_subnodes, root)))
@@ -7,10 +7,11 @@
 # directory for details.
 
 
-from typing import List
+from typing import List, Optional, Set
 
 from .PatternInfo import PatternInfo
 from ..PETGraphX import PETGraphX, NodeType, CUNode
+from ..hotspots import is_hotspot
 from ..utils import is_reduction_var, classify_loop_variables
 
 
@@ -23,7 +24,7 @@ class ReductionInfo(PatternInfo):
         :param pet: PET graph
         :param node: node, where reduction was detected
         """
-        PatternInfo.__init__(self, node)
+        PatternInfo.__init__(self, node, pet)
         self.pragma = "#pragma omp parallel for"
 
         fp, p, lp, s, r = classify_loop_variables(pet, node)
@@ -45,10 +46,11 @@ class ReductionInfo(PatternInfo):
                f'last private: {[v.name for v in self.last_private]}'
 
 
-def run_detection(pet: PETGraphX) -> List[ReductionInfo]:
+def run_detection(pet: PETGraphX, hotspots: Optional[Set[str]] = None) -> List[ReductionInfo]:
     """Search for reduction pattern
 
     :param pet: PET graph
+    :param hotspots: ids of the loops to build suggestions for, None for all loops
     :return: List of detected pattern info
     """
     result = []
@@ -56,7 +58,7 @@ def run_detection(pet: PETGraphX) -> List[ReductionInfo]:
     for node in pet.all_nodes(NodeType.LOOP):
         if __detect_reduction(pet, node):
             node.reduction = True
-            if node.loop_iterations > 0:
+            if node.loop_iterations > 0 and is_hotspot(hotspots, node.id):
                 result.append(ReductionInfo(pet, node))
 
     return result
@@ -70,7 +72,7 @@ def __detect_reduction(pet: PETGraphX, root: CUNode) -> bool:
     :return: true if is reduction loop
     """
     all_vars = []
-    for node in pet.subtree_of_type(root, NodeType.CU):
+    for node in pet.loop_summary(root).cu_nodes:
         all_vars.extend(node.local_vars)
         all_vars.extend(node.global_vars)
 
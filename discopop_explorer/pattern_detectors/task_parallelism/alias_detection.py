@@ -3,7 +3,8 @@ import pathlib
 import re
 import subprocess
 from typing import Dict, List, Optional, Match, cast
-from lxml import objectify  # type: ignore
+
+from discopop_explorer.pattern_detectors.task_parallelism.cu_model import CUModel
 
 
 def __prune_statement(stmt_copy: str, statement: str, var_name: str, var_type: str) -> Optional[List[str]]:
@@ -234,20 +235,12 @@ def __add_alias_information(function_information_list: List[Dict], statements_fi
     return result_list
 
 
-def __get_function_information(cu_xml: str) -> List[Dict]:
-    """Extracts information on functions from given cu_xml file and stores it in a dictionary representation.
-    :param cu_xml: path to cu_xml file
+def __get_function_information(cu_model: CUModel) -> List[Dict]:
+    """Extracts information on functions from the parsed cu_xml file and stores it in a dictionary representation.
+    :param cu_model: parsed cu_xml file
     :return: List of dictionaries representing functions from cu_xml"""
-    with open(cu_xml) as xml_fd:
-        xml_content = ""
-        for line in xml_fd.readlines():
-            if not (line.rstrip().endswith('</Nodes>') or line.rstrip().endswith('<Nodes>')):
-                xml_content = xml_content + line
-    xml_content = "<Nodes>{0}</Nodes>".format(xml_content)
-    parsed_cu = objectify.fromstring(xml_content)
     function_information = []
-    for node in parsed_cu.Node:
-        node.childrenNodes = str(node.childrenNodes).split(',') if node.childrenNodes else []
+    for node in cu_model.nodes():
         if node.get('type') == '1':
             entry = dict()
             entry["name"] = node.get("name")
@@ -305,10 +298,10 @@ def __create_statements_file(file_mapping: str, output_file: str, application_pa
     os.rename(output_file + "_tmp", output_file)
 
 
-def get_alias_information(file_mapping: str, cu_xml: str, temp_file: str, build_path: str) -> str:
+def get_alias_information(file_mapping: str, cu_model: CUModel, temp_file: str, build_path: str) -> str:
     """Gather simple alias information for every file in filemapping and return the results in string format.
     :param file_mapping: path to filemapping-file
-    :param cu_xml: path to cu_xml file
+    :param cu_model: parsed cu_xml file
     :param temp_file: path to temporary file(s)
     :param build_path: path to discopop build directory
     :return: string, containing found aliases for each function"""
@@ -317,8 +310,6 @@ def get_alias_information(file_mapping: str, cu_xml: str, temp_file: str, build_
 
     if not os.path.isfile(file_mapping):
         raise ValueError(f"File not found: \"{file_mapping}\"")
-    if not os.path.isfile(cu_xml):
-        raise ValueError(f"File not found: \"{cu_xml}\"")
 
     # remove output file if it already exists
     if os.path.exists(temp_file + "_statements"):
@@ -330,7 +321,7 @@ def get_alias_information(file_mapping: str, cu_xml: str, temp_file: str, build_
                              str(pathlib.Path(build_path).joinpath('rtlib', 'simple-alias-detection',
                                                                    'getStatements')))
     # get function information file
-    function_information = __get_function_information(cu_xml)
+    function_information = __get_function_information(cu_model)
     # add alias information to function_information
     function_information = __add_alias_information(function_information, temp_file + "_statements")
     # create alias output file
@@ -3,7 +3,6 @@ from typing import List, Optional
 
 from discopop_explorer.PETGraphX import CUNode, MWType, PETGraphX
 from discopop_explorer.pattern_detectors.PatternInfo import PatternInfo
-from discopop_explorer.utils import total_instructions_count, calculate_workload
 
 
 class Task(object):
@@ -25,8 +24,8 @@ class Task(object):
         self.region_end_line = None
         self.end_line = node.end_position()
         self.mw_type = node.mw_type
-        self.instruction_count = total_instructions_count(pet, node)
-        self.workload = calculate_workload(pet, node)
+        self.instruction_count = pet.total_instructions_count(node)
+        self.workload = pet.workload(node)
         self.child_tasks = []
 
     def aggregate(self, other: 'Task'):
@@ -0,0 +1,40 @@
+from typing import Dict, Iterator, List, Tuple
+
+from lxml import objectify  # type: ignore
+
+from discopop_explorer.parser import CUNodeRecord, DependenceTable, parse_cu_nodes, parse_profiling_inputs, \
+    read_cu_xml_chunks
+
+
+class CUModel(object):
+    """Parsed contents of a CU xml file, shared by all steps of the task parallelism detection.
+    The file is parsed once, the PET graphs, the variable definition lines and the function information
+    are all derived from the same element tree.
+    """
+
+    def __init__(self, cu_xml: str):
+        """Parses the CU xml file chunk by chunk, the file may contain several <Nodes> root elements.
+        :param cu_xml: path to the CU xml file"""
+        self.cu_xml = cu_xml
+        # the CU xml files of large programs exceed the default size limits of libxml2
+        parser = objectify.makeparser(remove_blank_text=True, huge_tree=True)
+        with open(cu_xml) as xml_fd:
+            for data in read_cu_xml_chunks(xml_fd):
+                parser.feed(data)
+        self.root = parser.close()
+
+    def nodes(self) -> Iterator:
+        """Iterates over the <Node> elements in document order
+        :return: iterator over the elements"""
+        return self.root.iterchildren('Node')
+
+    def graph_input(self, dep_file: str, loop_counter_file: str, reduction_file: str, jobs: int = 1) \
+            -> Tuple[Dict[str, CUNodeRecord], DependenceTable, Dict[str, int], List[Dict[str, str]]]:
+        """Input for PETGraphX.from_parsed_input, equivalent to parser.parse_inputs on the CU xml file
+        :param dep_file: path to the dependency file
+        :param loop_counter_file: path to the loop counter file
+        :param reduction_file: path to the reduction file
+        :param jobs: number of processes parsing the dependency file
+        :return: CU records, dependencies, loop data and reduction variables"""
+        return (parse_cu_nodes(self.nodes()),
+                *parse_profiling_inputs(dep_file, loop_counter_file, reduction_file, jobs))
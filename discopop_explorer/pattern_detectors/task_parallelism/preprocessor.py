@@ -1,208 +1,186 @@
 import copy
-import os
-from typing import List
+from collections import deque
+from typing import Deque, Dict, List, Optional
 
-from lxml import objectify, etree  # type: ignore
+from lxml import etree  # type: ignore
 
 from discopop_explorer.PETGraphX import NodeType, PETGraphX
 
+from discopop_explorer.pattern_detectors.task_parallelism.cu_model import CUModel
 from discopop_explorer.pattern_detectors.task_parallelism.tp_utils import line_contained_in_region
 
 
-def cu_xml_preprocessing(cu_xml: str) -> str:
+def cu_xml_preprocessing(cu_model: CUModel, preprocessed_cu_xml: Optional[str] = None) -> int:
     """Execute CU XML Preprocessing.
-    Returns file name of modified cu xml file.
-    :param cu_xml: path to the xml file
-    :return: file name of modified cu xml file.
+    Modifies the parsed cu xml file in place, the graph for the task parallelism detection is built from the result.
+    Every CU containing at least two recursive function calls is split at its recursive calls. Splits only modify
+    the split CU, the newly created CU and the parent function, thus only the split CU has to be re-examined.
+    :param cu_model: parsed cu xml file
+    :param preprocessed_cu_xml: path to write the modified cu xml file to for debugging purposes, None to skip writing
+    :return: number of splits
     """
-    xml_fd = open(cu_xml)
-    xml_content = ""
-    for line in xml_fd.readlines():
-        if not (line.rstrip().endswith('</Nodes>') or line.rstrip().endswith('<Nodes>')):
-            xml_content = xml_content + line
-
-    xml_content = "<Nodes>{0}</Nodes>".format(xml_content)
-
-    parsed_cu = objectify.fromstring(xml_content)
-
-    iterate_over_cus = True  # used to enable re-starting
-    self_added_node_ids: List[str] = []
-    while iterate_over_cus:
-        used_node_ids = []
-        for node in parsed_cu.Node:
-            used_node_ids.append(node.get("id"))
-
-        for node in parsed_cu.Node:
-            inner_iteration = True
-            remaining_recursive_call_in_parent = False
-            while inner_iteration:
-                used_node_ids = list(set(used_node_ids + self_added_node_ids))
-
-                if node.get('type') == '0':  # iterate over CU nodes
-                    # find CU nodes with > 1 recursiveFunctionCalls in own code region
-                    if __preprocessor_cu_contains_at_least_two_recursive_calls(
-                            node) or remaining_recursive_call_in_parent:
-                        remaining_recursive_call_in_parent = False
-                        # Preprocessor Step 1
-                        tmp_cn_entry = None  # (recursiveFunctionCall, nodeCalled)
-                        for cne_idx, calls_node_entry in enumerate(node.callsNode):
-                            # get first matching entry of node.callsNode
-                            try:
-                                for rc_idx, rec_call in enumerate(calls_node_entry.recursiveFunctionCall):
-                                    rec_call_line = calls_node_entry.nodeCalled[rc_idx].get("atLine")
-                                    if str(rec_call_line) in str(rec_call):
-                                        tmp_cn_entry = (rec_call, calls_node_entry.nodeCalled[rc_idx])
-                                        break
-                            except AttributeError:
-                                continue
-                        if tmp_cn_entry is None:
-                            raise Exception("no matching entries for callsNode found!")
-
-                        parent = node
-                        tmp_cn_entry[0].getparent().remove(tmp_cn_entry[0])
-                        tmp_cn_entry[1].getparent().remove(tmp_cn_entry[1])
-                        parent_copy = copy.copy(parent)
-                        parsed_cu.insert(parsed_cu.index(parent), parent_copy)
-
-                        # Preprocessor Step 2 - generate cu id for new element
-                        __generate_new_cu_id(parent, parent_copy, used_node_ids, self_added_node_ids)
-
-                        # Preprocessor Step 3
-                        parent_copy.callsNode.clear()
-                        parent_copy.callsNode.append(tmp_cn_entry[1])
-                        parent_copy.callsNode.append(tmp_cn_entry[0])
-
-                        parent_copy.successors.clear()
-                        etree.SubElement(parent_copy.successors, "CU")
-                        parent_copy.successors.CU._setText(parent.get("id"))
-
-                        # delete childrenNodes-entry from parent
-                        tmp_cu_id = tmp_cn_entry[1].text
-                        parent.childrenNodes._setText(parent.childrenNodes.text.replace(tmp_cu_id + ",", ""))
-                        parent.childrenNodes._setText(parent.childrenNodes.text.replace(tmp_cu_id, ""))
-
-                        # set parent_copy.childrenNodes
-                        __set_parent_copy_childrennodes(parent_copy)
-
-                        # Preprocessor Step 4
-                        __remove_overlapping_start_and_end_lines(parent_copy, parent.instructionLines)
-                        __remove_overlapping_start_and_end_lines(parent_copy, parent.readPhaseLines)
-                        __remove_overlapping_start_and_end_lines(parent_copy, parent.writePhaseLines)
-
-                        separator_line = parent.get("startsAtLine")
-                        # select smallest recursive function call line >= separator_line + 1
-                        parent_new_start_line = None
-                        potential_lines = []
-                        for tmp1 in parent.callsNode:
-                            try:
-                                for tmp2 in tmp1.nodeCalled:
-                                    try:
-                                        potential_lines.append(tmp2.get("atLine"))
-                                        pass
-                                    except AttributeError:
-                                        pass
-                            except AttributeError:
-                                pass
-                        for tmp in potential_lines:
-                            if tmp == "":
-                                continue
-                            if int(tmp[tmp.find(":") + 1:]) >= int(separator_line[separator_line.find(":") + 1:]) + 1:
-                                if parent_new_start_line is None:
-                                    parent_new_start_line = tmp
-                                    continue
-                                # select smallest instruction line
-                                if int(tmp[tmp.find(":") + 1:]) < int(
-                                        parent_new_start_line[parent_new_start_line.find(":") + 1:]):
-                                    parent_new_start_line = tmp
-                        if not potential_lines or (potential_lines and not parent_new_start_line):
-                            parent_new_start_line = str(separator_line[:separator_line.index(":")])
-                            parent_new_start_line += ":"
-                            parent_new_start_line += str(int(separator_line[separator_line.index(":") + 1:]) + 1)
-
-                        parent.set("startsAtLine", parent_new_start_line)
-                        parent_copy.set("endsAtLine", separator_line)
-
-                        # update instruction/readPhase/writePhase lines
-                        __filter_rwi_lines(parent_copy, parent_copy.instructionLines)
-                        __filter_rwi_lines(parent_copy, parent_copy.readPhaseLines)
-                        __filter_rwi_lines(parent_copy, parent_copy.writePhaseLines)
-
-                        # insert separator line to parent_copys instruction,
-                        # read and writePhaseLines if not already present
-                        __insert_separator_line(parent_copy, parent_copy.instructionLines)
-                        __insert_separator_line(parent_copy, parent_copy.readPhaseLines)
-                        __insert_separator_line(parent_copy, parent_copy.writePhaseLines)
-
-                        # insert all lines contained in parent to instruction, read and writePhaseLines
-                        __insert_missing_rwi_lines(parent, parent.instructionLines)
-                        __insert_missing_rwi_lines(parent, parent.readPhaseLines)
-                        __insert_missing_rwi_lines(parent, parent.writePhaseLines)
-
-                        # remove returnInstructions if they are not part of the cus anymore
-                        __remove_unnecessary_return_instructions(parent_copy)
-                        __remove_unnecessary_return_instructions(parent)
-
-                        # add parent.id to parent_function.childrenNodes
-                        __add_parent_id_to_children(parsed_cu, parent)
-
-                        # Preprocessor Step 5 (looping)
-                        parent_further_cn_entry = None
-                        for cne_idx, calls_node_entry in enumerate(parent.callsNode):
-                            # get first matching entry of node.callsNode
-                            try:
-                                for rc_idx, rec_call in enumerate(calls_node_entry.recursiveFunctionCall):
-                                    rec_call_line = calls_node_entry.nodeCalled[rc_idx].get("atLine")
-                                    if str(rec_call_line) in str(rec_call):
-                                        parent_further_cn_entry = (rec_call, calls_node_entry.nodeCalled[rc_idx])
-                                        break
-                            except AttributeError:
-                                continue
-                        if parent_further_cn_entry is None:
-                            # parent has no further recursive call, restart outer loop
-                            inner_iteration = False
-                            continue
-                        else:
-                            # parent still has recursive calls
-                            inner_iteration = True
-                            node = parent
-                            remaining_recursive_call_in_parent = True
-                            continue
-                    else:
-                        inner_iteration = False
-                        continue
-                else:
-                    # node not of type CU, go to next node
-                    inner_iteration = False
-                    continue
-
-        iterate_over_cus = False  # disable restarting, preprocessing finished
-
-    # print modified Data.xml to file
-    modified_cu_xml = cu_xml.replace(".xml", "-preprocessed.xml")
-    if os.path.exists(modified_cu_xml):
-        os.remove(modified_cu_xml)
-    f = open(modified_cu_xml, "w+")
-    f.write(etree.tostring(parsed_cu, pretty_print=True).decode("utf-8"))
-    f.close()
-    return modified_cu_xml
-
-
-def __generate_new_cu_id(parent, parent_copy, used_node_ids, self_added_node_ids):
+    parsed_cu = cu_model.root
+    # highest used cu id per file id
+    max_node_ids: Dict[str, int] = dict()
+    functions = []
+    worklist: Deque = deque()
+    for node in cu_model.nodes():
+        file_id, _, node_index = node.get("id").partition(":")
+        max_node_ids[file_id] = max(max_node_ids.get(file_id, int(node_index)), int(node_index))
+        if node.get('type') == '1':
+            functions.append(node)
+        # iterate over CU nodes
+        elif node.get('type') == '0' and __preprocessor_cu_contains_at_least_two_recursive_calls(node):
+            worklist.append(node)
+
+    splits = 0
+    while worklist:
+        node = worklist.popleft()
+        # Preprocessor Step 1
+        tmp_cn_entry = __get_recursive_call_entry(node)  # (recursiveFunctionCall, nodeCalled)
+        if tmp_cn_entry is None:
+            raise Exception("no matching entries for callsNode found!")
+        __split_cu(parsed_cu, node, tmp_cn_entry, max_node_ids, functions)
+        splits += 1
+
+        # Preprocessor Step 5 (looping)
+        if __get_recursive_call_entry(node) is not None:
+            # parent still has recursive calls
+            worklist.appendleft(node)
+
+    if preprocessed_cu_xml is not None:
+        # print modified Data.xml to file
+        with open(preprocessed_cu_xml, "w") as f:
+            f.write(etree.tostring(parsed_cu, pretty_print=True).decode("utf-8"))
+    return splits
+
+
+def __get_recursive_call_entry(node):
+    """Searches the callsNode entries of node for a recursive function call and the matching nodeCalled entry.
+    :param node: cu node
+    :return: tuple (recursiveFunctionCall, nodeCalled) of the last callsNode entry containing one, or None"""
+    result = None
+    for cne_idx, calls_node_entry in enumerate(node.callsNode):
+        # get first matching entry of node.callsNode
+        try:
+            for rc_idx, rec_call in enumerate(calls_node_entry.recursiveFunctionCall):
+                rec_call_line = calls_node_entry.nodeCalled[rc_idx].get("atLine")
+                if str(rec_call_line) in str(rec_call):
+                    result = (rec_call, calls_node_entry.nodeCalled[rc_idx])
+                    break
+        except AttributeError:
+            continue
+    return result
+
+
+def __split_cu(parsed_cu, node, tmp_cn_entry, max_node_ids: Dict[str, int], functions: List):
+    """Moves the given recursive function call of node into a new cu, which is inserted in front of node.
+    The new cu takes over the id of node, node gets the next free id.
+    :param parsed_cu: parsed contents of cu_xml file
+    :param node: cu node to be split
+    :param tmp_cn_entry: tuple (recursiveFunctionCall, nodeCalled) to be moved into the new cu
+    :param max_node_ids: highest used cu id per file id, will be updated
+    :param functions: function nodes of parsed_cu"""
+    parent = node
+    tmp_cn_entry[0].getparent().remove(tmp_cn_entry[0])
+    tmp_cn_entry[1].getparent().remove(tmp_cn_entry[1])
+    parent_copy = copy.copy(parent)
+    parsed_cu.insert(parsed_cu.index(parent), parent_copy)
+
+    # Preprocessor Step 2 - generate cu id for new element
+    __generate_new_cu_id(parent, parent_copy, max_node_ids)
+
+    # Preprocessor Step 3
+    parent_copy.callsNode.clear()
+    parent_copy.callsNode.append(tmp_cn_entry[1])
+    parent_copy.callsNode.append(tmp_cn_entry[0])
+
+    parent_copy.successors.clear()
+    etree.SubElement(parent_copy.successors, "CU")
+    parent_copy.successors.CU._setText(parent.get("id"))
+
+    # delete childrenNodes-entry from parent
+    tmp_cu_id = tmp_cn_entry[1].text
+    parent.childrenNodes._setText(parent.childrenNodes.text.replace(tmp_cu_id + ",", ""))
+    parent.childrenNodes._setText(parent.childrenNodes.text.replace(tmp_cu_id, ""))
+
+    # set parent_copy.childrenNodes
+    __set_parent_copy_childrennodes(parent_copy)
+
+    # Preprocessor Step 4
+    __remove_overlapping_start_and_end_lines(parent_copy, parent.instructionLines)
+    __remove_overlapping_start_and_end_lines(parent_copy, parent.readPhaseLines)
+    __remove_overlapping_start_and_end_lines(parent_copy, parent.writePhaseLines)
+
+    separator_line = parent.get("startsAtLine")
+    # select smallest recursive function call line >= separator_line + 1
+    parent_new_start_line = None
+    potential_lines = []
+    for tmp1 in parent.callsNode:
+        try:
+            for tmp2 in tmp1.nodeCalled:
+                try:
+                    potential_lines.append(tmp2.get("atLine"))
+                    pass
+                except AttributeError:
+                    pass
+        except AttributeError:
+            pass
+    for tmp in potential_lines:
+        if tmp == "":
+            continue
+        if int(tmp[tmp.find(":") + 1:]) >= int(separator_line[separator_line.find(":") + 1:]) + 1:
+            if parent_new_start_line is None:
+                parent_new_start_line = tmp
+                continue
+            # select smallest instruction line
+            if int(tmp[tmp.find(":") + 1:]) < int(
+                    parent_new_start_line[parent_new_start_line.find(":") + 1:]):
+                parent_new_start_line = tmp
+    if not potential_lines or (potential_lines and not parent_new_start_line):
+        parent_new_start_line = str(separator_line[:separator_line.index(":")])
+        parent_new_start_line += ":"
+        parent_new_start_line += str(int(separator_line[separator_line.index(":") + 1:]) + 1)
+
+    parent.set("startsAtLine", parent_new_start_line)
+    parent_copy.set("endsAtLine", separator_line)
+
+    # update instruction/readPhase/writePhase lines
+    __filter_rwi_lines(parent_copy, parent_copy.instructionLines)
+    __filter_rwi_lines(parent_copy, parent_copy.readPhaseLines)
+    __filter_rwi_lines(parent_copy, parent_copy.writePhaseLines)
+
+    # insert separator line to parent_copys instruction,
+    # read and writePhaseLines if not already present
+    __insert_separator_line(parent_copy, parent_copy.instructionLines)
+    __insert_separator_line(parent_copy, parent_copy.readPhaseLines)
+    __insert_separator_line(parent_copy, parent_copy.writePhaseLines)
+
+    # insert all lines contained in parent to instruction, read and writePhaseLines
+    __insert_missing_rwi_lines(parent, parent.instructionLines)
+    __insert_missing_rwi_lines(parent, parent.readPhaseLines)
+    __insert_missing_rwi_lines(parent, parent.writePhaseLines)
+
+    # remove returnInstructions if they are not part of the cus anymore
+    __remove_unnecessary_return_instructions(parent_copy)
+    __remove_unnecessary_return_instructions(parent)
+
+    # add parent.id to parent_function.childrenNodes
+    __add_parent_id_to_children(functions, parent)
+
+
+def __generate_new_cu_id(parent, parent_copy, max_node_ids: Dict[str, int]):
     """Generate the next free CU id and assign it to the parent CU.
     :param parent: parent CU, id will be updated
     :param parent_copy: copy of parent CU (newly created CU)
-    :param used_node_ids: list of used cu node id's
-    :param self_added_node_ids: list of added node id's"""
+    :param max_node_ids: highest used cu id per file id, will be updated"""
     # get next free id for specific tmp_file_id
     parent_copy_id = parent_copy.get("id")
     tmp_file_id = parent_copy_id[:parent_copy_id.index(":")]
-    tmp_used_ids = [int(s[s.index(":") + 1:]) for s in
-                    used_node_ids if
-                    s.startswith(tmp_file_id + ":")]
-    next_free_id = max(tmp_used_ids) + 1
+    next_free_id = max_node_ids[tmp_file_id] + 1
+    max_node_ids[tmp_file_id] = next_free_id
     incremented_id = tmp_file_id + ":" + str(next_free_id)
     parent.set("id", incremented_id)
-    self_added_node_ids.append(incremented_id)
 
 
 def __set_parent_copy_childrennodes(parent_copy):
@@ -313,21 +291,20 @@ def __remove_unnecessary_return_instructions(target):
         target.returnInstructions.set("count", str(len(new_entries)))
 
 
-def __add_parent_id_to_children(parsed_cu, parent):
+def __add_parent_id_to_children(functions, parent):
     """"Add parent.id to parent_function.childrenNodes
-    :param: parsed_cu: parsed contents of cu_xml file
+    :param: functions: function nodes of the parsed cu_xml file
     :param parent: cu node to be added to parent_function's children
     """
     parent_function = None
-    for tmp_node in parsed_cu.Node:
-        if tmp_node.get('type') == '1':
-            if line_contained_in_region(parent.get("startsAtLine"), tmp_node.get("startsAtLine"),
+    for tmp_node in functions:
+        if line_contained_in_region(parent.get("startsAtLine"), tmp_node.get("startsAtLine"),
+                                    tmp_node.get("endsAtLine")):
+            if line_contained_in_region(parent.get("endsAtLine"),
+                                        tmp_node.get("startsAtLine"),
                                         tmp_node.get("endsAtLine")):
-                if line_contained_in_region(parent.get("endsAtLine"),
-                                            tmp_node.get("startsAtLine"),
-                                            tmp_node.get("endsAtLine")):
-                    parent_function = tmp_node
-                    break
+                parent_function = tmp_node
+                break
     if parent_function is None:
         print("No parent function found for cu node: ", parent.get("id"), ". Ignoring.")
     else:
@@ -184,8 +184,7 @@ def combine_omittable_cus(pet: PETGraphX,
     # successor graph of a node containing a task suggestion
     useful_omittable_suggestions = []
     for oms in omittable_suggestions:
-        in_succ_edges = [(s, t, e) for s, t, e in pet.in_edges(oms._node.id) if
-                         e.etype == EdgeType.SUCCESSOR]
+        in_succ_edges = pet.in_edges(oms._node.id, EdgeType.SUCCESSOR)
         parent_task_nodes = [pet.node_at(e[0]) for e in in_succ_edges if
                              pet.node_at(e[0]).tp_contains_task is True]
         if len(parent_task_nodes) != 0:
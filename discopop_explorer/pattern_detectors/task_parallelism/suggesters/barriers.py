@@ -47,14 +47,12 @@ def detect_barrier_suggestions(pet: PETGraphX,
         transformation_happened = False
         v = queue.pop(0)
         # check step 1
-        out_dep_edges = [(s, t, e) for s, t, e in pet.out_edges(v.id) if
-                         e.etype == EdgeType.DATA and
+        out_dep_edges = [(s, t, e) for s, t, e in pet.out_edges(v.id, EdgeType.DATA) if
                          pet.node_at(t) != v]
         # ignore cyclic dependencies on the same variable
         to_remove = []
         for dep_edge in out_dep_edges:
-            targets_cyclic_dep_edges = [(s, t, e) for s, t, e in pet.out_edges(dep_edge[1]) if
-                                        e.etype == EdgeType.DATA and
+            targets_cyclic_dep_edges = [(s, t, e) for s, t, e in pet.out_edges(dep_edge[1], EdgeType.DATA) if
                                         t == dep_edge[0] and
                                         e.var_name == dep_edge[2].var_name]
             if len(targets_cyclic_dep_edges) != 0:
@@ -161,8 +159,7 @@ def detect_barrier_suggestions(pet: PETGraphX,
 
         # append neighbors of modified node to queue
         if transformation_happened:
-            in_dep_edges = [(s, t, e) for s, t, e in pet.in_edges(v.id) if
-                            e.etype == EdgeType.DATA and
+            in_dep_edges = [(s, t, e) for s, t, e in pet.in_edges(v.id, EdgeType.DATA) if
                             pet.node_at(s) != v]
             for e in out_dep_edges:
                 queue.append(pet.node_at(e[1]))
@@ -245,8 +242,7 @@ def __check_dependences_and_predecessors(pet: PETGraphX, out_dep_edges: List[Tup
         else:
             violation = True
     # check if node is a direct successor of an omittable node or a task node
-    in_succ_edges = [(s, t, e) for (s, t, e) in pet.in_edges(cur_cu.id) if
-                     e.etype == EdgeType.SUCCESSOR]
+    in_succ_edges = pet.in_edges(cur_cu.id, EdgeType.SUCCESSOR)
     is_successor = False
     for e in in_succ_edges:
         if pet.node_at(e[0]).tp_omittable is True:
@@ -375,8 +371,7 @@ def validate_barriers(pet: PETGraphX, suggestions: List[PatternInfo]) -> List[Pa
             continue
 
         # create "path lists" for each incoming successor edge
-        in_succ_edges = [(s, t, e) for s, t, e in pet.in_edges(bs._node.id) if
-                         e.etype == EdgeType.SUCCESSOR and
+        in_succ_edges = [(s, t, e) for s, t, e in pet.in_edges(bs._node.id, EdgeType.SUCCESSOR) if
                          pet.node_at(s) != bs._node]
         predecessors_dict = dict()
         for e in in_succ_edges:
@@ -385,8 +380,7 @@ def validate_barriers(pet: PETGraphX, suggestions: List[PatternInfo]) -> List[Pa
             predecessors_dict[e] = tmp
         # iterate over outgoing dependence edges and increase dependence counts
         # for those paths that contain the dependence target CU
-        out_dep_edges = [(s, t, e) for s, t, e in pet.out_edges(bs._node.id) if
-                         e.etype == EdgeType.DATA and
+        out_dep_edges = [(s, t, e) for s, t, e in pet.out_edges(bs._node.id, EdgeType.DATA) if
                          pet.node_at(t) != bs._node]
         dependence_count_dict = dict()
 
@@ -443,8 +437,7 @@ def suggest_missing_barriers_for_global_vars(pet: PETGraphX, suggestions: List[P
     # iterate over task suggestions
     for task_sug in task_suggestions:
         visited_nodes = [task_sug._node]
-        out_succ_edges = [(s, t, e) for s, t, e in pet.out_edges(task_sug._node.id) if
-                          e.etype == EdgeType.SUCCESSOR and
+        out_succ_edges = [(s, t, e) for s, t, e in pet.out_edges(task_sug._node.id, EdgeType.SUCCESSOR) if
                           pet.node_at(t) != task_sug._node]
         queue = out_succ_edges
         # iterate over queued successor-edges
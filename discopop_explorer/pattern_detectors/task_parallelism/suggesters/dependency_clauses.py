@@ -1,9 +1,11 @@
 import os
+from itertools import chain
 from typing import List, Dict, Tuple, Optional, cast
 
 from discopop_explorer.PETGraphX import EdgeType, NodeType, CUNode, PETGraphX
 from discopop_explorer.pattern_detectors.PatternInfo import PatternInfo
 from discopop_explorer.pattern_detectors.task_parallelism.classes import TaskParallelismInfo, OmittableCuInfo, TPIType
+from discopop_explorer.pattern_detectors.task_parallelism.cu_model import CUModel
 from discopop_explorer.pattern_detectors.task_parallelism.tp_utils import line_contained_in_region, \
     get_function_call_from_source_code, get_called_function_and_parameter_names_from_function_call, demangle, \
     get_called_functions_recursively
@@ -12,13 +14,13 @@ from discopop_explorer.pattern_detectors.task_parallelism.alias_detection import
 
 
 def detect_dependency_clauses_alias_based(pet: PETGraphX, suggestions: List[PatternInfo], file_mapping_path: str,
-                                          cu_xml: str, dep_file: str, cu_inst_result_file: str,
+                                          cu_model: CUModel, dep_file: str, cu_inst_result_file: str,
                                           discopop_build_path: str) -> List[PatternInfo]:
     """Wrapper for alias based dependency detection.
     :param pet: PET Graph
     :param suggestions: List[PatternInfo]
     :param file_mapping_path: path to FileMapping file
-    :param cu_xml: path to cu_xml file
+    :param cu_model: parsed cu_xml file
     :param dep_file: path to dependency file
     :param cu_inst_result_file: path to CUInstResult.txt
     :param discopop_build_path: path to discopop build directory
@@ -37,7 +39,7 @@ def detect_dependency_clauses_alias_based(pet: PETGraphX, suggestions: List[Patt
     cu_inst_result_dict = get_dict_from_cu_inst_result_file(cu_inst_result_file)
     aliases = get_alias_information(pet, suggestions, source_code_files)
     # get function-internal parameter aliases
-    function_parameter_alias_dict = get_function_internal_parameter_aliases(file_mapping_path, cu_xml,
+    function_parameter_alias_dict = get_function_internal_parameter_aliases(file_mapping_path, cu_model,
                                                                             discopop_build_path)
     # find dependencies between calls of different functions inside function scopes
     suggestions = identify_dependencies_for_different_functions(pet, suggestions, aliases, source_code_files,
@@ -200,21 +202,20 @@ def get_alias_information(pet: PETGraphX, suggestions: List[PatternInfo], source
     return aliases
 
 
-def get_function_internal_parameter_aliases(file_mapping_path: str, cu_xml_path: str, discopop_build_path: str) \
+def get_function_internal_parameter_aliases(file_mapping_path: str, cu_model: CUModel, discopop_build_path: str) \
         -> Dict[str, List[Tuple[str, str]]]:
     """Wrapper to execute simple alias analysis and parse results into dict (function name to list of alias-tuples).
     :param file_mapping_path: path to filemapping file
-    :param cu_xml_path: path to cu_xml file
+    :param cu_model: parsed cu_xml file
     :param discopop_build_path: path to discopop build directory
     :result: function-internal alias detection results in dict form"""
     # execute simple alias detection
     alias_detection_temp_file = os.getcwd() + "/alias_detection_temp.txt"
     # get absolute file paths
     file_mapping_path = os.path.abspath(file_mapping_path)
-    cu_xml_path = os.path.abspath(cu_xml_path)
 
     # execute simple alias detection
-    alias_detection_result = get_alias_detection_result(file_mapping_path, cu_xml_path, alias_detection_temp_file,
+    alias_detection_result = get_alias_detection_result(file_mapping_path, cu_model, alias_detection_temp_file,
                                                         discopop_build_path)
 
     # check if alias_detection_result has contents
@@ -968,7 +969,7 @@ def get_function_call_parameter_rw_information_recursion_step(pet: PETGraphX, ca
                 child_in_deps = pet.in_edges(child_cu.id, EdgeType.DATA)
                 child_out_deps = pet.out_edges(child_cu.id, EdgeType.DATA)
                 dep_var_names = [x[2].var_name for x in
-                                 child_in_deps + child_out_deps]
+                                 chain(child_in_deps, child_out_deps)]
                 dep_var_names_not_none = [x for x in dep_var_names if x is not None]
                 dep_var_names_not_none = [x.replace(".addr", "") for x in dep_var_names_not_none]
                 if alias_name in dep_var_names_not_none:
@@ -45,12 +45,11 @@ def detect_task_suggestions(pet: PETGraphX) -> List[PatternInfo]:
         first_dependency_line = v.end_position()
         first_dependency_line_number = first_dependency_line[
                                        first_dependency_line.index(":") + 1:]
-        for s, t, e in pet.out_edges(v.id):
-            if e.etype == EdgeType.DATA:
-                dep_line = cast(str, e.sink)
-                dep_line_number = dep_line[dep_line.index(":") + 1:]
-                if dep_line_number < first_dependency_line_number:
-                    first_dependency_line = dep_line
+        for s, t, e in pet.out_edges(v.id, EdgeType.DATA):
+            dep_line = cast(str, e.sink)
+            dep_line_number = dep_line[dep_line.index(":") + 1:]
+            if dep_line_number < first_dependency_line_number:
+                first_dependency_line = dep_line
         tmp_suggestion = TaskParallelismInfo(v, TPIType.TASKWAIT, ["taskwait"],
                                              first_dependency_line,
                                              [], [], [])
@@ -141,9 +140,8 @@ def correct_task_suggestions_in_loop_body(pet: PETGraphX, suggestions: List[Patt
                         return [cu_node]
                     result = []
                     visited.append(cu_node)
-                    for succ_cu_node in [pet.node_at(t) for s, t, e in pet.out_edges(cu_node.id) if
-                                         e.etype == EdgeType.SUCCESSOR and
-                                         pet.node_at(t) != cu_node]:
+                    for succ_cu_node in [pet.node_at(t) for s, t, e in pet.out_edges(cu_node.id, EdgeType.SUCCESSOR)
+                                         if pet.node_at(t) != cu_node]:
                         if succ_cu_node not in visited:
                             result += find_taskwaits(succ_cu_node, visited)
                     return result
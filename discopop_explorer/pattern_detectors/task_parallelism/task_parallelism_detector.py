@@ -7,14 +7,15 @@
 # directory for details.
 
 
+import time
 from typing import List, Optional, cast
 
 from discopop_explorer.PETGraphX import PETGraphX, NodeType, MWType
-from discopop_explorer.parser import parse_inputs
 from discopop_explorer.pattern_detectors.PatternInfo import PatternInfo
 from discopop_explorer.pattern_detectors.do_all_detector import run_detection as detect_do_all
 from discopop_explorer.pattern_detectors.reduction_detector import run_detection as detect_reduction
 from discopop_explorer.pattern_detectors.task_parallelism.classes import TaskParallelismInfo, TPIType
+from discopop_explorer.pattern_detectors.task_parallelism.cu_model import CUModel
 from discopop_explorer.pattern_detectors.task_parallelism.filter import filter_data_sharing_clauses, \
     remove_useless_barrier_suggestions, remove_duplicate_data_sharing_clauses, filter_data_depend_clauses, \
     remove_duplicates
@@ -31,15 +32,18 @@ from discopop_explorer.pattern_detectors.task_parallelism.suggesters.tasks impor
 from discopop_explorer.pattern_detectors.task_parallelism.suggesters.auxiliary import suggest_parallel_regions, \
     set_task_contained_lines, detect_taskloop_reduction, combine_omittable_cus
 from discopop_explorer.pattern_detectors.task_parallelism.tp_utils import create_task_tree, __forks, \
-    set_global_llvm_cxxfilt_path, detect_mw_types, get_var_definition_line_dict
+    set_global_llvm_cxxfilt_path, detect_mw_types, get_var_definition_line_dict, load_demangling_cache, \
+    prefetch_demangled_names, store_demangling_cache, clear_source_code_cache
 
 __global_llvm_cxxfilt_path: str = ""
 
 
 def build_preprocessed_graph_and_run_detection(cu_xml: str, dep_file: str, loop_counter_file: str, reduction_file: str,
                                                file_mapping: str, cu_inst_result_file: str,
-                                               llvm_cxxfilt_path: Optional[str], discopop_build_path: Optional[str]) \
-        -> List[PatternInfo]:
+                                               llvm_cxxfilt_path: Optional[str], discopop_build_path: Optional[str],
+                                               preprocessed_cu_xml: Optional[str] = None,
+                                               cache_dir: Optional[str] = None,
+                                               cu_model: Optional[CUModel] = None) -> List[PatternInfo]:
     """execute preprocessing of given cu xml file and construct a new cu graph.
     execute run_detection on newly constructed graph afterwards.
     :param cu_xml: Path (string) to the CU xml file to be used
@@ -50,6 +54,9 @@ def build_preprocessed_graph_and_run_detection(cu_xml: str, dep_file: str, loop_
     :param cu_inst_result_file: Path (string) to the _CUInstResult.txt to be used
     :param llvm_cxxfilt_path: Path (string) to the llvm-cxxfilt executable to be used or None.
     :param discopop_build_path: path (string) to discopop build folder.
+    :param preprocessed_cu_xml: Path (string) to write the preprocessed CU xml file to for debugging, or None.
+    :param cache_dir: Path (string) to the directory of the persistent demangling cache, or None.
+    :param cu_model: the parsed CU xml file, modified by the preprocessing. Parsed from cu_xml, if None.
     :return: List of detected pattern info
     """
     global __global_llvm_cxxfilt_path
@@ -60,21 +67,30 @@ def build_preprocessed_graph_and_run_detection(cu_xml: str, dep_file: str, loop_
     if discopop_build_path is None or discopop_build_path == "None":
         raise ValueError("Path to DiscoPoP build directory not specified!")
     set_global_llvm_cxxfilt_path(__global_llvm_cxxfilt_path)
-    preprocessed_cu_xml = cu_xml_preprocessing(cu_xml)
-    preprocessed_graph = PETGraphX.from_parsed_input(*parse_inputs(preprocessed_cu_xml, dep_file,
-                                                                   loop_counter_file, reduction_file))
+    # parsed once, preprocessed in memory and shared by the graph construction and the detection steps
+    if cu_model is None:
+        cu_model = CUModel(cu_xml)
+    start = time.time()
+    splits = cu_xml_preprocessing(cu_model, preprocessed_cu_xml)
+    print("CU xml preprocessing: {0} splits in {1:.2f}s".format(splits, time.time() - start))
+    # demangle all function names at once instead of invoking llvm-cxxfilt for every single name
+    load_demangling_cache(cache_dir)
+    prefetch_demangled_names(cu_model)
+    preprocessed_graph = PETGraphX.from_parsed_input(*cu_model.graph_input(dep_file, loop_counter_file,
+                                                                            reduction_file))
 
     # execute reduction detector to enable taskloop-reduction-detection
     detect_reduction(preprocessed_graph)
     detect_do_all(preprocessed_graph)
 
-    suggestions = run_detection(preprocessed_graph, preprocessed_cu_xml, file_mapping, dep_file, cu_inst_result_file,
+    suggestions = run_detection(preprocessed_graph, cu_model, file_mapping, dep_file, cu_inst_result_file,
                                 cast(str, discopop_build_path))
+    store_demangling_cache(cache_dir)
 
     return suggestions
 
 
-def run_detection(pet: PETGraphX, cu_xml: str, file_mapping: str, dep_file: str, cu_ist_result_file: str,
+def run_detection(pet: PETGraphX, cu_model: CUModel, file_mapping: str, dep_file: str, cu_ist_result_file: str,
                   discopop_build_path: str) \
         -> List[PatternInfo]:
     """Computes the Task Parallelism Pattern for a node:
@@ -88,7 +104,7 @@ def run_detection(pet: PETGraphX, cu_xml: str, file_mapping: str, dep_file: str,
     3.) if two barriers can run in parallel they are marked as barrierWorkers.
         Two barriers can run in parallel if there is not a directed path from one to the other
         :param pet: PET graph
-        :param cu_xml: Path (string) to the CU xml file to be used
+        :param cu_model: parsed CU xml file the graph was built from
         :param file_mapping: Path (string) to the FileMapping.txt to be used
         :param dep_file: Path (string) to the dependencies-file to be used
         :param cu_ist_result_file: Path(string) to the CUInstResult.txt
@@ -108,6 +124,7 @@ def run_detection(pet: PETGraphX, cu_xml: str, file_mapping: str, dep_file: str,
             node.mw_type = MWType.ROOT
 
     __forks.clear()
+    clear_source_code_cache()
     create_task_tree(pet, pet.main)
 
     # ct = [graph.vp.id[v] for v in pet.graph.vp.childrenTasks[main_node]]
@@ -127,7 +144,7 @@ def run_detection(pet: PETGraphX, cu_xml: str, file_mapping: str, dep_file: str,
     result = cast(List[PatternInfo], remove_useless_barrier_suggestions(pet, cast(List[TaskParallelismInfo], result)))
     result = detect_barrier_suggestions(pet, result)
     result = validate_barriers(pet, result)
-    result = detect_dependency_clauses_alias_based(pet, result, file_mapping, cu_xml, dep_file,
+    result = detect_dependency_clauses_alias_based(pet, result, file_mapping, cu_model, dep_file,
                                                    cu_ist_result_file, discopop_build_path)
     result = suggest_missing_barriers_for_global_vars(pet, result)
     result = combine_omittable_cus(pet, result)
@@ -135,8 +152,9 @@ def run_detection(pet: PETGraphX, cu_xml: str, file_mapping: str, dep_file: str,
     result = suggest_shared_clauses_for_all_tasks_in_function_body(pet, result)
     result = remove_duplicates(result)
     result = correct_task_suggestions_in_loop_body(pet, result)
-    result = filter_data_sharing_clauses(pet, result, get_var_definition_line_dict(cu_xml))
-    result = filter_data_depend_clauses(pet, result, get_var_definition_line_dict(cu_xml))
+    var_def_line_dict = get_var_definition_line_dict(cu_model)
+    result = filter_data_sharing_clauses(pet, result, var_def_line_dict)
+    result = filter_data_depend_clauses(pet, result, var_def_line_dict)
     result = remove_duplicate_data_sharing_clauses(result)
     result = group_task_suggestions(pet, result)
     result = sort_output(result)
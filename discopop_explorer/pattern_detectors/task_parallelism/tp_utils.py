@@ -1,16 +1,24 @@
+import hashlib
+import json
+import os
+import shutil
 import subprocess
-from typing import cast, IO, Dict, List, Tuple, Optional
+import tempfile
+from typing import cast, Dict, Iterable, List, Tuple, Optional
 
-from lxml import objectify  # type: ignore
 from discopop_explorer.PETGraphX import CUNode, NodeType, EdgeType, MWType, DepType, PETGraphX
 from discopop_explorer.pattern_detectors.task_parallelism.classes import Task, TaskParallelismInfo
-from discopop_explorer.utils import depends
+from discopop_explorer.pattern_detectors.task_parallelism.cu_model import CUModel
 
 __workloadThreshold = 10000
 __minParallelism = 3
 __forks = set()
 __global_llvm_cxxfilt_path: str = ""
 demangling_cache: Dict[str, str] = dict()
+# number of names passed to a single llvm-cxxfilt invocation, keeps the command line short
+__DEMANGLE_BATCH_SIZE = 1000
+__source_code_lines: Dict[str, List[str]] = dict()
+__function_call_cache: Dict[Tuple[str, int, Optional[str]], Optional[str]] = dict()
 
 
 def demangle(mangled_name: str) -> str:
@@ -18,27 +26,141 @@ def demangle(mangled_name: str) -> str:
     :param mangled_name: mangled function name
     :return: demangled function name and type information"""
     global demangling_cache
+    if mangled_name not in demangling_cache:
+        demangle_all([mangled_name])
+    return demangling_cache[mangled_name]
+
+
+def demangle_all(mangled_names: Iterable[str]):
+    """Demangles all given names which are not cached yet with as few llvm-cxxfilt invocations as possible
+    and adds the results to the demangling cache.
+    :param mangled_names: mangled function names"""
+    global demangling_cache
+    missing = sorted(set(name for name in mangled_names if name not in demangling_cache))
+    # llvm-cxxfilt prints one line per argument, but skips empty arguments and fails on invalid options,
+    # thus such names are demangled one by one and do not spoil the batches of the other names
+    __demangle_individually(name for name in missing if not name or name.startswith("-"))
+    missing = [name for name in missing if name and not name.startswith("-")]
+    for idx in range(0, len(missing), __DEMANGLE_BATCH_SIZE):
+        batch = missing[idx:idx + __DEMANGLE_BATCH_SIZE]
+        lines = __run_llvm_cxxfilt(batch).split("\n")
+        if len(lines) != len(batch) + 1:
+            # output incomplete
+            __demangle_individually(batch)
+        else:
+            demangling_cache.update(zip(batch, lines))
+
+
+def __demangle_individually(mangled_names: Iterable[str]):
+    """Demangles the names with one llvm-cxxfilt invocation per name, names without output are demangled to ""
+    :param mangled_names: mangled function names"""
+    global demangling_cache
+    for name in mangled_names:
+        demangling_cache[name] = __run_llvm_cxxfilt([name]).split("\n")[0]
+
+
+def __run_llvm_cxxfilt(mangled_names: List[str]) -> str:
+    """Executes llvm-cxxfilt on the given names.
+    :param mangled_names: mangled function names
+    :return: output of llvm-cxxfilt"""
     global __global_llvm_cxxfilt_path
-    if mangled_name in demangling_cache:
-        return demangling_cache[mangled_name]
     if __global_llvm_cxxfilt_path == "None":
         # set default llvm-cxxfilt executable
         llvm_cxxfilt_path = "llvm-cxxfilt"
     else:
         llvm_cxxfilt_path = cast(str, __global_llvm_cxxfilt_path)
     try:
-        process = subprocess.Popen([llvm_cxxfilt_path, mangled_name], stdout=subprocess.PIPE)
-        process.wait()
-        if process.stdout is not None:
-            out_bytes = cast(IO[bytes], process.stdout).readline()
-            out = out_bytes.decode("UTF-8")
-            out = out.replace("\n", "")
-            demangling_cache[mangled_name] = out
-            return out
+        # without names, llvm-cxxfilt would wait for names on stdin
+        process = subprocess.run([llvm_cxxfilt_path] + mangled_names, stdin=subprocess.DEVNULL,
+                                 stdout=subprocess.PIPE)
     except FileNotFoundError:
         raise ValueError("Executable '" + llvm_cxxfilt_path + "' not found." +
                          " Check or supply --llvm-cxxfilt-path parameter.")
-    raise ValueError("Demangling of " + mangled_name + " not possible!")
+    return process.stdout.decode("UTF-8")
+
+
+def prefetch_demangled_names(cu_model: CUModel):
+    """Demangles the names of all functions and recursive function calls contained in the cu xml file at once.
+    Errors are ignored, they are reported once a name is actually demangled.
+    :param cu_model: parsed cu xml file"""
+    names = set()
+    for node in cu_model.nodes():
+        if node.get("name"):
+            names.add(node.get("name"))
+        for recursive_function_call in node.iterfind("callsNode/recursiveFunctionCall"):
+            for entry in (recursive_function_call.text or "").split(","):
+                if entry:
+                    names.add(entry.split(" ")[0])
+    try:
+        demangle_all(names)
+    except ValueError:
+        pass
+
+
+def __demangling_cache_file(cache_dir: str) -> Optional[str]:
+    """Path of the persistent demangling cache of the used llvm-cxxfilt executable.
+    :param cache_dir: cache directory
+    :return: path or None, if the llvm-cxxfilt executable can not be found"""
+    global __global_llvm_cxxfilt_path
+    executable = shutil.which("llvm-cxxfilt" if __global_llvm_cxxfilt_path == "None" else __global_llvm_cxxfilt_path)
+    if executable is None:
+        return None
+    stat = os.stat(executable)
+    # results of a different llvm-cxxfilt executable or version are not reused
+    key = repr((os.path.realpath(executable), stat.st_size, stat.st_mtime_ns))
+    return os.path.join(cache_dir, "demangle-" + hashlib.sha256(key.encode()).hexdigest()[:16] + ".json")
+
+
+def __read_demangling_cache(path: str) -> Dict[str, str]:
+    """Reads a persistent demangling cache.
+    :param path: path of the cache file
+    :return: demangled names, empty if the file is missing or unreadable"""
+    try:
+        with open(path) as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        # missing or unreadable cache, overwritten by store_demangling_cache
+        return dict()
+    return stored if isinstance(stored, dict) else dict()
+
+
+def load_demangling_cache(cache_dir: Optional[str]):
+    """Adds the demangled names stored by earlier runs to the demangling cache.
+    :param cache_dir: cache directory, None disables the persistent cache"""
+    global demangling_cache
+    path = None if cache_dir is None else __demangling_cache_file(cache_dir)
+    if path is not None:
+        for mangled_name, demangled_name in __read_demangling_cache(path).items():
+            demangling_cache.setdefault(mangled_name, demangled_name)
+
+
+def store_demangling_cache(cache_dir: Optional[str]):
+    """Stores the demangling cache for later runs, merged with the names stored by other runs.
+    :param cache_dir: cache directory, None disables the persistent cache"""
+    global demangling_cache
+    if cache_dir is None:
+        return
+    path = __demangling_cache_file(cache_dir)
+    if path is None:
+        return
+    stored = __read_demangling_cache(path)
+    # names llvm-cxxfilt failed on are demangled again by later runs
+    new_names = {k: v for k, v in demangling_cache.items() if v and k not in stored}
+    if not new_names:
+        return
+    stored.update(new_names)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(stored, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        print(f"WARNING: could not write demangling cache to {cache_dir}: {e}")
 
 
 def line_contained_in_region(test_line: str, start_line: str, end_line: str) -> bool:
@@ -82,9 +204,8 @@ def get_parent_of_type(pet: PETGraphX, node: CUNode,
         (cur_node, last_node) = tmp
         last_node = cur_node
         visited.append(cur_node)
-        tmp_list = [(s, t, e) for s, t, e in pet.in_edges(cur_node.id)
-                    if pet.node_at(s) not in visited and
-                    e.etype == edge_type]
+        tmp_list = [(s, t, e) for s, t, e in pet.in_edges(cur_node.id, edge_type)
+                    if pet.node_at(s) not in visited]
         for e in tmp_list:
             if pet.node_at(e[0]).type == parent_type:
                 if only_first is True:
@@ -176,8 +297,7 @@ def get_predecessor_nodes(pet: PETGraphX, root: CUNode, visited_nodes: List[CUNo
     if root.type == NodeType.FUNC or root.tp_contains_taskwait is True:
         # root of type "function" or root is a barrier
         return result, visited_nodes
-    in_succ_edges = [(s, t, e) for s, t, e in pet.in_edges(root.id) if
-                     e.etype == EdgeType.SUCCESSOR and
+    in_succ_edges = [(s, t, e) for s, t, e in pet.in_edges(root.id, EdgeType.SUCCESSOR) if
                      pet.node_at(s) != root and pet.node_at(s) not in visited_nodes]
     for e in in_succ_edges:
         tmp, visited_nodes = get_predecessor_nodes(pet, pet.node_at(e[0]), visited_nodes)
@@ -369,17 +489,57 @@ def task_contained_in_reduction_loop(pet: PETGraphX,
     return None, None
 
 
+def clear_source_code_cache():
+    """Drops the cached source code lines and function calls, the source files may have changed since the last run.
+    """
+    __source_code_lines.clear()
+    __function_call_cache.clear()
+
+
+def __get_source_code_lines(path: str) -> List[str]:
+    """Returns the lines of the source code file, each file is read only once.
+    :param path: path to the source code file
+    :return: lines of the file including line breaks
+    """
+    if path not in __source_code_lines:
+        with open(path) as f:
+            __source_code_lines[path] = f.readlines()
+    return __source_code_lines[path]
+
+
 def get_function_call_from_source_code(source_code_files: Dict[str, str], line_number: int, file_id: str,
                                        called_function_name: Optional[str] = None) -> str:
     """Extract code snippet from original source code which contains a function call.
+    Results are cached, the same call is looked up for every pair of tasks.
     :param source_code_files: File-Mapping dictionary
     :param line_number: original source code line number to start searching at
     :param file_id: file id of the original source code file
     :param called_function_name: optional parameter, if value is set, it needs to be included in returned code snippet.
     :return: source code snippet
     """
-    source_code = open(source_code_files[file_id])
-    source_code_lines = source_code.readlines()
+    path = source_code_files[file_id]
+    key = (path, line_number, called_function_name)
+    if key not in __function_call_cache:
+        try:
+            __function_call_cache[key] = __extract_function_call(__get_source_code_lines(path), line_number,
+                                                                 called_function_name)
+        except IndexError:
+            # no complete function call until the end of the file
+            __function_call_cache[key] = None
+    function_call_string = __function_call_cache[key]
+    if function_call_string is None:
+        raise IndexError("no function call found at line " + str(line_number) + " of " + path)
+    return function_call_string
+
+
+def __extract_function_call(source_code_lines: List[str], line_number: int,
+                            called_function_name: Optional[str]) -> str:
+    """Extract code snippet which contains a function call from the lines of the source code file.
+    :param source_code_lines: lines of the source code file
+    :param line_number: original source code line number to start searching at
+    :param called_function_name: if set, it needs to be included in returned code snippet.
+    :return: source code snippet
+    """
     offset = -1
     function_call_string = source_code_lines[line_number + offset]
     if ")" in function_call_string and "(" in function_call_string:
@@ -567,7 +727,10 @@ def detect_mw_types(pet: PETGraphX, main_node: CUNode):
     """
 
     # first insert all the direct children of main node in a queue to use it for the BFS
-    for node in pet.direct_children(main_node):
+    children = pet.direct_children(main_node)
+    # bit i of dependencies[j]: children[j] depends on children[i]
+    dependencies = pet.sibling_dependencies(children)
+    for node_index, node in enumerate(children):
         # a child node can be set to NONE or ROOT due a former detectMWNode call where it was the mainNode
         if node.mw_type == MWType.NONE or node.mw_type == MWType.ROOT:
             node.mw_type = MWType.FORK
@@ -582,11 +745,11 @@ def detect_mw_types(pet: PETGraphX, main_node: CUNode):
         # the other node
 
         # create the copy vector so that it only contains the other nodes
-        other_nodes = pet.direct_children(main_node)
-        other_nodes.remove(node)
+        first = children.index(node)
+        other_nodes = [(i, other) for i, other in enumerate(children) if i != first]
 
-        for other_node in other_nodes:
-            if depends(pet, other_node, node):
+        for other_index, other_node in other_nodes:
+            if dependencies[other_index] >> node_index & 1:
                 if other_node.mw_type == MWType.WORKER:
                     other_node.mw_type = MWType.BARRIER
                 else:
@@ -596,10 +759,9 @@ def detect_mw_types(pet: PETGraphX, main_node: CUNode):
                     # -> not detected in previous step, since other_node is only
                     #    dependent of a single CU
                     raw_targets = []
-                    for s, t, d in pet.out_edges(other_node.id):
+                    for s, t, d in pet.out_edges(other_node.id, EdgeType.DATA, DepType.RAW):
                         if pet.node_at(t) == node:
-                            if d.dtype == DepType.RAW:
-                                raw_targets.append(t)
+                            raw_targets.append(t)
                     # remove entries which occur less than two times
                     raw_targets = [t for t in raw_targets if raw_targets.count(t) > 1]
                     # remove duplicates from list
@@ -627,23 +789,15 @@ def detect_mw_types(pet: PETGraphX, main_node: CUNode):
     # return pairs
 
 
-def get_var_definition_line_dict(cu_xml: str) -> Dict[str, List[str]]:
-    """creates a dictionary {varname: [definitionLines]} based on cu_xml
+def get_var_definition_line_dict(cu_model: CUModel) -> Dict[str, List[str]]:
+    """creates a dictionary {varname: [definitionLines]} based on the parsed cu_xml
     and return the dictionary.
     Removes .addr suffix if present.
-    :param cu_xml: Path (string) to the CU xml file to be used
+    :param cu_model: parsed CU xml file
     :return: dictionary, containing information on variable definition lines
     """
-    xml_fd = open(cu_xml)
-    xml_content = ""
-    for line in xml_fd.readlines():
-        if not (line.rstrip().endswith('</Nodes>') or line.rstrip().endswith('<Nodes>')):
-            xml_content = xml_content + line
-    xml_content = "<Nodes>{0}</Nodes>".format(xml_content)
-    parsed_cu = objectify.fromstring(xml_content)
-
     var_def_line_dict = dict()
-    for node in parsed_cu.Node:
+    for node in cu_model.nodes():
         # only consider cu nodes
         if node.get("type") == "0":
             # add global variables
@@ -1,8 +1,10 @@
-from copy import deepcopy
 from typing import List
 
+import numpy as np
+
 from ..PETGraphX import PETGraphX, NodeType, CUNode, EdgeType
-from ..utils import correlation_coefficient
+from ..pattern_detectors.pipeline_analysis import (dependency_matrix, pipeline_coefficient, independent_rows,
+                                                   mergeable_rows, delete_rows)
 
 total = 0
 before: List[float] = []
@@ -45,18 +47,18 @@ def check_pipeline(pet: PETGraphX, root: CUNode):
         return
 
     matrix = get_matrix(pet, root, loop_subnodes)
-    initial_matrix = deepcopy(matrix)
+    initial_matrix = matrix
     initial_coef = get_correlation_coefficient(matrix)
 
     if initial_coef < 0.999:
         total += 1
-    independent_cus = get_independent_lines(matrix)
-    delete_lines(matrix, loop_subnodes, independent_cus)
+    independent_cus = independent_rows(matrix)
+    matrix = delete_rows(matrix, independent_cus)
 
-    no_indep_matrix = deepcopy(matrix)
+    no_indep_matrix = matrix
 
-    mergeable_cus = get_mergeable_nodes(matrix)
-    delete_lines(matrix, loop_subnodes, mergeable_cus)
+    mergeable_cus = mergeable_rows(matrix)
+    matrix = delete_rows(matrix, mergeable_cus)
 
     new_coef = get_correlation_coefficient(matrix)
     if new_coef > initial_coef:
@@ -66,90 +68,28 @@ def check_pipeline(pet: PETGraphX, root: CUNode):
         print("Node: " + root.id)
         print("Lines: " + root.start_position() + "-" + root.end_position())
         print("Independent lines:")
-        independent_cus.sort()
-        print(" ".join([str(x) for x in independent_cus]))
+        print(" ".join([str(x) for x in sorted(independent_cus)]))
         print("Similar nodes:")
-        mergeable_cus.sort()
-        print(" ".join([str(x) for x in mergeable_cus]))
+        print(" ".join([str(x) for x in sorted(mergeable_cus)]))
         print(f"matrix before: {initial_coef}")
-        for i in range(0, len(initial_matrix)):
-            print(" ".join([str(x) for x in initial_matrix[i]]))
+        print_matrix(initial_matrix)
         print(f"matrix after independent removed:")
-        for i in range(0, len(no_indep_matrix)):
-            print(" ".join([str(x) for x in no_indep_matrix[i]]))
+        print_matrix(no_indep_matrix)
         print(f"matrix after merged: {new_coef}")
-        for i in range(0, len(matrix)):
-            print(" ".join([str(x) for x in matrix[i]]))
-
-
-def delete_lines(matrix, loop_nodes, lines):
-    if lines:
-        lines.sort(reverse=True)
-        for i in range(0, len(lines)):
-            del loop_nodes[lines[i]]
-            del matrix[lines[i]]
-            for j in range(0, len(matrix)):
-                del matrix[j][lines[i]]
-
-
-def get_independent_lines(matrix):
-    res = []
-    for i in range(0, len(matrix)):
-        indep = True
-        for j in range(0, len(matrix)):
-            if i != j and (matrix[i][j] != 0 or matrix[j][i] != 0):
-                indep = False
-        if indep:
-            res.append(i)
-    return res
-
-
-def get_mergeable_nodes(matrix):
-    res = []
-    for i in reversed(range(1, len(matrix))):
-        if matrix[i] == matrix[i - 1]:
-            same = True
-            for j in range(1, len(matrix)):
-                if matrix[j][i] != matrix[j][i - 1]:
-                    same = False
-            if same:
-                res.append(i)
-    return res
-
-
-def get_matrix(pet, root, loop_subnodes):
-    res = []
-    for i in range(0, len(loop_subnodes)):
-        res.append([])
-        for j in range(0, len(loop_subnodes)):
-            res[i].append(int(pet.depends_ignore_readonly(loop_subnodes[i], loop_subnodes[j], root)))
-    return res
-
-
-def get_correlation_coefficient(matrix):
-    graph_vector = []
-    for i in range(0, len(matrix) - 1):
-        graph_vector.append(matrix[i + 1][i])
-
-    pipeline_vector = []
-    for i in range(0, len(matrix) - 1):
-        pipeline_vector.append(1)
-
-    min_weight = 1
-    for i in range(0, len(matrix) - 1):
-        for j in range(i + 1, len(matrix)):
-            if matrix[i][j] == 1:
-                node_weight = 1 - (j - i) / (len(matrix) - 1)
-                if min_weight > node_weight > 0:
-                    min_weight = node_weight
-
-    if min_weight == 1:
-        graph_vector.append(0)
-        pipeline_vector.append(0)
-    else:
-        graph_vector.append(1)
-        pipeline_vector.append(min_weight)
-    return round(correlation_coefficient(graph_vector, pipeline_vector), 2)
+        print_matrix(matrix)
+
+
+def print_matrix(matrix: np.ndarray):
+    for row in matrix.astype(int):
+        print(" ".join([str(x) for x in row]))
+
+
+def get_matrix(pet: PETGraphX, root: CUNode, loop_subnodes: List[CUNode]) -> np.ndarray:
+    return dependency_matrix(pet.sibling_dependencies(loop_subnodes, root))
+
+
+def get_correlation_coefficient(matrix: np.ndarray) -> float:
+    return round(pipeline_coefficient(matrix), 2)
 
 
 def is_pipeline_subnode(root: CUNode, current: CUNode, children_start_lines: List[str]) -> bool:
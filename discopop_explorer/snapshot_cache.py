@@ -0,0 +1,154 @@
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+"""On-disk snapshots of the PET graph built from a set of input files.
+
+A snapshot is stored per set of input paths and is only reused if it was written by the same
+snapshot format and explorer version and none of the input files changed (size and modification time).
+Outdated or unreadable snapshots are ignored and overwritten by the next run.
+
+A snapshot file starts with a text header holding the snapshot format version and the fingerprint of the
+input files, the pickled graph follows. The header is checked before anything is unpickled, thus stale or
+foreign files in the cache directory are never unpickled.
+"""
+
+import gc
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from . import parser
+from ._version import __version__
+from .PETGraphX import PETGraphX
+
+if TYPE_CHECKING:
+    from .pattern_detectors.task_parallelism.cu_model import CUModel
+
+# increase whenever the pickled representation of PETGraphX or the file layout changes
+SNAPSHOT_FORMAT_VERSION = 9
+
+__SNAPSHOT_MAGIC = b'discopop-pet-snapshot'
+
+
+def __file_state(path: str) -> Tuple[str, int, int]:
+    stat = os.stat(path)
+    return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+
+def __snapshot_path(cache_dir: str, input_files: List[str]) -> str:
+    paths = '\0'.join(os.path.abspath(f) for f in input_files)
+    return os.path.join(cache_dir, hashlib.sha256(paths.encode()).hexdigest() + '.pickle')
+
+
+def __snapshot_header(fingerprint: str) -> bytes:
+    return b'%s %d %s\n' % (__SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, fingerprint.encode())
+
+
+def input_fingerprint(input_files: List[str]) -> str:
+    """Fingerprint of the input files, changes whenever one of the files or the explorer version changes
+
+    :param input_files: paths of the input files
+    :return: fingerprint
+    """
+    h = hashlib.sha256(f'{SNAPSHOT_FORMAT_VERSION}:{__version__}'.encode())
+    for path in input_files:
+        h.update(repr(__file_state(path) if os.path.exists(path) else (os.path.abspath(path), -1, -1)).encode())
+    return h.hexdigest()
+
+
+def load_snapshot(cache_dir: str, input_files: List[str]) -> Optional[PETGraphX]:
+    """Loads the PET graph of the given input files from the cache
+
+    :param cache_dir: cache directory
+    :param input_files: paths of the input files
+    :return: PET graph or None, if there is no valid snapshot
+    """
+    header = __snapshot_header(input_fingerprint(input_files))
+    # the snapshot consists of many small objects, collecting garbage in between only slows down loading
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(__snapshot_path(cache_dir, input_files), 'rb') as f:
+            if f.readline(len(header)) != header:
+                # outdated snapshot or not a snapshot at all
+                return None
+            line_maps, pet = pickle.load(f)
+    except Exception:
+        # missing, truncated or incompatible snapshot
+        return None
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # restore the line maps the parser would have built
+    for global_map, saved_map in zip((parser.lineToCUIdMap, parser.readlineToCUIdMap, parser.writelineToCUIdMap),
+                                     line_maps):
+        for line, cu_ids in saved_map.items():
+            global_map[line].update(cu_ids)
+    return pet
+
+
+def store_snapshot(cache_dir: str, input_files: List[str], pet: PETGraphX, fingerprint: Optional[str] = None):
+    """Stores the PET graph of the given input files in the cache.
+    The snapshot is written to a temporary file first, thus concurrent runs never see a partial snapshot.
+
+    :param cache_dir: cache directory
+    :param input_files: paths of the input files
+    :param pet: PET graph built from the input files
+    :param fingerprint: fingerprint of the input files taken before parsing them
+    """
+    if fingerprint is None:
+        fingerprint = input_fingerprint(input_files)
+    line_maps: List[Dict[str, Set[str]]] = [dict(parser.lineToCUIdMap), dict(parser.readlineToCUIdMap),
+                                            dict(parser.writelineToCUIdMap)]
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(__snapshot_header(fingerprint))
+                pickle.dump((line_maps, pet), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, __snapshot_path(cache_dir, input_files))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError as e:
+        print(f"WARNING: could not write snapshot to {cache_dir}: {e}")
+
+
+def load_pet(cu_xml: str, dep_file: str, loop_counter_file: str, reduction_file: str,
+             cache_dir: Optional[str] = None, jobs: int = 1, cu_model: Optional['CUModel'] = None) -> PETGraphX:
+    """Builds the PET graph from the input files or loads it from the snapshot cache
+
+    :param cu_xml: CU node xml file
+    :param dep_file: dependencies text file
+    :param loop_counter_file: loop counter data
+    :param reduction_file: reduction variables file
+    :param cache_dir: cache directory, None disables the cache
+    :param jobs: number of processes parsing the dependency file
+    :param cu_model: the already parsed CU node xml file, the nodes are taken from it instead of cu_xml
+    :return: PET graph
+    """
+    input_files = [cu_xml, dep_file, loop_counter_file, reduction_file]
+    # taken before parsing, files modified in the meantime invalidate the snapshot
+    fingerprint = input_fingerprint(input_files)
+    if cache_dir is not None:
+        pet = load_snapshot(cache_dir, input_files)
+        if pet is not None:
+            return pet
+
+    if cu_model is None:
+        pet = PETGraphX.from_parsed_input(*parser.parse_inputs(cu_xml, dep_file, loop_counter_file, reduction_file,
+                                                               jobs))
+    else:
+        pet = PETGraphX.from_parsed_input(*cu_model.graph_input(dep_file, loop_counter_file, reduction_file, jobs))
+    if cache_dir is not None:
+        store_snapshot(cache_dir, input_files, pet, fingerprint)
+    return pet
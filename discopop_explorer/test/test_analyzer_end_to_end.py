@@ -1,5 +1,8 @@
 import json
 import os
+import subprocess
+import sys
+import tempfile
 import unittest
 from pathlib import Path
 
@@ -32,6 +35,62 @@ class GraphAnalyzerTest(unittest.TestCase):
                     print('##end##')
                 self.assertTrue(equal, 'Expected and actual detection result are not equal')
 
+    def test_analyzer_snapshot_cache(self):
+        """Detection results do not change when the graph is loaded from a snapshot"""
+        path = Path(__file__).parent.parent.parent / 'test' / 'reduction' / 'data'
+        files = [os.path.join(path, f) for f in ['Data.xml', 'dp_run_dep.txt', 'loop_counter_output.txt',
+                                                 'reduction.txt']]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            results = [ordered(json.loads(json.dumps(run(*files, [], cache_dir=cache_dir),
+                                                     cls=PatternInfoSerializer)))
+                       for _ in range(2)]
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+        self.assertEqual(results[0], results[1])
+
+    def test_analyzer_hotspots(self):
+        """Restricting the suggestions to hotspots keeps the suggestions of the hotspots unchanged"""
+        path = Path(__file__).parent.parent.parent / 'test' / 'reduction' / 'data'
+        files = [os.path.join(path, f) for f in ['Data.xml', 'dp_run_dep.txt', 'loop_counter_output.txt',
+                                                 'reduction.txt']]
+        full = json.loads(json.dumps(run(*files, []), cls=PatternInfoSerializer))
+        top = json.loads(json.dumps(run(*files, [], top_k=3), cls=PatternInfoSerializer))
+        heavy = json.loads(json.dumps(run(*files, [], min_workload=100000), cls=PatternInfoSerializer))
+
+        self.assertLessEqual(sum(len(v) for v in top.values()), 3)
+        for result in [top, heavy]:
+            for pattern, suggestions in result.items():
+                for suggestion in suggestions:
+                    self.assertIn(suggestion, full[pattern])
+        self.assertTrue(all(s['workload'] >= 100000 for v in heavy.values() for s in v))
+        self.assertTrue(any(heavy.values()))
+
+    def test_help_startup_imports(self):
+        """Showing the usage does not import plotting, plugin or graph libraries"""
+        # -X importtime needs Python 3.7, the loaded modules are listed after the usage instead
+        script = ("import runpy, sys\n"
+                  "sys.argv = ['discopop_explorer', '--help']\n"
+                  "try:\n"
+                  "    runpy.run_module('discopop_explorer', run_name='__main__', alter_sys=True)\n"
+                  "except SystemExit:\n"
+                  "    pass\n"
+                  "print('\\n'.join(sys.modules), file=sys.stderr)\n")
+        process = subprocess.run([sys.executable, '-c', script], cwd=Path(__file__).parent.parent.parent,
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True,
+                                 check=True)
+        imported = set(process.stderr.splitlines())
+        self.assertIn('docopt', imported)
+        for module in ['matplotlib', 'pluginbase', 'numpy', 'networkx', 'discopop_explorer.PETGraphX']:
+            self.assertNotIn(module, imported)
+
+    def test_lazy_exports(self):
+        """The detectors are still exported by the package"""
+        from discopop_explorer import DetectionResult, PatternDetectorX, parse_inputs
+        from discopop_explorer.parser import parse_inputs as parser_parse_inputs
+        from discopop_explorer.pattern_detection import DetectionResult as Result, PatternDetectorX as Detector
+        self.assertIs(Result, DetectionResult)
+        self.assertIs(Detector, PatternDetectorX)
+        self.assertIs(parser_parse_inputs, parse_inputs)
+
 
 def ordered(obj):
     if isinstance(obj, dict):
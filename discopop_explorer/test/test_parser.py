@@ -0,0 +1,113 @@
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+from array import array
+from pathlib import Path
+
+from discopop_explorer.PETGraphX import DependencyStore, DepType
+from discopop_explorer.parser import DependenceItem, DependenceTable, parse_inputs, parse_profiling_inputs
+
+JOBS = 3
+# chunks per job, see parser.__DEP_CHUNKS_PER_JOB
+CHUNKS = JOBS * 4
+
+
+def write_dep_file(path: str, line_count: int):
+    """Writes a dependency file with lines of varying length, including lines without dependencies"""
+    rnd = random.Random(0)
+    with open(path, 'w') as f:
+        for i in range(line_count):
+            if i % 10 == 9:
+                f.write(f'1:{i} BGN loop\n')
+                continue
+            fields = [f'1:{i}', 'NOM']
+            for _ in range(rnd.randint(1, 4)):
+                var = '' if rnd.random() < 0.2 else f'|v{rnd.randrange(5)}'
+                fields += [rnd.choice(['RAW', 'WAR', 'WAW', 'INIT']), f'1:{rnd.randrange(line_count)}{var}']
+            f.write(' '.join(fields) + '\n')
+
+
+class DependencyFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dep_file = os.path.join(self.tmp_dir, 'dp_run_dep.txt')
+        write_dep_file(self.dep_file, 200)
+        self.missing = os.path.join(self.tmp_dir, 'missing.txt')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_chunked_parse_equals_sequential_parse(self):
+        """Parsing the dependency file in chunks yields the dependencies of the sequential parse in file order"""
+        with open(self.dep_file, 'rb') as f:
+            content = f.read()
+        # the chunks are split in the middle of lines and extended to the end of the line
+        offsets = [len(content) * i // CHUNKS for i in range(1, CHUNKS)]
+        self.assertTrue(any(content[offset - 1:offset] != b'\n' for offset in offsets))
+
+        sequential, *_ = parse_profiling_inputs(self.dep_file, self.missing, self.missing)
+        chunked, *_ = parse_profiling_inputs(self.dep_file, self.missing, self.missing, jobs=JOBS,
+                                             min_parallel_size=0)
+        self.assertGreater(len(sequential), 200)
+        self.assertEqual(list(sequential), list(chunked))
+        self.assertEqual(sequential.lines, chunked.lines)
+        self.assertEqual(sequential.table.tolist(), chunked.table.tolist())
+
+    def test_dependencies(self):
+        """Every type and source of a NOM line is a dependency of its sink, the variable name is optional"""
+        with open(self.dep_file, 'w') as f:
+            f.write('1:3 NOM RAW 1:1|x WAR 1:2\n1:4 BGN loop\n1:5 NOM INIT *|y\n')
+        dependencies, *_ = parse_profiling_inputs(self.dep_file, self.missing, self.missing)
+        self.assertEqual([DependenceItem('1:3', '1:1', 'RAW', 'x'), DependenceItem('1:3', '1:2', 'WAR', ''),
+                          DependenceItem('1:5', '*', 'INIT', 'y')], list(dependencies))
+
+    def test_parse_inputs_chunked(self):
+        """The PET graph does not depend on the number of jobs parsing the dependency file"""
+        data = Path(__file__).parent.parent.parent / 'test' / 'reduction' / 'data'
+        files = [os.path.join(data, f) for f in ['Data.xml', 'dp_run_dep.txt', 'loop_counter_output.txt',
+                                                 'reduction.txt']]
+        sequential = parse_inputs(*files)[1]
+        chunked = parse_inputs(*files, jobs=JOBS, min_parallel_size=0)[1]
+        self.assertEqual(list(sequential), list(chunked))
+
+
+class LineDependenciesTest(unittest.TestCase):
+    def test_equals_row_by_row(self):
+        """Adding the line dependencies at once equals adding every pair of CUs separately"""
+        dependencies = DependenceTable([(
+            ['1:1', '1:2', '1:3', '1:4'], ['RAW', 'WAR', 'WAW', 'INIT'], ['x', '', 'y'],
+            array('i', [0, 1, 0, 0,  # RAW between two readers and two writers
+                        0, 1, 1, 1,  # WAR, skipped within the same CU
+                        2, 1, 2, 2,  # WAW
+                        0, 1, 3, 0,  # INIT, always skipped
+                        3, 0, 0, 0,  # line without CUs
+                        2, 2, 0, 1]))])
+        read_cu_ids = [['a', 'b'], [], ['c'], []]
+        written_cu_ids = [['c'], ['b', 'a'], ['c'], ['a']]
+
+        expected = DependencyStore()
+        for dep in dependencies:
+            if dep.type == 'INIT':
+                continue
+            line = dependencies.lines.index
+            for sink_cu_id in read_cu_ids[line(dep.sink)]:
+                for source_cu_id in written_cu_ids[line(dep.source)]:
+                    if sink_cu_id != source_cu_id or dep.type not in ('WAR', 'WAW'):
+                        expected.add(sink_cu_id, source_cu_id, DepType[dep.type], dep.var_name, dep.sink, dep.source)
+
+        store = DependencyStore()
+        store.add_line_dependencies(dependencies, read_cu_ids, written_cu_ids)
+        self.assertEqual(9, len(expected))
+        self.assertEqual(expected.table.tolist(), store.table.tolist())
+        self.assertEqual((expected.cu_ids, expected.var_names, expected.lines),
+                         (store.cu_ids, store.var_names, store.lines))
@@ -12,6 +12,7 @@ import networkx as nx  # type:ignore
 
 from discopop_explorer.PETGraphX import CUNode, DepType, Dependency, EdgeType, NodeType, PETGraphX
 from discopop_explorer.pattern_detectors.do_all_detector import run_detection as detect_do_all
+from discopop_explorer.pattern_detectors.pipeline_analysis import dependency_matrix
 from discopop_explorer.pattern_detectors.pipeline_detector import run_detection as detect_pipeline
 from discopop_explorer.pattern_detectors.reduction_detector import run_detection as detect_reduction
 from discopop_explorer.variable import Variable
@@ -112,6 +113,13 @@ class PipelineDetector(unittest.TestCase):
         patterns = detect_pipeline(PETGraphX(g, reduction_vars, {}))
         self.assertListEqual([pattern.node_id for pattern in patterns], expected_node_ids)
 
+    def test_dependency_matrix(self):
+        """Bit j of the bitset of stage i is entry [i, j] of the dependency matrix"""
+        stages = 11
+        dependencies = [(1 << (i - 1) if i else 0) | (1 << 10 if i == 8 else 0) for i in range(stages)]
+        expected = [[j == i - 1 or (i, j) == (8, 10) for j in range(stages)] for i in range(stages)]
+        self.assertListEqual(dependency_matrix(dependencies).tolist(), expected)
+
     def test_reduction_pattern(self):
         """Pipeline detection on loop with a reduction on a variable"""
         g, reduction_vars, loop_node, *_ = loop_with_reduction()
@@ -0,0 +1,297 @@
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+import os
+import random
+import unittest
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import networkx as nx  # type:ignore
+
+from discopop_explorer.PETGraphX import CUNode, Dependency, DependencyStore, DepType, EdgeType, LoopSummary, NodeType, \
+    PETGraphX
+from discopop_explorer.parser import parse_inputs
+from discopop_explorer.utils import calculate_workload, depends, total_instructions_count
+
+
+TEST_INPUTS = Path(__file__).parent.parent.parent / 'test'
+
+
+def build_pet(nodes: List[CUNode], children: Dict[str, List[str]],
+              dependencies: Optional[DependencyStore] = None) -> PETGraphX:
+    """PET graph of the nodes in the given order with child edges in the given order"""
+    g = nx.MultiDiGraph()
+    for node in nodes:
+        g.add_node(node.id, data=node)
+    for parent, node_children in children.items():
+        for child in node_children:
+            g.add_edge(parent, child, data=Dependency(EdgeType.CHILD))
+    return PETGraphX(g, [], {}, dependencies)
+
+
+def load_test_input(name: str) -> PETGraphX:
+    data = TEST_INPUTS / name / 'data'
+    return PETGraphX.from_parsed_input(*parse_inputs(
+        os.path.join(data, 'Data.xml'), os.path.join(data, 'dp_run_dep.txt'),
+        os.path.join(data, 'loop_counter_output.txt'), os.path.join(data, 'reduction.txt')))
+
+
+def cu(node_id: str, instructions: int, basic_block_id: str = '') -> CUNode:
+    return CUNode.from_kwargs(node_id, type=NodeType.CU, name='', source_file=1, start_line=0, end_line=0,
+                              instructions_count=instructions, basic_block_id=basic_block_id)
+
+
+def region(node_id: str, node_type: NodeType, name: str = '', iterations: int = -1, start_line: int = 0) -> CUNode:
+    return CUNode.from_kwargs(node_id, type=node_type, name=name, source_file=1, start_line=start_line, end_line=0,
+                              loop_iterations=iterations)
+
+
+def program_with_calls(dependencies: Optional[DependencyStore] = None) -> Tuple[PETGraphX, Dict[str, CUNode]]:
+    """main calls f from a CU and from the body of a loop with 10 iterations, f and g call each other"""
+    nodes = {n.id: n for n in [
+        region('1:0', NodeType.FUNC, 'main'),
+        cu('1:1', 5),
+        region('1:2', NodeType.LOOP, iterations=10),
+        cu('1:3', 2, 'for.cond'),
+        cu('1:4', 3, 'for.body'),
+        cu('1:5', 1, 'for.inc'),
+        region('1:6', NodeType.FUNC, 'f'),
+        cu('1:7', 4),
+        region('1:8', NodeType.FUNC, 'g'),
+        cu('1:9', 6),
+        region('1:10', NodeType.DUMMY, 'external'),
+    ]}
+    children = {
+        '1:0': ['1:1', '1:2'],
+        '1:1': ['1:6', '1:10'],
+        '1:2': ['1:3', '1:4', '1:5'],
+        '1:4': ['1:6'],
+        '1:6': ['1:7'],
+        '1:7': ['1:8'],
+        '1:8': ['1:9'],
+        '1:9': ['1:6'],
+    }
+    return build_pet(list(nodes.values()), children, dependencies), nodes
+
+
+class WorkloadTest(unittest.TestCase):
+    def test_instructions_and_workload(self):
+        """Called functions count once per call, loop bodies are weighted by the iterations"""
+        pet, nodes = program_with_calls()
+        expected = {
+            # the traversal enters the recursion of f and g at f, thus f includes g, but g does not include f
+            '1:9': (6, 6), '1:8': (6, 6), '1:7': (10, 10), '1:6': (10, 10),
+            '1:10': (0, 0),
+            # CU calling f
+            '1:1': (15, 15),
+            # condition executed iterations + 1 times, increment once, body calling f every iteration
+            '1:3': (2, 2), '1:4': (13, 13), '1:5': (1, 1),
+            '1:2': (16, 2 * 11 + 13 * 10 + 1),
+            '1:0': (31, 15 + 153),
+        }
+        for node_id, (instructions, workload) in expected.items():
+            with self.subTest(node=node_id):
+                self.assertEqual(instructions, pet.total_instructions_count(nodes[node_id]))
+                self.assertEqual(workload, pet.workload(nodes[node_id]))
+                self.assertEqual(instructions, total_instructions_count(pet, nodes[node_id]))
+                self.assertEqual(workload, calculate_workload(pet, nodes[node_id]))
+
+
+class CUNodeIdentityTest(unittest.TestCase):
+    def test_equal_by_id_across_graphs(self):
+        """Nodes are equal and hash alike by id, in any graph and without one, also after the index changed"""
+        pet, nodes = program_with_calls()
+        loop = nodes['1:2']
+        in_set = {loop}
+        detached = cu('1:2', 0)
+        self.assertEqual(-1, detached.index)
+        self.assertEqual(loop, detached)
+        self.assertIn(detached, in_set)
+
+        # the same node object at another position of another graph
+        other = build_pet([nodes['1:3'], loop], {'1:2': ['1:3']})
+        self.assertEqual(1, loop.index)
+        self.assertIn(loop, in_set)
+        self.assertEqual(hash(detached), hash(loop))
+        self.assertEqual([loop], [n for n in other.all_nodes() if n == detached])
+        self.assertNotEqual(loop, nodes['1:3'])
+
+
+def subtree_reference(pet: PETGraphX, root: CUNode, type: Optional[NodeType], visited: Set[str]) -> List[CUNode]:
+    """Recursive depth-first search along the child edges, visiting every node once"""
+    if root.id in visited:
+        return []
+    visited.add(root.id)
+    res = [root] if type is None or root.type == type else []
+    for _, t, _ in pet.out_edges(root.id, EdgeType.CHILD):
+        res.extend(subtree_reference(pet, pet.node_at(t), type, visited))
+    return res
+
+
+class SubtreeIndexTest(unittest.TestCase):
+    def assert_subtrees(self, pet: PETGraphX):
+        nodes = pet.all_nodes()
+        for root in nodes:
+            for type in [None, NodeType.CU, NodeType.FUNC, NodeType.LOOP]:
+                with self.subTest(root=root.id, type=type):
+                    self.assertEqual(subtree_reference(pet, root, type, set()), pet.subtree_of_type(root, type))
+            subtree = {n.id for n in subtree_reference(pet, root, None, set())}
+            for node in nodes:
+                with self.subTest(root=root.id, node=node.id):
+                    self.assertEqual(node.id in subtree, pet.is_in_subtree(node, root))
+
+    def test_shared_function_and_recursion(self):
+        """Functions called from several nodes and recursive calls are visited once, in depth-first order"""
+        pet, nodes = program_with_calls()
+        self.assertEqual(['1:6', '1:7', '1:8', '1:9'], [n.id for n in pet.subtree_of_type(nodes['1:6'], None)])
+        self.assertEqual(['1:4', '1:6', '1:7', '1:8', '1:9'], [n.id for n in pet.subtree_of_type(nodes['1:4'], None)])
+        self.assertEqual(['1:8', '1:9', '1:6', '1:7'], [n.id for n in pet.subtree_of_type(nodes['1:8'], None)])
+        self.assertTrue(pet.is_in_subtree(nodes['1:6'], nodes['1:9']))
+        self.assertTrue(pet.is_in_subtree(nodes['1:9'], nodes['1:4']))
+        self.assertFalse(pet.is_in_subtree(nodes['1:1'], nodes['1:2']))
+        self.assert_subtrees(pet)
+
+    def test_random_graphs(self):
+        """The index answers like the search on graphs with shared nodes and cycles"""
+        rnd = random.Random(0)
+        types = [NodeType.CU, NodeType.FUNC, NodeType.LOOP]
+        for _ in range(20):
+            nodes = [region(f'1:{i}', rnd.choice(types)) for i in range(30)]
+            children: Dict[str, List[str]] = {}
+            for i in range(60):
+                parent, child = rnd.sample(nodes, 2)
+                if child.id not in children.get(parent.id, []):
+                    children.setdefault(parent.id, []).append(child.id)
+            self.assert_subtrees(build_pet(nodes, children))
+
+
+def loop_indices_reference(pet: PETGraphX, loop: CUNode) -> Set[Optional[str]]:
+    """Raw dependencies within the CUs of the loop occurring in the header of the loop or a nested loop"""
+    cu_nodes = pet.subtree_of_type(loop, NodeType.CU)
+    cu_ids = {v.id for v in cu_nodes}
+    start_lines = {v.start_position() for v in pet.subtree_of_type(loop, NodeType.LOOP)}
+    return {d.var_name for v in cu_nodes for _, t, d in pet.out_edges(v.id, EdgeType.DATA, DepType.RAW)
+            if d.sink == d.source and d.source in start_lines and t in cu_ids}
+
+
+class LoopIndexTest(unittest.TestCase):
+    def test_nested_loops(self):
+        """Indices of nested loops belong to the enclosing loops, if both CUs are inside"""
+        nodes = [region('1:0', NodeType.LOOP, start_line=2), cu('1:1', 1),
+                 region('1:2', NodeType.LOOP, start_line=4), cu('1:3', 1), cu('1:4', 1)]
+        dependencies = DependencyStore()
+        dependencies.add('1:1', '1:1', DepType.RAW, 'i', '1:2', '1:2')
+        dependencies.add('1:3', '1:3', DepType.RAW, 'j', '1:4', '1:4')
+        # source outside of the loops
+        dependencies.add('1:3', '1:4', DepType.RAW, 'k', '1:4', '1:4')
+        # not in a header
+        dependencies.add('1:3', '1:3', DepType.RAW, 'x', '1:5', '1:5')
+        dependencies.add('1:3', '1:3', DepType.WAR, 'y', '1:4', '1:4')
+        pet = build_pet(nodes, {'1:0': ['1:1', '1:2'], '1:2': ['1:3']}, dependencies)
+        outer, inner = nodes[0], nodes[2]
+        self.assertEqual({'i', 'j'}, pet.loop_index_variables(outer))
+        self.assertEqual({'j'}, pet.loop_index_variables(inner))
+        self.assertTrue(pet.is_loop_index_of(outer, 'j'))
+        self.assertFalse(pet.is_loop_index_of(inner, 'i'))
+        self.assertEqual(set(), pet.loop_index_variables(nodes[1]))
+
+    def test_test_inputs(self):
+        """The table equals the per-loop computation on the test inputs"""
+        for name in ['reduction', 'mergesort', 'simple_pipeline']:
+            pet = load_test_input(name)
+            for loop in pet.all_nodes(NodeType.LOOP):
+                with self.subTest(input=name, loop=loop.id):
+                    expected = loop_indices_reference(pet, loop)
+                    self.assertEqual(expected, pet.loop_index_variables(loop))
+                    self.assertEqual(expected, pet.loop_summary(loop).loop_indices)
+
+
+def written_variables_reference(summary: LoopSummary) -> Set[Optional[str]]:
+    """Variables of the war and waw sinks and raw sources of the loop outside of the loop headers"""
+    start_lines = set(summary.loops_start_lines)
+    written = {d.var_name for _, _, d in chain(summary.out_deps[DepType.WAR], summary.out_deps[DepType.WAW])
+               if d.sink not in start_lines}
+    written.update(d.var_name for _, _, d in summary.in_deps[DepType.RAW] if d.source not in start_lines)
+    return written
+
+
+class LoopSummaryTest(unittest.TestCase):
+    def test_written_variables(self):
+        """Variables written in the loop body, the headers of the loop and its nested loops do not count"""
+        nodes = [region('1:0', NodeType.LOOP, start_line=2), cu('1:1', 1),
+                 region('1:2', NodeType.LOOP, start_line=4), cu('1:3', 1), cu('1:4', 1)]
+        dependencies = DependencyStore()
+        dependencies.add('1:1', '1:3', DepType.WAR, 'a', '1:3', '1:5')
+        dependencies.add('1:3', '1:3', DepType.WAW, 'b', '1:5', '1:5')
+        # read after the loop
+        dependencies.add('1:4', '1:3', DepType.RAW, 'c', '1:9', '1:5')
+        dependencies.add('1:3', '1:1', DepType.RAW, None, '1:5', '1:3')
+        # loop headers
+        dependencies.add('1:1', '1:1', DepType.WAR, 'i', '1:2', '1:2')
+        dependencies.add('1:3', '1:3', DepType.WAW, 'j', '1:4', '1:4')
+        dependencies.add('1:3', '1:3', DepType.RAW, 'j', '1:5', '1:4')
+        # read inside, written outside of the loop
+        dependencies.add('1:3', '1:4', DepType.RAW, 'x', '1:5', '1:9')
+        dependencies.add('1:4', '1:4', DepType.WAR, 'y', '1:9', '1:9')
+        pet = build_pet(nodes, {'1:0': ['1:1', '1:2'], '1:2': ['1:3']}, dependencies)
+        summary = pet.loop_summary(nodes[0])
+        self.assertEqual({'a', 'b', 'c', None}, summary.written_vars)
+        self.assertEqual(written_variables_reference(summary), summary.written_vars)
+        self.assertEqual({'b', 'c'}, pet.loop_summary(nodes[2]).written_vars)
+
+    def test_test_inputs(self):
+        """The written variables equal the selection on the collected dependencies on the test inputs"""
+        for name in ['reduction', 'mergesort', 'simple_pipeline']:
+            pet = load_test_input(name)
+            for loop in pet.all_nodes(NodeType.LOOP):
+                with self.subTest(input=name, loop=loop.id):
+                    summary = pet.loop_summary(loop)
+                    self.assertEqual(written_variables_reference(summary), summary.written_vars)
+
+
+class SiblingDependenciesTest(unittest.TestCase):
+    def assert_pairwise(self, pet: PETGraphX, nodes: List[CUNode], root_loop: Optional[CUNode] = None) -> List[int]:
+        """Compares the matrix with the pairwise dependency checks
+
+        :return: matrix
+        """
+        matrix = pet.sibling_dependencies(nodes, root_loop)
+        for i, source in enumerate(nodes):
+            for j, target in enumerate(nodes):
+                with self.subTest(source=source.id, target=target.id, root_loop=root_loop):
+                    expected = depends(pet, source, target) if root_loop is None else \
+                        pet.depends_ignore_readonly(source, target, root_loop)
+                    self.assertEqual(expected, bool(matrix[i] >> j & 1))
+        return matrix
+
+    def test_calls_and_loop_header(self):
+        """Dependencies into called functions count for every caller, loop indices only without root loop"""
+        dependencies = DependencyStore()
+        # the body reads the index incremented in the header and a variable written by the condition
+        dependencies.add('1:4', '1:5', DepType.RAW, 'i', '1:0', '1:0')
+        dependencies.add('1:4', '1:3', DepType.RAW, 'x', '1:1', '1:1')
+        # the condition reads a result of f, called from the body
+        dependencies.add('1:3', '1:9', DepType.RAW, 'y', '1:1', '1:1')
+        pet, nodes = program_with_calls(dependencies)
+
+        loop, loop_children = nodes['1:2'], [nodes['1:3'], nodes['1:4'], nodes['1:5']]
+        self.assertEqual([0b010, 0b101, 0b000], self.assert_pairwise(pet, loop_children))
+        self.assertEqual([0b010, 0b001, 0b000], self.assert_pairwise(pet, loop_children, loop))
+        self.assert_pairwise(pet, pet.direct_children(nodes['1:0']))
+
+    def test_test_inputs(self):
+        """The matrices equal the pairwise checks for the children of all nodes and loops of the test inputs"""
+        for name in ['reduction', 'mergesort', 'simple_pipeline']:
+            pet = load_test_input(name)
+            for node in pet.all_nodes():
+                children = pet.direct_children(node)
+                self.assert_pairwise(pet, children)
+                if node.type == NodeType.LOOP:
+                    self.assert_pairwise(pet, children, node)
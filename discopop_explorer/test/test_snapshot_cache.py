@@ -0,0 +1,84 @@
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from typing import List
+
+from discopop_explorer.snapshot_cache import load_pet, load_snapshot
+
+unpickled: List[bool] = []
+
+
+def record_unpickling():
+    unpickled.append(True)
+
+
+class Payload(object):
+    """Records when it is unpickled"""
+    def __reduce__(self):
+        return record_unpickling, ()
+
+
+class SnapshotCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        data = Path(__file__).parent.parent.parent / 'test' / 'reduction' / 'data'
+        self.input_files = [shutil.copy(os.path.join(data, f), self.tmp_dir)
+                            for f in ['Data.xml', 'dp_run_dep.txt', 'loop_counter_output.txt', 'reduction.txt']]
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        load_pet(*self.input_files, cache_dir=self.cache_dir)
+        self.snapshot = os.path.join(self.cache_dir, os.listdir(self.cache_dir)[0])
+        del unpickled[:]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_snapshot_reused(self):
+        """The snapshot is loaded while the input files are unchanged"""
+        self.assertIsNotNone(load_snapshot(self.cache_dir, self.input_files))
+
+    def test_modified_input_invalidates_snapshot(self):
+        """A modified input file invalidates the snapshot, the next run replaces it"""
+        with open(self.input_files[2]) as f:
+            first_line = f.readline()
+        with open(self.input_files[2], 'a') as f:
+            f.write(first_line)
+        self.assertIsNone(load_snapshot(self.cache_dir, self.input_files))
+
+        load_pet(*self.input_files, cache_dir=self.cache_dir)
+        self.assertIsNotNone(load_snapshot(self.cache_dir, self.input_files))
+
+    def test_touched_input_invalidates_snapshot(self):
+        """Changing the modification time of an input file invalidates the snapshot"""
+        stat = os.stat(self.input_files[0])
+        os.utime(self.input_files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+        self.assertIsNone(load_snapshot(self.cache_dir, self.input_files))
+
+    def test_foreign_file_not_unpickled(self):
+        """Files without a matching header are not unpickled"""
+        with open(self.snapshot, 'rb') as f:
+            header = f.readline()
+        outdated_header = header[:-2] + (b'0' if header[-2:-1] != b'0' else b'1') + b'\n'
+        for content in [pickle.dumps(Payload()), outdated_header + pickle.dumps(Payload())]:
+            with open(self.snapshot, 'wb') as f:
+                f.write(content)
+            self.assertIsNone(load_snapshot(self.cache_dir, self.input_files))
+        self.assertEqual([], unpickled)
+
+    def test_truncated_snapshot(self):
+        """A truncated snapshot is ignored"""
+        with open(self.snapshot, 'rb') as f:
+            content = f.read()
+        with open(self.snapshot, 'wb') as f:
+            f.write(content[:len(content) // 2])
+        self.assertIsNone(load_snapshot(self.cache_dir, self.input_files))
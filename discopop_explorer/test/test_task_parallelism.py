@@ -0,0 +1,183 @@
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+import json
+import os
+import re
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from lxml import etree  # type:ignore
+
+from discopop_explorer.pattern_detectors.task_parallelism import tp_utils
+from discopop_explorer.pattern_detectors.task_parallelism.cu_model import CUModel
+from discopop_explorer.pattern_detectors.task_parallelism.preprocessor import cu_xml_preprocessing
+from discopop_explorer.snapshot_cache import load_pet
+
+MERGESORT = Path(__file__).parent.parent.parent / 'test' / 'mergesort' / 'data'
+
+# behaves like llvm-cxxfilt: fails on options, skips empty names, prints one line per other name,
+# except for names starting with _Zskip, and logs its arguments
+LLVM_CXXFILT_STUB = """#!{python}
+import json
+import sys
+with open({log!r}, 'a') as log:
+    log.write(json.dumps(sys.argv[1:]) + '\\n')
+if any(name.startswith('-') for name in sys.argv[1:]):
+    sys.exit(1)
+for name in sys.argv[1:]:
+    if name and not name.startswith('_Zskip'):
+        print('demangled ' + name)
+"""
+
+
+class CUModelTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.files = [str(MERGESORT / f) for f in ['Data.xml', 'dp_run_dep.txt', 'loop_counter_output.txt',
+                                                   'reduction.txt']]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_several_root_elements(self):
+        """The nodes of all <Nodes> root elements are parsed in document order"""
+        cu_xml = os.path.join(self.tmp_dir, 'Data.xml')
+        with open(cu_xml, 'w') as f:
+            f.write('<Nodes>\n<Node id="1:0"><a>x</a></Node>\n</Nodes>\n<Nodes>\n'
+                    '<Node id="1:1"/>\n<Node id="2:0"/>\n</Nodes>\n')
+        cu_model = CUModel(cu_xml)
+        self.assertEqual(['1:0', '1:1', '2:0'], [node.get('id') for node in cu_model.nodes()])
+        self.assertEqual('x', cu_model.root.Node.a.text)
+
+    def test_graph_input(self):
+        """The PET graph built from the parsed nodes equals the one built from the file"""
+        expected = load_pet(*self.files)
+        pet = load_pet(*self.files, cu_model=CUModel(self.files[0]))
+        self.assertEqual(sorted(expected.g.nodes), sorted(pet.g.nodes))
+        self.assertEqual(sorted(expected.g.edges(keys=True)), sorted(pet.g.edges(keys=True)))
+        self.assertEqual([vars(node) for node in expected.all_nodes()], [vars(node) for node in pet.all_nodes()])
+        self.assertEqual((expected.dependencies.cu_ids, expected.dependencies.var_names,
+                          expected.dependencies.table.tolist()),
+                         (pet.dependencies.cu_ids, pet.dependencies.var_names, pet.dependencies.table.tolist()))
+
+
+class PreprocessorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        # the test input predates the return instruction entries of CU nodes, the preprocessor requires them
+        with open(MERGESORT / 'Data.xml') as f:
+            content = f.read()
+        self.cu_xml = os.path.join(self.tmp_dir, 'Data.xml')
+        with open(self.cu_xml, 'w') as f:
+            f.write(re.sub(r'(<Node [^>]*type="0"[^>]*>)', r'\1<returnInstructions count="0"/>', content))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_split_mergesort(self):
+        """The CU of sort calling sort twice is split into one CU per call, the last CU keeps the call of merge"""
+        cu_model = CUModel(self.cu_xml)
+        preprocessed_cu_xml = os.path.join(self.tmp_dir, 'Data_preprocessed.xml')
+        self.assertEqual(2, cu_xml_preprocessing(cu_model, preprocessed_cu_xml))
+
+        nodes = {node.get('id'): node for node in cu_model.nodes()}
+        self.assertEqual('2:22,2:23,2:24,2:28,2:37,2:38', nodes['2:21'].childrenNodes.text)
+        split = [(node_id, nodes[node_id].get('startsAtLine'), nodes[node_id].get('endsAtLine'),
+                  nodes[node_id].instructionLines.text, nodes[node_id].childrenNodes.text,
+                  [cu.text for cu in nodes[node_id].successors.iterchildren('CU')],
+                  [call.text for call in nodes[node_id].callsNode.iterchildren('recursiveFunctionCall')])
+                 for node_id in ['2:24', '2:37', '2:38']]
+        self.assertEqual([('2:24', '2:46', '2:46', '2:46', '2:25', ['2:37'], ['_Z4sortPiii 2:46,']),
+                          ('2:37', '2:47', '2:47', '2:47', '2:26', ['2:38'], ['_Z4sortPiii 2:47,']),
+                          ('2:38', '2:48', '2:49', '2:48,2:49', '2:27', ['2:28'], [None])], split)
+        self.assertEqual(len(nodes), len(list(cu_model.nodes())))
+
+        with open(preprocessed_cu_xml, 'rb') as f:
+            self.assertEqual(etree.tostring(cu_model.root, pretty_print=True), f.read())
+
+
+class DemangleTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.log = os.path.join(self.tmp_dir, 'invocations.txt')
+        stub = os.path.join(self.tmp_dir, 'llvm-cxxfilt')
+        with open(stub, 'w') as f:
+            f.write(LLVM_CXXFILT_STUB.format(python=sys.executable, log=self.log))
+        os.chmod(stub, os.stat(stub).st_mode | stat.S_IXUSR)
+        tp_utils.set_global_llvm_cxxfilt_path(stub)
+        tp_utils.demangling_cache.clear()
+
+    def tearDown(self):
+        tp_utils.set_global_llvm_cxxfilt_path('None')
+        tp_utils.demangling_cache.clear()
+        shutil.rmtree(self.tmp_dir)
+
+    def invocations(self):
+        with open(self.log) as f:
+            return [json.loads(line) for line in f]
+
+    def test_batch(self):
+        """Names are demangled in one invocation and cached"""
+        tp_utils.demangle_all(['_Z1bv', '_Z1av', '_Z1bv'])
+        self.assertEqual('demangled _Z1av', tp_utils.demangle('_Z1av'))
+        self.assertEqual('demangled _Z1bv', tp_utils.demangle('_Z1bv'))
+        self.assertEqual([['_Z1av', '_Z1bv']], self.invocations())
+
+    def test_option_like_and_empty_names(self):
+        """Option-like and empty names are demangled one by one, the other names in one batch"""
+        tp_utils.demangle_all(['_Z1av', '-x', '', '_Z1bv'])
+        self.assertEqual({'_Z1av': 'demangled _Z1av', '_Z1bv': 'demangled _Z1bv', '-x': '', '': ''},
+                         tp_utils.demangling_cache)
+        self.assertEqual([[''], ['-x'], ['_Z1av', '_Z1bv']], self.invocations())
+
+    def test_short_output(self):
+        """If the output of a batch is incomplete, its names are demangled one by one"""
+        tp_utils.demangle_all(['_Z1av', '_Zskip1v', '_Z1bv'])
+        self.assertEqual({'_Z1av': 'demangled _Z1av', '_Z1bv': 'demangled _Z1bv', '_Zskip1v': ''},
+                         tp_utils.demangling_cache)
+        self.assertEqual([['_Z1av', '_Z1bv', '_Zskip1v'], ['_Z1av'], ['_Z1bv'], ['_Zskip1v']], self.invocations())
+
+
+class FunctionCallFromSourceCodeTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source_file = os.path.join(self.tmp_dir, 'main.c')
+        with open(self.source_file, 'w') as f:
+            f.write('int main() {\n  foo(a,\n      b);\n  int z = baz(1);\n  int y = 0;\n}\n')
+        self.file_mapping = {'1': self.source_file}
+        tp_utils.clear_source_code_cache()
+
+    def tearDown(self):
+        tp_utils.clear_source_code_cache()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cached_calls(self):
+        """Function calls spanning several lines are extracted, each file is read once until the cache is cleared"""
+        self.assertEqual('  foo(a,      b);', tp_utils.get_function_call_from_source_code(self.file_mapping, 2, '1'))
+        with open(self.source_file, 'w') as f:
+            f.write('int main() {\n  bar();\n')
+        self.assertEqual('  foo(a,      b);',
+                         tp_utils.get_function_call_from_source_code(self.file_mapping, 2, '1', 'foo'))
+        self.assertEqual('  int z = baz(1);  int y = 0;',
+                         tp_utils.get_function_call_from_source_code(self.file_mapping, 4, '1', 'baz'))
+
+        tp_utils.clear_source_code_cache()
+        self.assertEqual('  bar();', tp_utils.get_function_call_from_source_code(self.file_mapping, 2, '1'))
+
+    def test_missing_call(self):
+        """Lines without a complete function call until the end of the file raise an IndexError, also if cached"""
+        with self.assertRaises(IndexError):
+            tp_utils.get_function_call_from_source_code(self.file_mapping, 5, '1')
+        os.remove(self.source_file)
+        with self.assertRaises(IndexError):
+            tp_utils.get_function_call_from_source_code(self.file_mapping, 5, '1')
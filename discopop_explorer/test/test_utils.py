@@ -0,0 +1,128 @@
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+import random
+import unittest
+from itertools import chain
+from typing import List, Set, Tuple, cast
+
+from discopop_explorer.PETGraphX import Dependency, DepType, EdgeType, NodeType
+from discopop_explorer.test.test_pet_graph import load_test_input
+from discopop_explorer.utils import VariableDependencies, classify_loop_variables, classify_task_vars, \
+    is_first_written, is_first_written_new, is_read_in, is_read_in_subtree, is_readonly, is_written_in_subtree
+from discopop_explorer.variable import Variable
+
+Deps = List[Tuple[str, str, Dependency]]
+
+
+def random_dependencies(rnd: random.Random, count: int) -> Deps:
+    """Dependencies between few CUs and lines on variables whose names contain each other"""
+    deps = []
+    for _ in range(count):
+        dep = Dependency(EdgeType.DATA)
+        dep.var_name = rnd.choice(['a', 'ab', 'b', 'b.x'])
+        dep.sink = rnd.choice(['1:1', '1:2', '1:3'])
+        dep.source = rnd.choice(['1:1', '1:2', '1:3'])
+        deps.append((rnd.choice(['1:1', '1:2', '1:3']), rnd.choice(['1:1', '1:2', '1:3']), dep))
+    return deps
+
+
+# the helpers as they were before the dependencies were grouped by variable, scanning all dependencies
+
+def is_read_in_reference(var: str, raw: Deps, war: Deps, rev_raw: Deps, rev_war: Deps, tree: Set[str]) -> bool:
+    return (any(d.var_name == var for _, _, d in chain(raw, rev_war))
+            or any(d.var_name == var and t in tree for _, t, d in chain(war, rev_raw)))
+
+
+def is_first_written_reference(var: str, raw: Deps, war: Deps, tree: Set[str]) -> bool:
+    for s, t, d in war:
+        if d.var_name == var and t in tree and not any(draw.var_name == var and s == draw.sink for _, _, draw in raw):
+            return False
+    return True
+
+
+def is_first_written_new_reference(var: str, raw: Deps, war: Deps, rev_raw: Deps, rev_war: Deps,
+                                   tree: Set[str]) -> bool:
+    result = False
+    for _, t, d in raw:
+        if var in cast(str, d.var_name) and t in tree:
+            result = not any(var in cast(str, dwar.var_name) and d.source == dwar.sink for _, _, dwar in war)
+    return result or not is_read_in_reference(var, raw, war, rev_raw, rev_war, tree)
+
+
+def classification_names(classification) -> List[List[str]]:
+    return [[v.name for v in variables] for variables in classification]
+
+
+class VariableDependenciesTest(unittest.TestCase):
+    def test_helpers_equal_scans(self):
+        """The helpers on dependencies grouped by variable answer like scans over all dependencies"""
+        rnd = random.Random(0)
+        for _ in range(200):
+            raw, war, waw, rev_raw, rev_war = [random_dependencies(rnd, rnd.randrange(6)) for _ in range(5)]
+            tree = set(rnd.sample(['1:1', '1:2', '1:3'], rnd.randrange(4)))
+            grouped = [VariableDependencies(deps) for deps in [raw, war, waw, rev_raw, rev_war]]
+            for var in ['a', 'ab', 'b', 'b.x', 'c']:
+                with self.subTest(raw=raw, war=war, waw=waw, rev_raw=rev_raw, rev_war=rev_war, tree=tree, var=var):
+                    self.assertEqual(any(d.var_name == var and t in tree for _, t, d in chain(raw, waw)),
+                                     is_written_in_subtree(var, grouped[0], grouped[2], tree))
+                    self.assertEqual(not any(d.var_name == var for _, _, d in chain(war, waw, rev_raw)),
+                                     is_readonly(var, grouped[1], grouped[2], grouped[3]))
+                    self.assertEqual(any(d.var_name == var and t in tree for _, t, d in rev_raw),
+                                     is_read_in_subtree(var, grouped[3], tree))
+                    self.assertEqual(is_read_in_reference(var, raw, war, rev_raw, rev_war, tree),
+                                     is_read_in(Variable('int', var), grouped[0], grouped[1], grouped[3],
+                                                grouped[4], tree))
+                    self.assertEqual(is_first_written_reference(var, raw, war, tree),
+                                     is_first_written(var, grouped[0], grouped[1], tree))
+                    self.assertEqual(is_first_written_new_reference(var, raw, war, rev_raw, rev_war, tree),
+                                     is_first_written_new(Variable('int', var), grouped[0], grouped[1], grouped[3],
+                                                          grouped[4], tree))
+
+
+class ClassificationCacheTest(unittest.TestCase):
+    def test_cached_loop_classification(self):
+        """The cached classification is returned as copies and recomputed after the graph changed"""
+        pet = load_test_input('reduction')
+        loop = pet.node_at('7:2')
+        classification = classify_loop_variables(pet, loop)
+        self.assertEqual([['global_array'], ['i', 'local_var'], [], [], []],
+                         [sorted(names) for names in classification_names(classification)])
+        for variables in classification:
+            variables.clear()
+        self.assertEqual([['global_array'], ['i', 'local_var'], [], [], []],
+                         [sorted(names) for names in classification_names(classify_loop_variables(pet, loop))])
+
+        # the CU using global_array and local_var
+        pet.remove_node('7:4')
+        removed = load_test_input('reduction')
+        removed.remove_node('7:4')
+        self.assertEqual([[], ['i'], [], [], []], classification_names(classify_loop_variables(pet, loop)))
+        self.assertEqual(classification_names(classify_loop_variables(removed, removed.node_at('7:2'))),
+                         classification_names(classify_loop_variables(pet, loop)))
+
+    def test_cached_task_classification(self):
+        """Task classifications are cached per task and dependencies, and recomputed after the graph changed"""
+        pet = load_test_input('reduction')
+        fresh = load_test_input('reduction')
+        for node in pet.all_nodes(NodeType.CU)[:20]:
+            expected = classification_names(classify_task_vars(
+                fresh, fresh.node_at(node.id), '', list(fresh.in_edges(node.id, EdgeType.DATA)),
+                list(fresh.out_edges(node.id, EdgeType.DATA))))
+            in_deps = list(pet.in_edges(node.id, EdgeType.DATA))
+            out_deps = list(pet.out_edges(node.id, EdgeType.DATA))
+            for _ in range(2):
+                with self.subTest(node=node.id):
+                    self.assertEqual(expected, classification_names(classify_task_vars(pet, node, '', in_deps,
+                                                                                       out_deps)))
+        self.assertEqual(20, len(pet._classifications))
+
+        loop = pet.node_at('7:2')
+        before = classification_names(classify_task_vars(pet, loop, 'loop', [], []))
+        pet.remove_node('7:4')
+        self.assertNotEqual(before, classification_names(classify_task_vars(pet, loop, 'loop', [], [])))
@@ -7,18 +7,15 @@
 # directory for details.
 
 
-import itertools
-from typing import List, Set, Dict, Tuple
+from typing import Container, Iterable, List, Optional, Sequence, Set, Dict, Tuple, Union, cast
 
 import numpy as np
 
 from .PETGraphX import PETGraphX, NodeType, CUNode, DepType, EdgeType, Dependency
 from .variable import Variable
 
-loop_data: Dict[str, int] = {}
 
-
-def correlation_coefficient(v1: List[float], v2: List[float]) -> float:
+def correlation_coefficient(v1: Union[List[float], np.ndarray], v2: Union[List[float], np.ndarray]) -> float:
     """Calculates correlation coefficient as (A dot B) / (norm(A) * norm(B))
 
     :param v1: first vector
@@ -37,7 +34,7 @@ def find_subnodes(pet: PETGraphX, node: CUNode, criteria: EdgeType) -> List[CUNo
     :param criteria: EdgeType, type of edges to traverse
     :return: list of children nodes
     """
-    return [pet.node_at(t) for s, t, d in pet.out_edges(node.id) if d.etype == criteria]
+    return [pet.node_at(t) for s, t, d in pet.out_edges(node.id, criteria)]
 
 
 def depends(pet: PETGraphX, source: CUNode, target: CUNode) -> bool:
@@ -50,15 +47,12 @@ def depends(pet: PETGraphX, source: CUNode, target: CUNode) -> bool:
     """
     if source == target:
         return False
-    # target_nodes = pet.get_left_right_subtree(target, True)
-    target_nodes = pet.subtree_of_type(target, None)
-
     # for node in pet.get_left_right_subtree(source, True):
     for node in pet.subtree_of_type(source, NodeType.CU):
         # for dep in [e.target() for e in pet.out_edges(node.id, EdgeType.DATA)]: # if e.dtype == 'RAW']:
-        for target in [pet.node_at(target_id) for source_id, target_id, dependence in
-                       pet.out_edges(node.id, EdgeType.DATA) if dependence.dtype == DepType.RAW]:
-            if target in target_nodes:
+        for dep_target in [pet.node_at(target_id) for source_id, target_id, dependence in
+                           pet.out_edges(node.id, EdgeType.DATA, DepType.RAW)]:
+            if pet.is_in_subtree(dep_target, target):
                 return True
     return False
 
@@ -71,64 +65,36 @@ def is_loop_index2(pet: PETGraphX, root_loop: CUNode, var_name: str) -> bool:
     :param var_name: name of the variable
     :return: true if variable is index of the loop
     """
-    loops_start_lines = [v.start_position() for v in pet.subtree_of_type(root_loop, NodeType.LOOP)]
-    return pet.is_loop_index(var_name, loops_start_lines, pet.subtree_of_type(root_loop, NodeType.CU))
+    return pet.is_loop_index_of(root_loop, var_name)
 
 
 def total_instructions_count(pet: PETGraphX, root: CUNode) -> int:
-    """Calculates total number of the instructions in the subtree of a given node
+    """Calculates total number of the instructions in the child hierarchy of a given node.
+    The instructions of called functions are included once per call, calls closing a recursion count nothing,
+    see PETGraphX.total_instructions_count.
 
     :param pet: PET graph
     :param root: root node
     :return: number of instructions
     """
-    res = 0
-    for node in pet.get_left_right_subtree(root, True):
-        res += node.instructions_count
-    return res
+    return pet.total_instructions_count(root)
 
 
 def calculate_workload(pet: PETGraphX, node: CUNode) -> int:
     """Calculates workload for a given node
-    The workload is the number of instructions multiplied by respective number of iterations
+    The workload is the number of instructions multiplied by respective number of iterations.
+    Like total_instructions_count, it includes the workload of called functions once per call,
+    calls closing a recursion contribute nothing, see PETGraphX.workload.
 
     :param pet: PET graph
     :param node: root node
     :return: workload
     """
-    res = 0
-    if node.type == NodeType.DUMMY:
-        return 0
-    elif node.type == NodeType.CU:
-        res += node.instructions_count
-    elif node.type == NodeType.FUNC:
-        for child in find_subnodes(pet, node, EdgeType.CHILD):
-            res += calculate_workload(pet, child)
-    elif node.type == NodeType.LOOP:
-        for child in find_subnodes(pet, node, EdgeType.CHILD):
-            if child.type == NodeType.CU:
-                if 'for.inc' in child.basic_block_id:
-                    res += child.instructions_count
-                elif 'for.cond' in child.basic_block_id:
-                    res += child.instructions_count * (
-                            get_loop_iterations(node.start_position()) + 1)
-                else:
-                    res += child.instructions_count * get_loop_iterations(node.start_position())
-            else:
-                res += calculate_workload(pet, child) * get_loop_iterations(node.start_position())
-    return res
-
-
-def get_loop_iterations(line: str) -> int:
-    """Calculates the number of iterations in specified loop
-
-    :param line: start line of the loop
-    """
-    return loop_data.get(line, 0)
+    return pet.workload(node)
 
 
 def __get_dep_of_type(pet: PETGraphX, node: CUNode, dep_type: DepType,
-                      reversed: bool) -> List[Tuple[str, str, Dependency]]:
+                      reversed: bool) -> Sequence[Tuple[str, str, Dependency]]:
     """Searches all dependencies of specified type
 
     :param pet: CU graph
@@ -137,8 +103,8 @@ def __get_dep_of_type(pet: PETGraphX, node: CUNode, dep_type: DepType,
     :param reversed: if true the it looks for incoming dependencies
     :return: list of dependencies
     """
-    return [e for e in (pet.in_edges(node.id, EdgeType.DATA) if reversed else pet.out_edges(node.id, EdgeType.DATA))
-            if e[2].dtype == dep_type]
+    return (pet.in_edges(node.id, EdgeType.DATA, dep_type) if reversed
+            else pet.out_edges(node.id, EdgeType.DATA, dep_type))
 
 
 def __get_variables(nodes: List[CUNode]) -> Set[Variable]:
@@ -156,6 +122,55 @@ def __get_variables(nodes: List[CUNode]) -> Set[Variable]:
     return res
 
 
+class VariableDependencies(object):
+    """Dependencies of a classified region grouped by variable name.
+    Built once per region, thus the classification helpers only look at the dependencies of the variable
+    in question instead of scanning all dependencies for every variable.
+    """
+
+    def __init__(self, deps: Iterable[Tuple[str, str, Dependency]]):
+        """
+        :param deps: dependencies, the iteration order is kept per variable
+        """
+        self.__deps: Dict[Optional[str], List[Tuple[str, str, Dependency]]] = {}
+        self.__positions: Dict[Optional[str], List[int]] = {}
+        for position, dep in enumerate(deps):
+            self.__deps.setdefault(dep[2].var_name, []).append(dep)
+            self.__positions.setdefault(dep[2].var_name, []).append(position)
+
+    def __contains__(self, var_name: Optional[str]) -> bool:
+        return var_name in self.__deps
+
+    def of(self, var_name: Optional[str]) -> List[Tuple[str, str, Dependency]]:
+        """Dependencies of the variable
+
+        :param var_name: variable name
+        :return: dependencies in iteration order
+        """
+        return self.__deps.get(var_name, [])
+
+    def positions(self, var_name: Optional[str]) -> List[int]:
+        """Positions of the dependencies of the variable in the iteration order of all dependencies
+
+        :param var_name: variable name
+        :return: position of each dependency returned by of
+        """
+        return self.__positions.get(var_name, [])
+
+    def names(self) -> List[Optional[str]]:
+        """Names of all variables with dependencies"""
+        return list(self.__deps)
+
+    def reaches(self, var_name: Optional[str], tree: Container[str]) -> bool:
+        """Checks whether a dependency of the variable has its second CU in the tree
+
+        :param var_name: variable name
+        :param tree: ids of the nodes
+        :return: true if a dependency reaches the tree
+        """
+        return any(dep[1] in tree for dep in self.of(var_name))
+
+
 def is_reduction_var(line: str, name: str, reduction_vars: List[Dict[str, str]]) -> bool:
     """Determines, whether or not the given variable is reduction variable
 
@@ -182,20 +197,17 @@ def is_reduction_any(possible_lines: List[str], name: str, reduction_vars: List[
     return False
 
 
-def is_written_in_subtree(var_name: str, raw: Set[Tuple[str, str, Dependency]],
-                          waw: Set[Tuple[str, str, Dependency]], tree: List[CUNode]) -> bool:
+def is_written_in_subtree(var_name: str, raw: VariableDependencies, waw: VariableDependencies,
+                          tree: Container[str]) -> bool:
     """ Checks if variable is written in subtree
 
     :param var_name: variable name
     :param raw: raw dependencies of the loop
     :param waw: waw dependencies of the loop
-    :param tree: subtree
+    :param tree: ids of the subtree nodes
     :return: true if is written
     """
-    for e in itertools.chain(raw, waw):
-        if e[2].var_name == var_name and any([n.id == e[1] for n in tree]):
-            return True
-    return False
+    return raw.reaches(var_name, tree) or waw.reaches(var_name, tree)
 
 
 def is_func_arg(pet: PETGraphX, var: str, node: CUNode) -> bool:
@@ -232,8 +244,7 @@ def is_scalar_val(var) -> bool:
     return not (var.type.endswith('**') or var.type.startswith('ARRAY' or var.type.startswith('[')))
 
 
-def is_readonly(var: str, war: Set[Tuple[str, str, Dependency]],
-                waw: Set[Tuple[str, str, Dependency]], rev_war: Set[Tuple[str, str, Dependency]]) -> bool:
+def is_readonly(var: str, war: VariableDependencies, waw: VariableDependencies, rev_war: VariableDependencies) -> bool:
     """Checks if variable is readonly
 
     :param var: variable name
@@ -242,10 +253,7 @@ def is_readonly(var: str, war: Set[Tuple[str, str, Dependency]],
     :param rev_war: reversed raw dependencies of the loop
     :return: trie if readonly
     """
-    for e in itertools.chain(war, waw, rev_war):
-        if e[2].var_name == var:
-            return False
-    return True
+    return var not in war and var not in waw and var not in rev_war
 
 
 def is_global(var: str, tree: List[CUNode]) -> bool:
@@ -265,33 +273,26 @@ def is_global(var: str, tree: List[CUNode]) -> bool:
     return False
 
 
-def is_first_written(var: str, raw: Set[Tuple[str, str, Dependency]],
-                     war: Set[Tuple[str, str, Dependency]], sub: List[CUNode]) -> bool:
+def is_first_written(var: str, raw: VariableDependencies, war: VariableDependencies, sub: Set[str]) -> bool:
     """Checks whether a variable is first written inside the current node
 
     :param var: variable name
     :param raw: raw dependencies of the loop
     :param war: war dependencies of the loop
-    :param sub: subtree of the loop
+    :param sub: ids of the subtree of the loop
     :return: true if first written
     """
-    for e in war:
-        if e[2].var_name == var and any([n.id == e[1] for n in sub]):
-            res = False
-            for eraw in raw:
-                # TODO check
-                if (eraw[2].var_name == var and any([n.id == e[1] for n in sub])
-                        and e[0] == eraw[2].sink):
-                    res = True
-                    break
-            if not res:
-                return False
+    # TODO check
+    raw_sinks = {eraw[2].sink for eraw in raw.of(var)}
+    for e in war.of(var):
+        if e[1] in sub and e[0] not in raw_sinks:
+            return False
     return True
 
 
-def is_first_written_new(var: Variable, raw_deps: Set[Tuple[str, str, Dependency]],
-                         war_deps: Set[Tuple[str, str, Dependency]], reverse_raw_deps: Set[Tuple[str, str, Dependency]],
-                         reverse_war_deps: Set[Tuple[str, str, Dependency]], tree: List[CUNode]):
+def is_first_written_new(var: Variable, raw_deps: VariableDependencies, war_deps: VariableDependencies,
+                         reverse_raw_deps: VariableDependencies, reverse_war_deps: VariableDependencies,
+                         tree: Container[str]):
     """Checks whether a variable is first written inside the current node
 
     :param var:
@@ -299,47 +300,43 @@ def is_first_written_new(var: Variable, raw_deps: Set[Tuple[str, str, Dependency
     :param war_deps: war dependencies of the loop
     :param reverse_raw_deps:
     :param reverse_war_deps:
-    :param tree: subtree of the loop
+    :param tree: ids of the subtree of the loop
     :return: true if first written
     """
-    result = False
     # None may occur because __get_variables doesn't check for actual elements
     if var.name is None:
         return False
     is_read = is_read_in(var, raw_deps, war_deps, reverse_raw_deps, reverse_war_deps, tree)
-    if var.name is None:
-        print("Empty var.name found. Skipping.")
-        return False
-    for dep in raw_deps:
-        assert dep[2].var_name is not None
-        if var.name in dep[2].var_name and any([n.id == dep[1] for n in tree]):
-            result = True
-            for warDep in war_deps:
-                assert warDep[2].var_name is not None
-                if (var.name in warDep[2].var_name
-                        and any([n.id == dep[1] for n in tree])
-                        and dep[2].source == warDep[2].sink):
-                    result = False
-                    break
-    return result or not is_read
-
-
-def is_read_in_subtree(var: str, rev_raw: Set[Tuple[str, str, Dependency]], tree: List[CUNode]) -> bool:
+    assert None not in raw_deps
+
+    # the result is decided by the last raw dependency on a variable containing the name
+    last: Optional[Tuple[int, Tuple[str, str, Dependency]]] = None
+    for name in raw_deps.names():
+        if var.name not in cast(str, name):
+            continue
+        for position, dep in zip(raw_deps.positions(name), raw_deps.of(name)):
+            if dep[1] in tree and (last is None or position > last[0]):
+                last = position, dep
+    if last is None:
+        return not is_read
+
+    war_sinks = {war_dep[2].sink for name in war_deps.names() if name is not None and var.name in name
+                 for war_dep in war_deps.of(name)}
+    return last[1][2].source not in war_sinks or not is_read
+
+
+def is_read_in_subtree(var: str, rev_raw: VariableDependencies, tree: Container[str]) -> bool:
     """Checks if variable is read in subtree
 
     :param var: variable name
     :param rev_raw: reversed raw dependencies of the loop
-    :param tree: subtree
+    :param tree: ids of the subtree nodes
     :return: true if read in right subtree
     """
-    for e in rev_raw:
-        if e[2].var_name == var and any([n.id == e[1] for n in tree]):
-            return True
-    return False
+    return rev_raw.reaches(var, tree)
 
 
-def is_depend_in_out(var: Variable, in_deps: List[Tuple[str, str, Dependency]],
-                     out_deps: List[Tuple[str, str, Dependency]]) -> bool:
+def is_depend_in_out(var: Variable, in_deps: VariableDependencies, out_deps: VariableDependencies) -> bool:
     """there is an in and out dependency
 
     :param var: Variable
@@ -347,14 +344,10 @@ def is_depend_in_out(var: Variable, in_deps: List[Tuple[str, str, Dependency]],
     :param out_deps: out dependencies
     :return: true if dependency is both in and out
     """
-    for in_dep in in_deps:
-        for out_dep in out_deps:
-            if var.name == in_dep[2].var_name and in_dep[2].var_name == out_dep[2].var_name:
-                return True
-    return False
+    return var.name in in_deps and var.name in out_deps
 
 
-def is_depend_in_var(var: Variable, in_deps: List[Tuple[str, str, Dependency]],
+def is_depend_in_var(var: Variable, in_deps: VariableDependencies,
                      raw_deps_on: Set[Tuple[str, str, Dependency]]) -> bool:
     """Checks if variable is written inside a dependent task and read in current task
 
@@ -363,14 +356,11 @@ def is_depend_in_var(var: Variable, in_deps: List[Tuple[str, str, Dependency]],
     :param raw_deps_on: raw dependencies
     :return: true if variable is in dependency
     """
-    for in_dep in in_deps:
-        if in_dep[2].var_name == var.name and in_dep in raw_deps_on:
-            return True
-    return False
+    return any(in_dep in raw_deps_on for in_dep in in_deps.of(var.name))
 
 
 def is_depend_out_var(var: Variable, reverse_raw_deps_on: Set[Tuple[str, str, Dependency]],
-                      out_deps: List[Tuple[str, str, Dependency]]) -> bool:
+                      out_deps: VariableDependencies) -> bool:
     """Checks if variable is written inside a current task and read in dependent task
 
         :param var: Variable
@@ -378,15 +368,12 @@ def is_depend_out_var(var: Variable, reverse_raw_deps_on: Set[Tuple[str, str, De
         :param out_deps: in dependencies
         :return: true if variable is out dependency
         """
-    for dep in out_deps:
-        if dep[2].var_name == var.name and dep in reverse_raw_deps_on:
-            return True
-    return False
+    return any(dep in reverse_raw_deps_on for dep in out_deps.of(var.name))
 
 
-def is_read_in(var: Variable, raw_deps_on: Set[Tuple[str, str, Dependency]],
-               war_deps_on: Set[Tuple[str, str, Dependency]], reverse_raw_deps_on: Set[Tuple[str, str, Dependency]],
-               reverse_war_deps_on: Set[Tuple[str, str, Dependency]], tree: List[CUNode]) -> bool:
+def is_read_in(var: Variable, raw_deps_on: VariableDependencies, war_deps_on: VariableDependencies,
+               reverse_raw_deps_on: VariableDependencies, reverse_war_deps_on: VariableDependencies,
+               tree: Container[str]) -> bool:
     """Check all reverse RAW dependencies (since we know that var is written in loop, because
     is_first_written returned true)
 
@@ -395,26 +382,15 @@ def is_read_in(var: Variable, raw_deps_on: Set[Tuple[str, str, Dependency]],
     :param war_deps_on: war dependencies
     :param reverse_raw_deps_on: reverse raw dependencies
     :param reverse_war_deps_on: reverse war dependencies
-    :param tree: nodes of the loop
+    :param tree: ids of the nodes of the loop
     :return:
     """
-    for dep in raw_deps_on:
-        # If there is a reverse raw dependency for var and the sink cu is not part
-        # of the loop, then var is read in rst
-        if var.name == dep[2].var_name:
-            return True
-    for dep in war_deps_on:
-        if var.name == dep[2].var_name and any([n.id == dep[1] for n in tree]):
-            return True
-    for dep in reverse_raw_deps_on:
-        # If there is a reverse raw dependency for var and the sink cu is not part
-        # of the loop, then var is read in rst
-        if var.name == dep[2].var_name and any([n.id == dep[1] for n in tree]):
-            return True
-    for dep in reverse_war_deps_on:
-        if var.name == dep[2].var_name:
-            return True
-    return False
+    # If there is a reverse raw dependency for var and the sink cu is not part
+    # of the loop, then var is read in rst
+    return (var.name in raw_deps_on
+            or war_deps_on.reaches(var.name, tree)
+            or reverse_raw_deps_on.reaches(var.name, tree)
+            or var.name in reverse_war_deps_on)
 
 
 def get_child_loops(pet: PETGraphX, node: CUNode) -> Tuple[List[CUNode], List[CUNode]]:
@@ -445,34 +421,37 @@ def get_child_loops(pet: PETGraphX, node: CUNode) -> Tuple[List[CUNode], List[CU
 
 def classify_loop_variables(pet: PETGraphX, loop: CUNode) -> Tuple[List[Variable], List[Variable], List[Variable],
                                                                    List[Variable], List[Variable]]:
-    """Classifies variables inside the loop
+    """Classifies variables inside the loop.
+    The classification is computed once per loop and graph.
 
     :param pet: CU graph
     :param loop: loop node
     :return: first_private, private, last_private, shared, reduction
     """
+    return cast(Tuple[List[Variable], List[Variable], List[Variable], List[Variable], List[Variable]],
+                pet.classification(('loop', loop.id, loop.reduction), lambda: __classify_loop_variables(pet, loop)))
+
+
+def __classify_loop_variables(pet: PETGraphX, loop: CUNode) -> Tuple[List[Variable], List[Variable], List[Variable],
+                                                                     List[Variable], List[Variable]]:
     first_private = []
     private = []
     last_private = []
     shared = []
     reduction = []
 
-    lst = pet.get_left_right_subtree(loop, False)
-    rst = pet.get_left_right_subtree(loop, True)
-    sub = pet.subtree_of_type(loop, NodeType.CU)
+    lst = pet.left_right_subtree_ids(loop, False)
+    rst = pet.left_right_subtree_ids(loop, True)
+    summary = pet.loop_summary(loop)
+    sub = summary.cu_nodes
+    sub_ids = {n.id for n in sub}
 
     variables = __get_variables(sub)
 
-    raw = set()
-    war = set()
-    waw = set()
-    rev_raw = set()
-
-    for sub_node in sub:
-        raw.update(__get_dep_of_type(pet, sub_node, DepType.RAW, False))
-        war.update(__get_dep_of_type(pet, sub_node, DepType.WAR, False))
-        waw.update(__get_dep_of_type(pet, sub_node, DepType.WAW, False))
-        rev_raw.update(__get_dep_of_type(pet, sub_node, DepType.RAW, True))
+    raw = VariableDependencies(summary.out_deps[DepType.RAW])
+    war = VariableDependencies(summary.out_deps[DepType.WAR])
+    waw = VariableDependencies(summary.out_deps[DepType.WAW])
+    rev_raw = VariableDependencies(summary.in_deps[DepType.RAW])
 
     for var in variables:
         if is_loop_index2(pet, loop, var.name):
@@ -487,7 +466,7 @@ def classify_loop_variables(pet: PETGraphX, loop: CUNode) -> Tuple[List[Variable
                 private.append(var)
             else:
                 first_private.append(var)
-        elif is_first_written(var.name, raw, war, sub):
+        elif is_first_written(var.name, raw, war, sub_ids):
             # TODO simplify
             if is_read_in_subtree(var.name, rev_raw, rst):
                 if is_scalar_val(var):
@@ -514,6 +493,16 @@ def classify_task_vars(pet: PETGraphX, task: CUNode, type: str, in_deps: List[Tu
     :param out_deps: out dependencies
     :param used_in_task_parallelism_detection: set True, if called in a task-parallelism detection context
     """
+    # the classification also depends on the reduction loops inside the task
+    reduction_loops = tuple(n.id for n in pet.subtree_of_type(task, NodeType.LOOP) if n.reduction)
+    key = ('task', task.id, type, tuple(in_deps), tuple(out_deps), used_in_task_parallelism_detection,
+           task.reduction, reduction_loops)
+    return pet.classification(key, lambda: __classify_task_vars(pet, task, type, in_deps, out_deps,
+                                                                used_in_task_parallelism_detection))
+
+
+def __classify_task_vars(pet: PETGraphX, task: CUNode, type: str, in_deps: List[Tuple[str, str, Dependency]],
+                         out_deps: List[Tuple[str, str, Dependency]], used_in_task_parallelism_detection: bool):
     first_private: List[Variable] = []
     private: List[Variable] = []
     shared: List[Variable] = []
@@ -522,10 +511,11 @@ def classify_task_vars(pet: PETGraphX, task: CUNode, type: str, in_deps: List[Tu
     depend_in_out: List[Variable] = []
     reduction: List[str] = []
 
-    left_sub_tree = pet.get_left_right_subtree(task, False)
+    left_sub_tree = pet.left_right_subtree_ids(task, False)
 
-    right_sub_tree = pet.get_left_right_subtree(task, True)
+    right_sub_tree = pet.left_right_subtree_ids(task, True)
     subtree = pet.subtree_of_type(task, NodeType.CU)
+    subtree_ids = {n.id for n in subtree}
     t_loop = pet.subtree_of_type(task, NodeType.LOOP)
 
     vars: Set[Variable] = set()
@@ -549,13 +539,13 @@ def classify_task_vars(pet: PETGraphX, task: CUNode, type: str, in_deps: List[Tu
     else:
         vars = __get_variables(pet.subtree_of_type(task, NodeType.CU))
 
-    raw_deps_on = set()  # set<Dependence>
-    war_deps_on = set()
-    waw_deps_on = set()
+    raw_deps_on: Set[Tuple[str, str, Dependency]] = set()  # set<Dependence>
+    war_deps_on: Set[Tuple[str, str, Dependency]] = set()
+    waw_deps_on: Set[Tuple[str, str, Dependency]] = set()
 
-    reverse_raw_deps_on = set()
-    reverse_war_deps_on = set()
-    reverse_waw_deps_on = set()
+    reverse_raw_deps_on: Set[Tuple[str, str, Dependency]] = set()
+    reverse_war_deps_on: Set[Tuple[str, str, Dependency]] = set()
+    reverse_waw_deps_on: Set[Tuple[str, str, Dependency]] = set()
     # init = []  # set<String>
 
     for sub_node in subtree:
@@ -584,36 +574,39 @@ def classify_task_vars(pet: PETGraphX, task: CUNode, type: str, in_deps: List[Tu
     loops_start_lines = [n.start_position() for n in loop_nodes]
     loop_children = [c for n in loop_nodes for c in pet.direct_children(n)]
 
+    raw = VariableDependencies(raw_deps_on)
+    war = VariableDependencies(war_deps_on)
+    waw = VariableDependencies(waw_deps_on)
+    reverse_raw = VariableDependencies(reverse_raw_deps_on)
+    reverse_war = VariableDependencies(reverse_war_deps_on)
+    in_deps_by_var = VariableDependencies(in_deps)
+    out_deps_by_var = VariableDependencies(out_deps)
+
     for var in vars:
-        var_is_loop_index = False
-        # get RAW dependencies for var
-        tmp_deps = [dep for dep in raw_deps_on if dep[2].var_name == var.name]
-        for edge in tmp_deps:
-            if pet.is_loop_index(edge[2].var_name, loops_start_lines, loop_children):
-                var_is_loop_index = True
-                break
+        # only variables with RAW dependencies can be loop indices
+        var_is_loop_index = var.name in raw and pet.is_loop_index(var.name, loops_start_lines, loop_children)
         if var_is_loop_index:
             private.append(var)
         elif (("GeometricDecomposition" in type or "Pipeline" in type)
               and is_reduction_any(loops_start_lines, var.name, pet.reduction_vars)):
             reduction.append(var.name)
-        elif is_depend_in_out(var, in_deps, out_deps):
+        elif is_depend_in_out(var, in_deps_by_var, out_deps_by_var):
             depend_in_out.append(var)
-        elif is_depend_in_var(var, in_deps, raw_deps_on):
+        elif is_depend_in_var(var, in_deps_by_var, raw_deps_on):
             depend_in.append(var)
-        elif is_depend_out_var(var, reverse_raw_deps_on, out_deps):
+        elif is_depend_out_var(var, reverse_raw_deps_on, out_deps_by_var):
             depend_out.append(var)
-        elif ((is_written_in_subtree(var.name, raw_deps_on, waw_deps_on, left_sub_tree) or
+        elif ((is_written_in_subtree(var.name, raw, waw, left_sub_tree) or
                (is_func_arg(pet, var.name, task) and is_scalar_val(var))) and
-              is_readonly(var.name, war_deps_on, waw_deps_on, reverse_raw_deps_on)):
+              is_readonly(var.name, war, waw, reverse_raw)):
             if is_global(var.name, subtree):
                 shared.append(var)
             else:
                 first_private.append(var)
-        elif is_first_written_new(var, raw_deps_on, war_deps_on, reverse_raw_deps_on, reverse_war_deps_on, subtree):
+        elif is_first_written_new(var, raw, war, reverse_raw, reverse_war, subtree_ids):
             if is_scalar_val(var) and \
                     (not used_in_task_parallelism_detection or not __is_written_prior_to_task(pet, var, task)):
-                if is_read_in(var, raw_deps_on, war_deps_on, reverse_raw_deps_on, reverse_war_deps_on, right_sub_tree):
+                if is_read_in(var, raw, war, reverse_raw, reverse_war, right_sub_tree):
                     shared.append(var)
                 else:
                     private.append(var)
@@ -643,9 +636,7 @@ def __is_written_prior_to_task(pet: PETGraphX, var: Variable, task: CUNode) -> b
         queue += [pet.node_at(edge[0]) for edge in pet.in_edges(current.id, EdgeType.SUCCESSOR) if pet.node_at(edge[0]) not in visited]
 
     # check if raw-dependency on var to any predecessor exists)
-    for out_dep in pet.out_edges(task.id, EdgeType.DATA):
-        if out_dep[2].dtype != DepType.RAW:
-            continue
+    for out_dep in pet.out_edges(task.id, EdgeType.DATA, DepType.RAW):
         # check if out_dep.source in predecessors
         if pet.node_at(out_dep[0]) in predecessors:
             return True
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+"""Benchmark of CUNode hashing in the do-all and pipeline detection
+
+Replicates the atax test input <scale> times (115 nodes per copy) and runs the do-all and pipeline
+detection with the id hash and with a constant hash, as CUNode had when it hashed the builtin id function.
+
+Usage:
+    cu_node_hash.py [--scale <scale>] [--repeat <repeat>]
+
+Options:
+    --scale=<scale>     Number of copies of the atax input [default: 435]
+    --repeat=<repeat>   Number of repetitions of each measurement [default: 3]
+    -h --help           Show this screen
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from docopt import docopt  # type:ignore
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from discopop_explorer.PETGraphX import CUNode, PETGraphX  # noqa: E402
+from discopop_explorer.parser import parse_inputs  # noqa: E402
+from discopop_explorer.pattern_detectors.do_all_detector import run_detection as detect_do_all  # noqa: E402
+from discopop_explorer.pattern_detectors.pipeline_detector import run_detection as detect_pipeline  # noqa: E402
+from edge_index import INPUT_FILES, measure, scale_input  # noqa: E402
+
+
+def main():
+    arguments = docopt(__doc__)
+    scale, repeat = int(arguments['--scale']), int(arguments['--repeat'])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scale_input(tmp, scale)
+        pet = PETGraphX.from_parsed_input(*parse_inputs(*[os.path.join(tmp, f) for f in INPUT_FILES]))
+    print(f'{len(pet.g)} nodes, {len(pet.dependencies)} dependencies')
+
+    id_hash = CUNode.__hash__
+    for name, detect in [('do-all', detect_do_all), ('pipeline', detect_pipeline)]:
+        # builds the lazy indices of the graph
+        detect(pet)
+        t_id = measure(repeat, lambda: detect(pet))
+        CUNode.__hash__ = lambda self: 0  # type: ignore
+        try:
+            t_constant = measure(repeat, lambda: detect(pet))
+        finally:
+            CUNode.__hash__ = id_hash  # type: ignore
+        print(f'{name} detection: constant hash {t_constant:.4f}s, id hash {t_id:.4f}s, '
+              f'speedup {t_constant / t_id:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+"""Microbenchmark of the typed edge index of PETGraphX
+
+Replicates the atax test input <scale> times (with shifted file ids) and compares the data dependency
+queries of the detectors answered by the edge index against materializing and filtering all data
+edges of a node, as done before the index existed.
+
+Usage:
+    edge_index.py [--scale <scale>] [--repeat <repeat>]
+
+Options:
+    --scale=<scale>     Number of copies of the atax input [default: 50]
+    --repeat=<repeat>   Number of repetitions of each measurement [default: 5]
+    -h --help           Show this screen
+"""
+
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from docopt import docopt  # type:ignore
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from discopop_explorer.PETGraphX import DepType, EdgeType, NodeType, PETGraphX  # noqa: E402
+from discopop_explorer.parser import parse_inputs  # noqa: E402
+from discopop_explorer.utils import classify_loop_variables  # noqa: E402
+
+ATAX = Path(__file__).resolve().parent.parent.parent / 'discopop_explorer' / 'test' / 'atax'
+INPUT_FILES = ['Data.xml', 'dp_run_dep.txt', 'loop_counter_output.txt', 'reduction.txt']
+POSITION = re.compile(r'(?<![\w.])(\d+):(\d+)')
+FILE_ID_OFFSET = 1000
+
+
+def scale_input(target_dir: str, scale: int):
+    """Writes scale copies of the atax input, the file ids of the i-th copy are shifted by i * FILE_ID_OFFSET"""
+    for file_name in INPUT_FILES:
+        content = (ATAX / file_name).read_text()
+        with open(os.path.join(target_dir, file_name), 'w') as f:
+            for i in range(scale):
+                offset = i * FILE_ID_OFFSET
+
+                def shift(match):
+                    return f'{int(match.group(1)) + offset}:{match.group(2)}'
+
+                copy = POSITION.sub(shift, content)
+                if file_name == 'loop_counter_output.txt':
+                    copy = re.sub(r'^(\d+)', lambda m: str(int(m.group(1)) + offset), copy, flags=re.MULTILINE)
+                elif file_name == 'reduction.txt':
+                    copy = re.sub(r'FileID : (\d+)', lambda m: f'FileID : {int(m.group(1)) + offset}', copy)
+                f.write(copy if copy.endswith('\n') else copy + '\n')
+
+
+def measure(repeat: int, f) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        f()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arguments = docopt(__doc__)
+    scale, repeat = int(arguments['--scale']), int(arguments['--repeat'])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scale_input(tmp, scale)
+        pet = PETGraphX.from_parsed_input(*parse_inputs(*[os.path.join(tmp, f) for f in INPUT_FILES]))
+    cu_ids = [n.id for n in pet.all_nodes(NodeType.CU)]
+    loops = pet.all_nodes(NodeType.LOOP)
+    print(f'{len(pet.g)} nodes, {len(pet.dependencies)} dependencies, {len(loops)} loops')
+
+    store = pet.dependencies
+
+    def filtered():
+        for node_id in cu_ids:
+            for dtype in DepType:
+                [e for e in store.edges(store.out_rows(node_id)) if e[2].dtype == dtype]
+                [e for e in store.edges(store.in_rows(node_id)) if e[2].dtype == dtype]
+
+    def indexed():
+        for node_id in cu_ids:
+            for dtype in DepType:
+                pet.out_edges(node_id, EdgeType.DATA, dtype)
+                pet.in_edges(node_id, EdgeType.DATA, dtype)
+
+    def classify():
+        # measure the classification itself, not the memoized results
+        pet._classifications.clear()
+        for loop in loops:
+            classify_loop_variables(pet, loop)
+
+    t_filtered = measure(repeat, filtered)
+    t_indexed = measure(repeat, indexed)
+    print(f'typed data edge queries: filtered {t_filtered:.4f}s, indexed {t_indexed:.4f}s, '
+          f'speedup {t_filtered / t_indexed:.1f}x')
+
+    t_classify = measure(repeat, classify)
+    pet._edge_index.clear()
+    t_classify_cold = measure(1, classify)
+    print(f'classify_loop_variables on all loops: {t_classify_cold:.4f}s cold index, {t_classify:.4f}s warm index')
+
+
+if __name__ == '__main__':
+    main()
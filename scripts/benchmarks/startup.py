@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# This file is part of the DiscoPoP software (http://www.discopop.tu-darmstadt.de)
+#
+# Copyright (c) 2020, Technische Universitaet Darmstadt, Germany
+#
+# This software may be modified and distributed under the terms of
+# the 3-Clause BSD License.  See the LICENSE file in the package base
+# directory for details.
+
+"""Startup benchmark of the explorer command line interface
+
+Runs `python -X importtime -m discopop_explorer --help` in fresh interpreters and reports the wall time and
+the cumulative import time of the explorer package. Fails if heavy dependencies are imported or the
+import time exceeds the budget.
+
+Usage:
+    startup.py [--repeat <repeat>] [--budget <budget>]
+
+Options:
+    --repeat=<repeat>   Number of interpreter starts [default: 10]
+    --budget=<budget>   Maximal import time of discopop_explorer in milliseconds [default: 200]
+    -h --help           Show this screen
+"""
+
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+
+from docopt import docopt  # type:ignore
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+# modules only needed for detection, plotting, plugins or task parallelism
+HEAVY_MODULES = ['matplotlib', 'networkx', 'numpy', 'lxml', 'pluginbase',
+                 'discopop_explorer.PETGraphX', 'discopop_explorer.pattern_detectors']
+IMPORT_TIME = re.compile(r'^import time:\s*(\d+) \|\s*(\d+) \|(\s*)(\S+)$')
+
+
+def startup() -> Tuple[float, Dict[str, int]]:
+    """Starts the explorer with --help
+
+    :return: wall time in seconds and cumulative import time in microseconds by top-level module
+    """
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'discopop_explorer', '--help'],
+                             cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True,
+                             check=True)
+    wall = time.perf_counter() - start
+    imports = {}
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            imports[match.group(4)] = int(match.group(2))
+    return wall, imports
+
+
+def main():
+    arguments = docopt(__doc__)
+    repeat, budget = int(arguments['--repeat']), float(arguments['--budget'])
+
+    runs = [startup() for _ in range(repeat)]
+    wall = min(w for w, _ in runs)
+    package = min(imports.get('discopop_explorer', 0) for _, imports in runs) / 1000
+    print(f'--help: {wall * 1000:.1f}ms wall time, {package:.1f}ms importing discopop_explorer')
+
+    heavy = sorted(m for m in runs[0][1] if any(m == h or m.startswith(h + '.') for h in HEAVY_MODULES))
+    if heavy:
+        print(f'heavy modules imported: {", ".join(heavy)}')
+    if heavy or package > budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()